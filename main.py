@@ -1,42 +1,51 @@
 
 import argparse
+import logging
 from src.utils import load_config, setup_logging
 
+logger = logging.getLogger(__name__)
+
 def main():
     """
     Main orchestrator for the forecasting pipeline.
     """
     # Load configuration
     config = load_config()
-    setup_logging()
+    setup_logging(config)
     
     # Parse arguments provided by the user (if any)
     parser = argparse.ArgumentParser(description="Forecaster Mis Bunuelos Orchestrator")
-    parser.add_argument("--phase", type=str, help="Specify the phase to run (e.g., 'discovery', 'preprocessing', 'training')")
+    parser.add_argument("--phase", type=str, help="Specify the phase to run (e.g., 'discovery', 'preprocessing', 'engineering', 'figures')")
     args = parser.parse_args()
     
-    print("Starting Forecaster Pipeline...")
+    logger.info("Starting Forecaster Pipeline...")
     
     # 1. Discovery (Loader)
     if not args.phase or args.phase == "discovery":
-        print("Running Phase 1: Data Discovery...")
+        logger.info("Running Phase 1: Data Discovery...")
         from src.loader import DataLoader
         loader = DataLoader(config)
         loader.run()
 
     # 3. Preprocessing
     if not args.phase or args.phase == "preprocessing":
-        print("Running Phase 2: Preprocessing...")
-        from src.preprocessor import Preprocessor
-        preprocessor = Preprocessor(config)
+        logger.info("Running Phase 2: Preprocessing...")
+        from src.preprocessor import get_preprocessor
+        preprocessor = get_preprocessor(config)
         preprocessor.run()
 
     # 4. Feature Engineering
     if not args.phase or args.phase == "engineering":
-        print("Running Phase 4: Feature Engineering...")
+        logger.info("Running Phase 4: Feature Engineering...")
         from src.features import FeatureEngineer
         engineer = FeatureEngineer(config)
         engineer.run()
 
+    # Validation figures on demand (skipped when the features did not change)
+    if args.phase == "figures":
+        logger.info("Rendering Phase 4 validation figures...")
+        from src.features import FeatureEngineer
+        FeatureEngineer(config).render_figures()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,249 @@
+import json
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _month_day(month: int, day: int) -> int:
+    """Encodes a (month, day) pair as a sortable MMDD integer."""
+    return int(month) * 100 + int(day)
+
+
+def _in_window(md: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Vectorized MMDD window check, supporting windows that wrap the year end."""
+    if start <= end:
+        return (md >= start) & (md <= end)
+    return (md >= start) | (md <= end)
+
+
+def calendar_params(config: dict) -> str:
+    """
+    Extracts the business-calendar parameters from the configuration.
+
+    The result is a canonical JSON string so it can be used as a cache key.
+    Defaults mirror the expert rules documented in config.yaml.
+    """
+    biz_events = config.get("business_events", {}) or {}
+    novenas = biz_events.get("novenas", {}) or {}
+    primas = biz_events.get("primas", {}) or {}
+    promotions = biz_events.get("promotions", {}) or {}
+    campaigns = biz_events.get("campaigns", {}) or {}
+    peak_days = biz_events.get("peak_days", {}) or {}
+    pandemic = biz_events.get("pandemic", {}) or {}
+
+    params = {
+        "novenas": {
+            "month": novenas.get("month", 12),
+            "start_day": novenas.get("start_day", 16),
+            "end_day": novenas.get("end_day", 23),
+        },
+        "primas": {
+            "months": list(primas.get("months", [6, 12])),
+            "day_range": list(primas.get("day_range", [15, 20])),
+        },
+        "promotion_windows": [list(w) for w in promotions.get("windows", [[4, 5], [9, 10]])],
+        "campaign_windows": [dict(w) for w in campaigns.get("windows", [
+            {"label": "Ciclo Abr-May", "start": [3, 15], "end": [5, 25]},
+            {"label": "Ciclo Sep-Oct", "start": [8, 15], "end": [10, 25]},
+        ])],
+        "campaign_default_label": campaigns.get("default_label", "Sin Campaña"),
+        "peak_days": list(peak_days.get("days", ["Saturday", "Sunday"])),
+        "holidays_as": peak_days.get("holidays_as", "Saturday"),
+        "holidays": [str(d) for d in (biz_events.get("holidays") or [])],
+        "pandemic": {
+            "start_date": str(pandemic.get("start_date", "2020-04-01")),
+            "end_date": str(pandemic.get("end_date", "2021-12-31")),
+        },
+    }
+    return json.dumps(params, sort_keys=True)
+
+
+class CalendarDimension:
+    """
+    Daily calendar dimension with precomputed business-rule flags.
+
+    One row per day between `start` and `end`. Every rule mask used by the
+    pipeline (promo windows, campaign windows, novenas, primas, pandemic,
+    holidays) is derived once from config.yaml and served by integer day
+    offset, so callers never decompose datetimes themselves.
+    """
+
+    def __init__(self, frame: pd.DataFrame, campaign_labels: list, default_label: str):
+        self.frame = frame
+        self.start = frame.index[0]
+        self.end = frame.index[-1]
+        self.campaign_labels = campaign_labels
+        self.default_label = default_label
+        self._columns = {col: frame[col].to_numpy() for col in frame.columns}
+        self._month_starts = np.flatnonzero(self._columns["day"] == 1)
+        self._monthly_cache = {}
+
+    @classmethod
+    def from_config(cls, config: dict, start=None, end=None) -> "CalendarDimension":
+        """
+        Returns the (cached) calendar for the configured business rules.
+
+        Args:
+            config (dict): The configuration dictionary.
+            start: First date. Defaults to `preprocessing.filters.min_date`.
+            end: Last date. Defaults to the end of the year in which the
+                forecast horizon (`validation.horizon_months` after today)
+                ends, so the default range (and cache entry) only changes
+                once a year.
+
+        Returns:
+            CalendarDimension: Calendar covering whole months from start to end.
+        """
+        if start is None:
+            filters = config.get("preprocessing", {}).get("filters", {}) or {}
+            start = filters.get("min_date", "2018-01-01")
+        if end is None:
+            horizon = config.get("validation", {}).get("horizon_months", 6)
+            end = pd.Timestamp(datetime.now()).normalize() + pd.DateOffset(months=horizon) + pd.offsets.YearEnd(0)
+
+        # Snap to whole months so nearby requests share the same cache entry
+        start = pd.Timestamp(start).normalize().replace(day=1)
+        end = pd.Timestamp(end).normalize() + pd.offsets.MonthEnd(0)
+        return _build_calendar(calendar_params(config), start, end)
+
+    @classmethod
+    def for_dates(cls, config: dict, dates) -> "CalendarDimension":
+        """Returns a calendar covering both the configured range and `dates`."""
+        base = cls.from_config(config)
+        dates = pd.DatetimeIndex(dates)
+        if dates.empty or (dates.min() >= base.start and dates.max() <= base.end):
+            return base
+        return cls.from_config(config, start=min(base.start, dates.min()), end=max(base.end, dates.max()))
+
+    def offsets(self, dates) -> np.ndarray:
+        """
+        Converts dates to integer day offsets into the calendar.
+
+        Raises:
+            ValueError: If any date falls outside the calendar range.
+        """
+        values = pd.DatetimeIndex(dates).normalize().values.astype("datetime64[D]")
+        offsets = (values - np.datetime64(self.start.date(), "D")).astype(np.int64)
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= len(self.frame)):
+            raise ValueError(f"Dates outside calendar range [{self.start.date()}, {self.end.date()}]")
+        return offsets
+
+    def lookup(self, column: str, dates) -> np.ndarray:
+        """Returns the calendar column values for the given dates."""
+        return self._columns[column][self.offsets(dates)]
+
+    def monthly(self, column: str, dates, how: str = "max") -> np.ndarray:
+        """
+        Aggregates a daily calendar column to the month of each given date.
+
+        Args:
+            column (str): Calendar column to aggregate.
+            dates: Dates whose month is looked up (any day of the month).
+            how (str): 'max' (any day flagged) or 'sum' (number of days).
+
+        Returns:
+            np.ndarray: One aggregated value per date.
+        """
+        return self.monthly_many([column], dates, how)[:, 0]
+
+    def monthly_many(self, columns, dates, how: str = "sum") -> np.ndarray:
+        """
+        Aggregates several daily calendar columns to month in one pass.
+
+        Columns not cached yet are reduced together as one days x columns
+        block, so e.g. every event day count of a month costs a single
+        `reduceat` over the calendar.
+
+        Returns:
+            np.ndarray: Array of shape (len(dates), len(columns)).
+        """
+        columns = list(columns)
+        unknown = [col for col in columns if col not in self._columns]
+        if unknown:
+            raise ValueError(f"Unknown calendar columns {unknown}. Options: {list(self._columns)}")
+        missing = [col for col in columns if (col, how) not in self._monthly_cache]
+        if missing:
+            reducer = {"max": np.maximum, "sum": np.add}[how]
+            block = np.column_stack([self._columns[col] for col in missing])
+            reduced = reducer.reduceat(block, self._month_starts, axis=0)
+            for i, col in enumerate(missing):
+                self._monthly_cache[(col, how)] = reduced[:, i]
+
+        dates = pd.DatetimeIndex(dates)
+        month_pos = (dates.year - self.start.year) * 12 + (dates.month - self.start.month)
+        month_pos = np.asarray(month_pos, dtype=np.int64)
+        if month_pos.size and (month_pos.min() < 0 or month_pos.max() >= len(self._month_starts)):
+            raise ValueError(f"Dates outside calendar range [{self.start.date()}, {self.end.date()}]")
+        if not columns:
+            return np.empty((len(month_pos), 0), dtype=np.int8)
+        return np.column_stack([self._monthly_cache[(col, how)][month_pos] for col in columns])
+
+    def campaign_label(self, dates) -> np.ndarray:
+        """Returns the campaign label of each date ('Sin Campaña' outside campaigns)."""
+        labels = np.array(self.campaign_labels + [self.default_label], dtype=object)
+        return labels[self.lookup("campaign_id", dates)]
+
+
+@lru_cache(maxsize=16)
+def _build_calendar(params_json: str, start: pd.Timestamp, end: pd.Timestamp) -> CalendarDimension:
+    """Builds the calendar frame. Cached per (params, start, end)."""
+    params = json.loads(params_json)
+    dates = pd.date_range(start=start, end=end, freq="D", name="fecha")
+
+    month = dates.month.to_numpy().astype(np.int8)
+    day = dates.day.to_numpy().astype(np.int8)
+    weekday = dates.weekday.to_numpy().astype(np.int8)
+    md = month.astype(np.int16) * 100 + day
+
+    # Promotions: [[start_month, end_month], ...]
+    is_promo_window = np.zeros(len(dates), dtype=bool)
+    for m_start, m_end in params["promotion_windows"]:
+        is_promo_window |= _in_window(md, _month_day(m_start, 1), _month_day(m_end, 31))
+
+    # Campaigns: day-precise investment window and month span used for labels
+    is_campaign_window = np.zeros(len(dates), dtype=bool)
+    campaign_id = np.full(len(dates), -1, dtype=np.int8)
+    for i, window in enumerate(params["campaign_windows"]):
+        (s_month, s_day), (e_month, e_day) = window["start"], window["end"]
+        is_campaign_window |= _in_window(md, _month_day(s_month, s_day), _month_day(e_month, e_day))
+        in_span = _in_window(md, _month_day(s_month, 1), _month_day(e_month, 31))
+        campaign_id[in_span & (campaign_id < 0)] = i
+    labels = [w["label"] for w in params["campaign_windows"]]
+    campaign_id[campaign_id < 0] = len(labels)
+
+    novenas = params["novenas"]
+    is_novenas = (month == novenas["month"]) & (day >= novenas["start_day"]) & (day <= novenas["end_day"])
+
+    primas = params["primas"]
+    is_primas = np.isin(month, primas["months"]) & (day >= primas["day_range"][0]) & (day <= primas["day_range"][1])
+
+    pandemic = params["pandemic"]
+    is_pandemic = (dates >= pd.Timestamp(pandemic["start_date"])) & (dates <= pd.Timestamp(pandemic["end_date"]))
+
+    is_holiday = dates.isin(pd.to_datetime(params["holidays"]))
+    peak_weekdays = [WEEKDAY_NAMES.index(d) for d in params["peak_days"]]
+    is_peak_day = np.isin(weekday, peak_weekdays)
+    if params["holidays_as"] in params["peak_days"]:
+        is_peak_day |= is_holiday
+
+    frame = pd.DataFrame({
+        "year": dates.year.to_numpy().astype(np.int16),
+        "month": month,
+        "day": day,
+        "weekday": weekday,
+        "is_weekend": (weekday >= 5).astype(np.int8),
+        "is_promo_window": is_promo_window.astype(np.int8),
+        "is_campaign_window": is_campaign_window.astype(np.int8),
+        "campaign_id": campaign_id,
+        "is_novenas": is_novenas.astype(np.int8),
+        "is_primas": is_primas.astype(np.int8),
+        "is_pandemic": np.asarray(is_pandemic).astype(np.int8),
+        "is_holiday": np.asarray(is_holiday).astype(np.int8),
+        "is_peak_day": is_peak_day.astype(np.int8),
+    }, index=dates)
+
+    return CalendarDimension(frame, labels, params["campaign_default_label"])
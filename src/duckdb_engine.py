@@ -0,0 +1,186 @@
+import logging
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.preprocessor import Preprocessor
+
+logger = logging.getLogger(__name__)
+
+# SQL templates for `preprocessing.aggregation_rules`. `first`/`last` skip
+# nulls and `sum` of an all-null month is 0, like pandas resample/groupby.
+AGGREGATIONS = {
+    "sum": "coalesce(sum({col}), 0)",
+    "mean": "avg({col})",
+    "median": "median({col})",
+    "min": "min({col})",
+    "max": "max({col})",
+    "count": "count({col})",
+    "first": "first({col} ORDER BY fecha) FILTER (WHERE {col} IS NOT NULL)",
+    "last": "last({col} ORDER BY fecha) FILTER (WHERE {col} IS NOT NULL)",
+}
+
+# Result type of a sum/count, as pandas returns it (int64 or float64)
+INTEGER_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "BOOLEAN")
+
+
+def _quote(name: str) -> str:
+    """Quotes a SQL identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class DuckDBPreprocessor(Preprocessor):
+    """
+    DuckDB execution backend for monthly aggregation and source unification.
+
+    The daily stages run on the reference pandas implementation. Each
+    imputed daily frame is then written to Parquet under
+    `preprocessing.duckdb.temp_directory` and released from pandas memory,
+    so the monthly roll-up (generated as SQL from
+    `preprocessing.aggregation_rules`) scans it with `read_parquet` and the
+    four-way join runs in SQL as well. Both use DuckDB's parallel executor
+    and spill to `temp_directory` beyond `memory_limit`.
+
+    The master frame (layout, index and dtypes) is the one `_unify_sources`
+    returns, so post-merge imputation, anti-leakage and the report are shared.
+    """
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self.monthly_tables = {}
+        self.monthly_dtypes = {}
+        duckdb_cfg = self.config.get("preprocessing", {}).get("duckdb", {}) or {}
+        self.temp_directory = self.base_dir / duckdb_cfg.get("temp_directory", "data/02_cleansed/duckdb_tmp")
+        self.con = self._connect(duckdb_cfg)
+
+    def _connect(self, duckdb_cfg: dict):
+        """Opens the embedded DuckDB connection with the configured resources."""
+        settings = {"temp_directory": str(self.temp_directory)}
+        if duckdb_cfg.get("threads"):
+            settings["threads"] = int(duckdb_cfg["threads"])
+        if duckdb_cfg.get("memory_limit"):
+            settings["memory_limit"] = str(duckdb_cfg["memory_limit"])
+        return duckdb.connect(database=":memory:", config=settings)
+
+    def run(self):
+        """
+        Executes the preprocessing pipeline, aggregating and joining in DuckDB.
+        """
+        try:
+            super().run()
+        finally:
+            self.con.close()
+            for path in self.temp_directory.glob("daily_*.parquet"):
+                path.unlink(missing_ok=True)
+
+    def _pipeline_rows(self):
+        if self.monthly_tables:
+            return int(sum(rows for _, rows in self.monthly_tables.values()))
+        return super()._pipeline_rows()
+
+    def _aggregate_monthly(self):
+        """
+        Aggregates the daily frames to monthly frequency (MS) with generated SQL.
+
+        Each daily frame is staged as Parquet and scanned by DuckDB; the pandas
+        frame is replaced by its empty schema (the later stages only need
+        column names and dtypes).
+        """
+        logger.info("Aggregating Monthly (MS) in DuckDB...")
+        self.temp_directory.mkdir(parents=True, exist_ok=True)
+        for key in list(self.dataframes):
+            table = f"monthly_{key}"
+            path = self.temp_directory / f"daily_{key}.parquet"
+            pq.write_table(pa.Table.from_pandas(self.dataframes[key], preserve_index=False), path)
+            self.dataframes[key] = df = self.dataframes[key].iloc[:0]
+
+            source = "'" + str(path).replace("'", "''") + "'"
+            self.con.execute(f"CREATE OR REPLACE TEMP VIEW daily_{key} AS SELECT * FROM read_parquet({source})")
+            self.con.execute(f"CREATE OR REPLACE TEMP TABLE {table} AS {self._aggregation_sql(key, df)}")
+            self.con.execute(f"DROP VIEW daily_{key}")
+
+            rows = self.con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            self.monthly_tables[key] = (table, rows)
+            self.monthly_dtypes.update(self._monthly_dtypes(key, df))
+
+        logger.info("Aggregation completed.")
+
+    def _aggregation_sql(self, key, df):
+        """
+        Builds the monthly GROUP BY of one daily source.
+
+        Raises:
+            ValueError: If a rule has no SQL equivalent.
+        """
+        keys = self._keys_in(df)
+        rules = self._aggregation_rules(key, df)
+        if not rules:
+            rules = {
+                col: "sum" for col in df.select_dtypes(include="number").columns if col not in keys
+            }
+
+        unknown = sorted(set(rules.values()) - set(AGGREGATIONS))
+        if unknown:
+            raise ValueError(f"Aggregation rules not supported by the DuckDB engine: {unknown}")
+
+        types = dict(self.con.execute(f"SELECT column_name, column_type FROM (DESCRIBE daily_{key})").fetchall())
+        select = [_quote(k) for k in keys] + ["date_trunc('month', fecha) AS fecha"]
+        for col, how in rules.items():
+            expr = AGGREGATIONS[how].format(col=_quote(col))
+            if how in ("sum", "count"):
+                expr = f"CAST({expr} AS {'BIGINT' if types[col] in INTEGER_TYPES or how == 'count' else 'DOUBLE'})"
+            alias = "dias_en_promo" if key == "promo" and col == "es_promo" else col
+            select.append(f"{expr} AS {_quote(alias)}")
+
+        order_by = ", ".join([_quote(k) for k in keys] + ["fecha"])
+        return f"SELECT {', '.join(select)} FROM daily_{key} GROUP BY ALL ORDER BY {order_by}"
+
+    def _monthly_dtypes(self, key, df):
+        """Daily dtypes the monthly columns are restored to, as in `_aggregate_frame`."""
+        dtypes = df.dtypes.to_dict()
+        if key == "promo" and "es_promo" in dtypes:
+            dtypes["dias_en_promo"] = dtypes.pop("es_promo")
+        return dtypes
+
+    def _monthly_columns(self, key):
+        """Value columns (series keys and fecha excluded) of a monthly table."""
+        table, _ = self.monthly_tables[key]
+        columns = [row[0] for row in self.con.execute(f"DESCRIBE {table}").fetchall()]
+        return [col for col in columns if col != "fecha" and col not in self.series_keys]
+
+    def _unify_sources(self):
+        """
+        Left-joins every monthly table onto ventas in one SQL query.
+
+        Sources keyed by fewer series keys (e.g. macro) join on the keys they
+        have, which broadcasts them to every series, as in the pandas engine.
+
+        Raises:
+            ValueError: If two sources share a column name.
+        """
+        logger.info("Merging Datasets in DuckDB...")
+        keys = ["ventas"] + [key for key in self.monthly_tables if key != "ventas"]
+        columns = {key: self._monthly_columns(key) for key in keys}
+        self._check_collisions(columns)
+
+        master_keys = self._keys_in(self.dataframes["ventas"])
+        select = [f"v.{_quote(k)}" for k in master_keys] + ["v.fecha"]
+        select += [f"v.{_quote(col)}" for col in columns["ventas"]]
+        joins = []
+        for i, key in enumerate(keys[1:]):
+            alias = f"s{i}"
+            join_cols = self._keys_in(self.dataframes[key]) + ["fecha"]
+            on = " AND ".join(f"v.{_quote(col)} = {alias}.{_quote(col)}" for col in join_cols)
+            joins.append(f"LEFT JOIN {self.monthly_tables[key][0]} {alias} ON {on}")
+            select += [f"{alias}.{_quote(col)}" for col in columns[key]]
+
+        order_by = ", ".join([f"v.{_quote(k)}" for k in master_keys] + ["v.fecha"])
+        sql = f"SELECT {', '.join(select)} FROM {self.monthly_tables['ventas'][0]} v {' '.join(joins)} ORDER BY {order_by}"
+        df_master = self.con.execute(sql).to_arrow_table().to_pandas()
+
+        fecha = df_master.pop("fecha").astype(self.dataframes["ventas"]["fecha"].dtype)
+        df_master.index = pd.DatetimeIndex(fecha, name="fecha", freq=None if master_keys else "MS")
+        df_master = self._restore_dtypes(df_master, self.monthly_dtypes)
+        logger.info("Master Dataset Shape: %s", df_master.shape)
+        return df_master
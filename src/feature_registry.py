@@ -0,0 +1,257 @@
+import json
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def config_value(config: dict, key: str):
+    """Returns the value of a dotted config key (e.g. 'feature_engineering.marketing_lags'), or None."""
+    value = config
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class FeatureSpec:
+    """
+    Declaration of one feature.
+
+    Args:
+        name (str): Unique feature name.
+        outputs (tuple): Columns the feature produces.
+        compute: Callable `(frame, params) -> dict | pd.DataFrame` returning the
+            output columns. `frame` holds the base columns plus the outputs of
+            the features listed in `inputs`; `params` maps each config key to
+            its current value.
+        inputs (tuple): Columns the feature reads, either base columns or
+            outputs of other features. The index is always available.
+        config_keys (tuple): Dotted config keys the feature depends on.
+        group (str): Optional group name (e.g. 'cyclical').
+        lookback (int): Previous rows a row's value depends on (0 = the row
+            itself, e.g. calendar features; None = the whole history).
+        per_series (bool): The feature reads previous rows (lags, windows), so
+            `compute` also receives `groups` (contiguous series codes, None for
+            a single series) and must not cross series boundaries.
+    """
+
+    def __init__(self, name: str, outputs, compute, inputs=(), config_keys=(), group: str = None, lookback: int = 0,
+                 per_series: bool = False):
+        self.name = name
+        self.outputs = tuple(outputs)
+        self.compute = compute
+        self.inputs = tuple(inputs)
+        self.config_keys = tuple(config_keys)
+        self.group = group
+        self.lookback = lookback
+        self.per_series = per_series
+
+    def params(self, config: dict) -> dict:
+        """Current values of the feature's config keys."""
+        return {key: config_value(config, key) for key in self.config_keys}
+
+    def __repr__(self):
+        return f"FeatureSpec({self.name!r}, outputs={list(self.outputs)})"
+
+
+class FeatureRegistry:
+    """
+    Catalog of features and the dependency graph between them.
+
+    A feature depends on another when one of its inputs is the other's
+    output. `resolve` returns only the features needed for a request, in
+    dependency order.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._producers = {}
+
+    def register(self, spec: FeatureSpec) -> FeatureSpec:
+        """
+        Adds a feature to the catalog.
+
+        Raises:
+            ValueError: If the name or an output column is already registered.
+        """
+        if spec.name in self._specs:
+            raise ValueError(f"Feature '{spec.name}' is already registered")
+        taken = [col for col in spec.outputs if col in self._producers]
+        if taken:
+            raise ValueError(f"Feature '{spec.name}' outputs {taken} already produced by another feature")
+
+        self._specs[spec.name] = spec
+        for col in spec.outputs:
+            self._producers[col] = spec.name
+        return spec
+
+    def feature(self, name: str, outputs, inputs=(), config_keys=(), group: str = None, lookback: int = 0,
+                per_series: bool = False):
+        """Decorator form of `register` for a compute function."""
+        def decorator(compute):
+            self.register(FeatureSpec(name, outputs, compute, inputs, config_keys, group, lookback, per_series))
+            return compute
+        return decorator
+
+    def __iter__(self):
+        return iter(self._specs.values())
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __contains__(self, name):
+        return name in self._specs or name in self._producers
+
+    def names(self, group: str = None) -> list:
+        """Feature names in registration order, optionally of one group."""
+        return [spec.name for spec in self if group is None or spec.group == group]
+
+    def get(self, name: str) -> FeatureSpec:
+        """
+        Returns the feature registered under `name` or producing column `name`.
+
+        Raises:
+            ValueError: If nothing matches.
+        """
+        if name in self._specs:
+            return self._specs[name]
+        if name in self._producers:
+            return self._specs[self._producers[name]]
+        raise ValueError(f"Unknown feature '{name}'. Options: {self.names()}")
+
+    def resolve(self, requested=None) -> list:
+        """
+        Returns the features needed for `requested` (all when None), dependencies first.
+
+        Raises:
+            ValueError: If a feature is unknown or the dependencies form a cycle.
+        """
+        requested = self.names() if requested is None else requested
+        ordered, visiting, done = [], set(), set()
+
+        def visit(spec):
+            if spec.name in done:
+                return
+            if spec.name in visiting:
+                raise ValueError(f"Feature dependency cycle through '{spec.name}'")
+            visiting.add(spec.name)
+            for col in spec.inputs:
+                if col in self._producers:
+                    visit(self._specs[self._producers[col]])
+            visiting.discard(spec.name)
+            done.add(spec.name)
+            ordered.append(spec)
+
+        for name in requested:
+            visit(self.get(name))
+        return ordered
+
+    def lookback(self, requested=None):
+        """
+        Rows of history needed to compute the latest row of `requested`.
+
+        Look-backs add up along dependency chains (a lag of a lag). Returns
+        None if any feature needs the whole history.
+        """
+        needed = {}
+        for spec in self.resolve(requested):
+            upstream = [needed[self._producers[col]] for col in spec.inputs if col in self._producers]
+            if spec.lookback is None or None in upstream:
+                needed[spec.name] = None
+            else:
+                needed[spec.name] = spec.lookback + max(upstream, default=0)
+        values = list(needed.values())
+        return None if None in values else max(values, default=0)
+
+
+class FeatureGraph:
+    """
+    Lazy evaluation of a registry over one base frame.
+
+    Every computed feature (requested or intermediate) is cached with the
+    config values it was computed with, so later requests on the same frame
+    only compute what is missing or whose config changed.
+
+    Long-format frames (one row per series and date) pass `groups`, the
+    contiguous series codes: per-series features receive them, and features
+    without input columns are computed once per distinct date and
+    broadcast to every series.
+    """
+
+    def __init__(self, registry: FeatureRegistry, df: pd.DataFrame, config: dict, groups=None):
+        self.registry = registry
+        self.base = df
+        self.config = config
+        self.groups = groups
+        self.cache = {}
+        self._dates = None
+
+    def _missing_inputs(self, spec: FeatureSpec) -> list:
+        return [col for col in spec.inputs if col not in self.base.columns and col not in self.registry]
+
+    def _evaluate(self, spec: FeatureSpec) -> pd.DataFrame:
+        """Returns the outputs of one feature, from the cache when up to date."""
+        params = spec.params(self.config)
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        cached = self.cache.get(spec.name)
+        if cached is not None and cached[0] == params_key:
+            return cached[1]
+
+        frame = self.base
+        upstream = {self.registry.get(col).name for col in spec.inputs if col not in self.base.columns}
+        if upstream:
+            frame = pd.concat([self.base] + [self.cache[name][1] for name in upstream], axis=1)
+
+        if not spec.inputs and not self.base.index.is_unique:
+            outputs = self._broadcast(spec, params)
+        elif spec.per_series:
+            outputs = spec.compute(frame, params, groups=self.groups)
+        else:
+            outputs = spec.compute(frame, params)
+        outputs = pd.DataFrame(outputs, index=self.base.index)[list(spec.outputs)]
+        self.cache[spec.name] = (params_key, outputs)
+        logger.debug("Computed feature %s", spec.name)
+        return outputs
+
+    def _broadcast(self, spec: FeatureSpec, params: dict) -> pd.DataFrame:
+        """Computes an index-only feature on the distinct dates and gathers it per row."""
+        if self._dates is None:
+            self._dates = pd.factorize(self.base.index)
+        codes, dates = self._dates
+        outputs = pd.DataFrame(spec.compute(pd.DataFrame(index=dates), params), index=dates)[list(spec.outputs)]
+        return outputs.take(codes).set_axis(self.base.index)
+
+    def compute(self, requested=None) -> pd.DataFrame:
+        """
+        Returns the base frame plus the outputs of the requested features.
+
+        Args:
+            requested (list): Feature names or output columns. None computes
+                the whole catalog, skipping (with a warning) features whose
+                input columns are absent from the base frame.
+
+        Raises:
+            ValueError: If a requested feature is unknown or misses input columns.
+        """
+        specs = self.registry.resolve(requested)
+        wanted = {spec.name for spec in self.registry} if requested is None else {self.registry.get(name).name for name in requested}
+
+        skipped, results = set(), []
+        for spec in specs:
+            missing = self._missing_inputs(spec)
+            blocked = [col for col in spec.inputs if col in self.registry and self.registry.get(col).name in skipped]
+            if missing or blocked:
+                if requested is not None:
+                    raise ValueError(f"Feature '{spec.name}' is missing input columns: {missing + blocked}")
+                logger.warning("Feature %s skipped: input columns %s not found.", spec.name, missing + blocked)
+                skipped.add(spec.name)
+                continue
+
+            outputs = self._evaluate(spec)
+            if spec.name in wanted:
+                results.append(outputs)
+
+        return pd.concat([self.base] + results, axis=1) if results else self.base.copy()
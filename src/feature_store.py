@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Config sections that determine the engineered features (besides the input data)
+KEY_SECTIONS = ("feature_engineering", "business_events")
+# feature_engineering settings that do not affect the features themselves
+RUNTIME_KEYS = ("store", "figures", "incremental")
+FEATURES_FILE = "features.parquet"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_params(config: dict) -> str:
+    """
+    Extracts the configuration the features depend on as a canonical JSON string.
+
+    Settings that do not change the features' content (where versions are
+    stored, how figures are rendered, how updates are applied) are excluded.
+    """
+    params = {section: dict(config.get(section, {}) or {}) for section in KEY_SECTIONS}
+    for key in RUNTIME_KEYS:
+        params["feature_engineering"].pop(key, None)
+    # Series keys decide where lags and windows restart in long-format masters
+    multi_series = config.get("preprocessing", {}).get("multi_series", {}) or {}
+    params["series_keys"] = list(multi_series.get("keys") or [])
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class FeatureStore:
+    """
+    Local store of engineered feature versions.
+
+    Each version lives in `<root>/<version>/features.parquet`, where the
+    version is a hash of the input master file and the feature configuration
+    (see `version_key`), so an unchanged input/config pair is a cache hit.
+    `manifest.json` records every version (creation and last access time,
+    size, shape, input file) and drives the eviction of the least recently
+    used versions beyond `max_versions` or `max_bytes`.
+    """
+
+    def __init__(self, root, max_versions: int = None, max_bytes: int = None):
+        self.root = Path(root)
+        self.max_versions = max_versions
+        self.max_bytes = max_bytes
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: dict, base_dir=None):
+        """
+        Builds the store from `feature_engineering.store`, or returns None if disabled.
+        """
+        store_cfg = config.get("feature_engineering", {}).get("store", {}) or {}
+        if not store_cfg.get("enabled", False):
+            return None
+
+        base_dir = Path(base_dir or os.getcwd())
+        features_dir = config.get("paths", {}).get("data", {}).get("features", "data/03_features/")
+        max_size_mb = store_cfg.get("max_size_mb")
+        return cls(
+            base_dir / store_cfg.get("path", Path(features_dir) / "store"),
+            max_versions=store_cfg.get("max_versions"),
+            max_bytes=int(max_size_mb * 1024 ** 2) if max_size_mb else None
+        )
+
+    @staticmethod
+    def version_key(input_path, config: dict) -> str:
+        """Version id of the features built from `input_path` with `config`."""
+        digest = hashlib.sha256()
+        digest.update(file_digest(input_path).encode())
+        digest.update(feature_params(config).encode())
+        return digest.hexdigest()[:16]
+
+    def path(self, version: str) -> Path:
+        """Parquet file of a version."""
+        return self.root / version / FEATURES_FILE
+
+    def versions(self) -> dict:
+        """Manifest entries by version, in insertion order."""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("versions", {})
+
+    def _write_manifest(self, versions: dict):
+        """Writes the manifest atomically (temporary file + rename)."""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"versions": versions}, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+    def get(self, version: str):
+        """
+        Loads a version and marks it as recently used.
+
+        Returns:
+            pd.DataFrame or None: The features, or None if the version is not stored.
+        """
+        versions = self.versions()
+        path = self.path(version)
+        if version not in versions or not path.exists():
+            return None
+
+        df = pd.read_parquet(path)
+        versions[version]["last_accessed"] = datetime.now().isoformat()
+        self._write_manifest(versions)
+        return df
+
+    def put(self, version: str, df: pd.DataFrame, metadata: dict = None) -> Path:
+        """
+        Stores a version, records it in the manifest and evicts old versions.
+
+        Args:
+            version (str): Version id (see `version_key`).
+            df (pd.DataFrame): Engineered features.
+            metadata (dict): Extra manifest fields (e.g. input file, original columns).
+
+        Returns:
+            Path: Parquet file of the stored version.
+        """
+        path = self.path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+        now = datetime.now().isoformat()
+        versions = self.versions()
+        versions.pop(version, None)
+        versions[version] = {
+            "created_at": now,
+            "last_accessed": now,
+            "size_bytes": path.stat().st_size,
+            "rows": len(df),
+            "columns": len(df.columns),
+            **(metadata or {})
+        }
+        self._write_manifest(versions)
+        self.evict(keep=version)
+        return path
+
+    def evict(self, keep: str = None) -> list:
+        """
+        Removes least recently used versions until the store is within
+        `max_versions` and `max_bytes`. `keep` is never removed.
+
+        Returns:
+            list: Removed versions.
+        """
+        versions = self.versions()
+        total_bytes = sum(entry.get("size_bytes", 0) for entry in versions.values())
+        # Stable sort: insertion order breaks ties between equal access times
+        candidates = sorted((v for v in versions if v != keep), key=lambda v: versions[v]["last_accessed"])
+
+        removed = []
+        for version in candidates:
+            over_count = self.max_versions is not None and len(versions) > self.max_versions
+            over_size = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not (over_count or over_size):
+                break
+            total_bytes -= versions.pop(version).get("size_bytes", 0)
+            shutil.rmtree(self.root / version, ignore_errors=True)
+            removed.append(version)
+
+        if removed:
+            self._write_manifest(versions)
+            logger.info("Feature store evicted %d version(s): %s", len(removed), removed)
+        return removed
@@ -6,11 +6,209 @@ import os
 import logging
 from datetime import datetime
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib
-# Use Agg backend for non-interactive plot generation
-matplotlib.use('Agg')
+import shutil
+import hashlib
+import multiprocessing
+from functools import lru_cache
+
+from src.calendar_dim import CalendarDimension
+from src.utils import save_json, setup_logging
+from src.training_matrix import export_training_matrix
+from src.feature_store import FeatureStore, feature_params
+from src.feature_registry import FeatureGraph, FeatureRegistry, FeatureSpec
+from src.window_features import window_feature_names, window_features
+
+# Calendar keys of a DatetimeIndex: key -> (extractor, number of table slots)
+CALENDAR_KEYS = {
+    'month': (lambda index: index.month, 13),
+    'dayofweek': (lambda index: index.dayofweek, 7),
+    'dayofyear': (lambda index: index.dayofyear, 367),
+    'weekofyear': (lambda index: index.isocalendar().week.to_numpy(), 54),
+}
+
+# Cyclical encodings: column -> (period, calendar key, period number of each key value).
+# Periods cover the largest key (day 366 of leap years, ISO week 53), so the last
+# day/week of the year encodes just before the first one instead of wrapping past it.
+CYCLICAL_PERIODS = {
+    'month': (12, 'month', lambda month: month),
+    'quarter': (4, 'month', lambda month: (month - 1) // 3 + 1),
+    'semester': (2, 'month', lambda month: (month - 1) // 6 + 1),
+    'dayofweek': (7, 'dayofweek', lambda day: day),
+    'dayofyear': (366, 'dayofyear', lambda day: day),
+    'weekofyear': (53, 'weekofyear', lambda week: week),
+}
+
+BUSINESS_FLAGS = ['is_novenas', 'is_primas', 'is_pandemic']
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def cyclical_table(col: str) -> np.ndarray:
+    """
+    Sine/cosine lookup table of a cyclical column, indexed by calendar key value.
+
+    Returns:
+        np.ndarray: Array of shape (key slots, 2) with the sin and cos columns.
+    """
+    period, key, to_period = CYCLICAL_PERIODS[col]
+    angle = 2 * np.pi * to_period(np.arange(CALENDAR_KEYS[key][1])) / period
+    table = np.column_stack([np.sin(angle), np.cos(angle)])
+    table.flags.writeable = False
+    return table
+
+
+def _cyclical(frame: pd.DataFrame, col: str) -> dict:
+    """
+    Sine and cosine encoding of one calendar component of the index.
+
+    The calendar key is extracted once per distinct date (long-format frames
+    repeat every date per series) and the encoding is an integer gather
+    from the precomputed table.
+    """
+    key = CYCLICAL_PERIODS[col][1]
+    codes, dates = pd.factorize(frame.index)
+    key_values = np.asarray(CALENDAR_KEYS[key][0](pd.DatetimeIndex(dates)), dtype=np.int64)
+    encoded = cyclical_table(col)[key_values[codes]]
+    return {f"{col}_sin": encoded[:, 0], f"{col}_cos": encoded[:, 1]}
+
+
+def _business_flag(frame: pd.DataFrame, flag: str, config: dict) -> dict:
+    """Monthly business-event flag from the calendar dimension."""
+    calendar = CalendarDimension.for_dates(config, frame.index)
+    return {flag: calendar.monthly(flag, frame.index, how='max').astype(int)}
+
+
+def _lag(frame: pd.DataFrame, col: str, lag: int, fill, groups=None) -> dict:
+    """Lag of one column within each series, keeping the column's float dtype."""
+    lagged = window_features(frame, [col], lags=[lag], fill_value=fill, groups=groups)[f"{col}_lag_{lag}"]
+    dtype = frame[col].dtype
+    return {lagged.name: lagged.astype(dtype) if pd.api.types.is_float_dtype(dtype) else lagged}
+
+
+def _lag_fill(marketing_lags, col: str, lag: int):
+    """Fill value of a marketing lag in the `feature_engineering.marketing_lags` entries."""
+    for cfg in marketing_lags or []:
+        if cfg['column'] == col and cfg['lag'] == lag:
+            return cfg.get('fill_value', 0)
+    return 0
+
+
+def _event_counts(frame: pd.DataFrame, counts: dict, config: dict) -> dict:
+    """Monthly number of days of each calendar event, aggregated in one pass."""
+    calendar = CalendarDimension.for_dates(config, frame.index)
+    values = calendar.monthly_many(list(counts.values()), frame.index, how='sum')
+    return {col: values[:, i].astype(int) for i, col in enumerate(counts)}
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a frame (columns, index and values), to detect in-place edits."""
+    digest = hashlib.sha256(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Arguments of window_features that determine its output columns
+WINDOW_NAME_KEYS = ['columns', 'lags', 'windows', 'stats', 'expanding']
+
+
+def window_params(config: dict, **overrides) -> dict:
+    """Arguments of `window_features` from `feature_engineering.window_features`, with overrides."""
+    window_cfg = config.get('feature_engineering', {}).get('window_features', {}) or {}
+    params = {
+        'columns': list(window_cfg.get('columns', [])),
+        'lags': list(window_cfg.get('lags', [])),
+        'windows': list(window_cfg.get('rolling_windows', [])),
+        'stats': list(window_cfg.get('rolling_stats', ['mean'])),
+        'expanding': list(window_cfg.get('expanding_stats', [])),
+        'shift': int(window_cfg.get('shift', 1)),
+        'fill_value': window_cfg.get('fill_value', 0),
+    }
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def build_registry(config: dict) -> FeatureRegistry:
+    """
+    Declares the feature catalog from config.yaml.
+
+    Every cyclical column, business flag and marketing lag is its own
+    feature, so a model only pays for the features it requests. Calendar
+    features (no input columns) only depend on the index, so they can also
+    be computed for future dates.
+
+    Compute functions read their settings from the `params` they receive,
+    so a config change reaches the computation and invalidates the cached
+    outputs; which features and output columns exist is fixed when the
+    registry is built.
+    """
+    fe_config = config.get('feature_engineering', {})
+    registry = FeatureRegistry()
+
+    for col in fe_config.get('cyclical_columns', []):
+        if col not in CYCLICAL_PERIODS:
+            logger.warning("Unknown cyclical column %s. Options: %s", col, list(CYCLICAL_PERIODS))
+            continue
+        registry.register(FeatureSpec(
+            f"{col}_cyclical", outputs=(f"{col}_sin", f"{col}_cos"),
+            compute=lambda frame, params, col=col: _cyclical(frame, col),
+            config_keys=('feature_engineering.cyclical_columns',), group='cyclical'
+        ))
+
+    # Novenas, Primas y Pandemia: mes marcado si algún día cae en la ventana del evento
+    enabled_flags = fe_config.get('binary_features') or {}
+    for flag in BUSINESS_FLAGS:
+        if enabled_flags.get(flag, True):
+            registry.register(FeatureSpec(
+                flag, outputs=(flag,),
+                compute=lambda frame, params, flag=flag: _business_flag(
+                    frame, flag, {**config, 'business_events': params['business_events']}
+                ),
+                config_keys=('business_events',), group='business_flags'
+            ))
+
+    # Días por evento en el mes, calculados sobre el calendario diario (ventanas de día exactas)
+    event_counts = dict(fe_config.get('event_counts') or {})
+    if event_counts:
+        registry.register(FeatureSpec(
+            'event_counts', outputs=tuple(event_counts),
+            compute=lambda frame, params: _event_counts(
+                frame, params['feature_engineering.event_counts'] or {},
+                {**config, 'business_events': params['business_events']}
+            ),
+            config_keys=('feature_engineering.event_counts', 'business_events'), group='event_counts'
+        ))
+
+    for cfg in fe_config.get('marketing_lags', []):
+        col, lag = cfg['column'], cfg['lag']
+        name = f"{col}_lag_{lag}"
+        registry.register(FeatureSpec(
+            name, outputs=(name,), inputs=(col,),
+            compute=lambda frame, params, groups=None, col=col, lag=lag:
+                _lag(frame, col, lag, _lag_fill(params['feature_engineering.marketing_lags'], col, lag), groups),
+            config_keys=('feature_engineering.marketing_lags',), group='marketing_lags', lookback=lag,
+            per_series=True
+        ))
+
+    window_cfg = window_params(config)
+    if window_cfg['columns']:
+        # Expanding statistics depend on the whole history
+        window_lookback = None if window_cfg['expanding'] else max(
+            window_cfg['lags'] + [w + window_cfg['shift'] - 1 for w in window_cfg['windows']] + [0]
+        )
+        registry.register(FeatureSpec(
+            'window_features', outputs=window_feature_names(**{k: window_cfg[k] for k in WINDOW_NAME_KEYS}),
+            inputs=window_cfg['columns'],
+            compute=lambda frame, params, groups=None: window_features(
+                frame, groups=groups,
+                **window_params({'feature_engineering': {'window_features': params['feature_engineering.window_features']}})
+            ),
+            config_keys=('feature_engineering.window_features',), group='window_features',
+            lookback=window_lookback, per_series=True
+        ))
+
+    return registry
+
 
 class FeatureEngineer:
     """
@@ -39,66 +237,129 @@ class FeatureEngineer:
         self.artifacts_path.mkdir(parents=True, exist_ok=True)
         self.figures_path.mkdir(parents=True, exist_ok=True)
 
+        # Versioned feature store (None when feature_engineering.store is disabled)
+        self.store = FeatureStore.from_config(config, self.base_dir)
+        self.feature_version = None
+        self.store_hit = False
+        self.figures_process = None
+        self.update_mode = None
+        self.appended_rows = 0
+        # Feature parameters of master_features.parquet, checked by incremental updates
+        self.params_path = self.output_path.with_suffix('.params.json')
+
+        matrix_cfg = config.get('feature_engineering', {}).get('training_matrix', {}) or {}
+        self.training_matrix_path = self.base_dir / matrix_cfg.get('path', Path(data_paths.get('processed', 'data/04_processed/')) / "training_matrix")
+
+        # Declarative feature catalog (see build_registry) and the graph of the current input frame
+        self.registry = build_registry(config)
+        self.graph = None
+        self._graph_result = None
+        self._graph_fingerprint = None
+
+        # Long-format masters: one row per (series keys, fecha)
+        multi_series_cfg = config.get('preprocessing', {}).get('multi_series', {}) or {}
+        self.series_keys = list(multi_series_cfg.get('keys') or [])
+
+    def series_groups(self, df: pd.DataFrame):
+        """
+        Contiguous integer series codes of a long-format frame.
+
+        Returns None for single-series frames (no series key column present).
+
+        Raises:
+            ValueError: If the rows are not sorted by (series keys, fecha).
+        """
+        keys = [key for key in self.series_keys if key in df.columns]
+        if not keys:
+            return None
+        codes = df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+        same_series = codes[1:] == codes[:-1]
+        dates = df.index.to_numpy()
+        if (~same_series).sum() != (codes.max() if len(codes) else 0) or not (dates[1:] > dates[:-1])[same_series].all():
+            raise ValueError(f"Multi-series features require rows sorted by {keys + [df.index.name or 'fecha']}")
+        return codes
+
+    def compute_features(self, df: pd.DataFrame, features=None) -> pd.DataFrame:
+        """
+        Computes the requested features (and their dependencies) on `df`.
+
+        Args:
+            df (pd.DataFrame): Master frame indexed by month. Long-format
+                masters (one row per series and month, sorted by series keys
+                and fecha) get lags and windows within each series and
+                calendar features computed once per month.
+            features (list): Feature names or output columns. None computes
+                the whole catalog.
+
+        One graph is kept per input frame: calls on the same frame, or on the
+        frame the previous call returned (chained `add_*` steps), reuse the
+        features and intermediates already computed as long as the base
+        columns are unchanged. A frame edited in place gets a new graph.
+        """
+        if not self._graph_reusable(df):
+            self.graph = FeatureGraph(self.registry, df, self.config, groups=self.series_groups(df))
+            self._graph_fingerprint = frame_fingerprint(df)
+        graph = self.graph
+
+        result = graph.compute(features)
+        if df is not graph.base:
+            new_cols = [col for col in result.columns if col not in df.columns]
+            result = pd.concat([df, result[new_cols]], axis=1)
+        self._graph_result = result
+        return result
+
+    def _graph_reusable(self, df: pd.DataFrame) -> bool:
+        """Whether `df` is the current graph's frame (or its last result) with the base columns unchanged."""
+        graph = self.graph
+        if graph is None or (df is not graph.base and df is not self._graph_result):
+            return False
+        base_cols = list(graph.base.columns)
+        if any(col not in df.columns for col in base_cols):
+            return False
+        return frame_fingerprint(df[base_cols]) == self._graph_fingerprint
+
     def add_cyclical_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Adds sine and cosine transformations for time-based features."""
         self.logger.info("Generating cyclical features...")
-        fe_config = self.config.get('feature_engineering', {})
-        cyclical_cols = fe_config.get('cyclical_columns', [])
-        
-        if 'month' in cyclical_cols:
-            df['month_sin'] = np.sin(2 * np.pi * df.index.month / 12)
-            df['month_cos'] = np.cos(2 * np.pi * df.index.month / 12)
-        
-        if 'quarter' in cyclical_cols:
-            df['quarter_sin'] = np.sin(2 * np.pi * df.index.quarter / 4)
-            df['quarter_cos'] = np.cos(2 * np.pi * df.index.quarter / 4)
-            
-        if 'semester' in cyclical_cols:
-            semester = (df.index.month - 1) // 6 + 1
-            df['semester_sin'] = np.sin(2 * np.pi * semester / 2)
-            df['semester_cos'] = np.cos(2 * np.pi * semester / 2)
-            
-        return df
+        return self.compute_features(df, self.registry.names(group='cyclical'))
 
     def add_business_flags(self, df: pd.DataFrame) -> pd.DataFrame:
         """Adds binary flags for business events and context."""
         self.logger.info("Generating business flags...")
-        biz_events = self.config.get('business_events', {})
-        
-        # Novenas (Diciembre)
-        df['is_novenas'] = (df.index.month == 12).astype(int)
-        
-        # Primas (Junio y Diciembre)
-        primas_months = biz_events.get('primas', {}).get('months', [6, 12])
-        df['is_primas'] = (df.index.month.isin(primas_months)).astype(int)
-        
-        # Pandemia
-        p_cfg = biz_events.get('pandemic', {})
-        p_start = pd.to_datetime(p_cfg.get('start_date', '2020-04-01'))
-        p_end = pd.to_datetime(p_cfg.get('end_date', '2021-12-31'))
-        df['is_pandemic'] = ((df.index >= p_start) & (df.index <= p_end)).astype(int)
-        
-        return df
+        return self.compute_features(df, self.registry.names(group='business_flags'))
+
+    def add_event_counts(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Adds monthly day counts of business events (novenas, primas, weekends, holidays, promo days)."""
+        self.logger.info("Generating event day counts...")
+        return self.compute_features(df, self.registry.names(group='event_counts'))
+
+    def add_window_features(self, df: pd.DataFrame, **overrides) -> pd.DataFrame:
+        """
+        Adds lag, rolling and expanding window features in one pass.
+
+        Args:
+            df (pd.DataFrame): Master frame indexed by month.
+            **overrides: Arguments of `window_features` replacing the
+                configured ones (e.g. a lag/window grid in hyperparameter search).
+        """
+        self.logger.info("Generating window features...")
+        params = window_params(self.config, **overrides)
+        if not params['columns']:
+            return df
+        return pd.concat([df, window_features(df, groups=self.series_groups(df), **params)], axis=1)
 
     def add_marketing_lags(self, df: pd.DataFrame) -> pd.DataFrame:
         """Adds lag features for marketing variables."""
         self.logger.info("Generating marketing lags...")
-        fe_config = self.config.get('feature_engineering', {})
-        mkt_lags = fe_config.get('marketing_lags', [])
-        
-        for cfg in mkt_lags:
-            col = cfg['column']
-            lag = cfg['lag']
-            fill_val = cfg.get('fill_value', 0)
-            
+        names = []
+        for name in self.registry.names(group='marketing_lags'):
+            col = self.registry.get(name).inputs[0]
             if col in df.columns:
-                new_col_name = f"{col}_lag_{lag}"
-                df[new_col_name] = df[col].shift(lag).fillna(fill_val)
-                self.logger.info(f"  - Created {new_col_name}")
+                names.append(name)
+                self.logger.info("  - Created %s", name)
             else:
-                self.logger.warning(f"Marketing column {col} not found for lag.")
-                
-        return df
+                self.logger.warning("Marketing column %s not found for lag.", col)
+        return self.compute_features(df, names)
 
     def generate_report(self, df: pd.DataFrame, original_cols: list):
         """Generates a robust JSON report of the phase."""
@@ -110,6 +371,14 @@ class FeatureEngineer:
             "timestamp": datetime.now().isoformat(),
             "input_file": str(self.input_path.name),
             "output_file": str(self.output_path.name),
+            "feature_store": {
+                "version": self.feature_version,
+                "cache_hit": self.store_hit
+            },
+            "update": {
+                "mode": self.update_mode,
+                "appended_rows": self.appended_rows
+            },
             "variables": {
                 "original_columns": original_cols,
                 "new_features": {col: str(df[col].dtype) for col in new_cols}
@@ -128,46 +397,267 @@ class FeatureEngineer:
         }
         
         report_file = self.artifacts_path / "phase_04_feature_engineering_prod.json"
-        with open(report_file, "w") as f:
-            json.dump(report, f, indent=4)
-        self.logger.info(f"Report saved to {report_file}")
+        save_json(report, report_file)
+        self.logger.info("Report saved to %s", report_file)
 
-    def run(self):
-        """Orchestrates the feature engineering pipeline."""
+    def run(self, features: list = None):
+        """
+        Orchestrates the feature engineering pipeline.
+
+        Args:
+            features (list): Feature names or output columns to compute, with
+                their dependencies. Defaults to `feature_engineering.features`
+                (None computes the whole catalog).
+        """
         self.logger.info("Starting Phase 4: Feature Engineering...")
+        fe_config = self.config.get('feature_engineering', {})
+        if features is None:
+            features = fe_config.get('features')
         
         # Load data
-        if not self.input_path.exists():
+        pinned = (fe_config.get('store', {}) or {}).get('version')
+        if not (self.store is not None and pinned) and not self.input_path.exists():
             raise FileNotFoundError(f"Cleansed data not found at: {self.input_path}")
+
+        if self.store is not None:
+            df = self._load_from_store(pinned, features)
+            if df is not None:
+                return df
         
         df = pd.read_parquet(self.input_path)
         original_cols = df.columns.tolist()
         
-        # Apply engineering
-        df = self.add_cyclical_features(df)
-        df = self.add_business_flags(df)
-        df = self.add_marketing_lags(df)
-        
-        # Generate Visualizations (Parity with Lab)
-        self.generate_figures(df)
+        # Apply engineering (only the requested features and their dependencies)
+        updated = None
+        if (fe_config.get('incremental', {}) or {}).get('enabled', False):
+            updated = self.update_incremental(df, features)
+        if updated is None:
+            self.update_mode = 'full'
+            df = self.compute_features(df, features)
+        else:
+            self.update_mode = 'incremental'
+            df = updated
+        self.logger.info("Computed %s new feature columns.", len(df.columns) - len(original_cols))
         
         # Final cleanup/validation
         nulls = df.isnull().sum().sum()
         if nulls > 0:
-            self.logger.warning(f"Engineered dataset contains {nulls} nulls. Investigating...")
+            self.logger.warning("Engineered dataset contains %s nulls. Investigating...", nulls)
             
         # Persistence
         df.to_parquet(self.output_path)
-        self.logger.info(f"Engineered data saved to {self.output_path}")
+        self.params_path.write_text(self._params_key(features), encoding="utf-8")
+        self.logger.info("Engineered data saved to %s", self.output_path)
+        if self.store is not None:
+            self.store.put(self.feature_version, df, {
+                "input_file": str(self.input_path.name),
+                "original_columns": original_cols
+            })
+            self.logger.info("Feature version %s stored in %s", self.feature_version, self.store.root)
+        self.export_training_matrix(df)
         
         # Reporting
         self.generate_report(df, original_cols)
+
+        # Visualizations (Parity with Lab), off the hot path: see feature_engineering.figures
+        self.figures_process = self.schedule_figures(df)
+        self.logger.info("Phase 4 completed successfully.")
+        return df
+
+    def schedule_figures(self, df: pd.DataFrame):
+        """
+        Renders the validation figures according to `feature_engineering.figures.mode`.
+
+        - skip: no rendering (production default); use `render_figures` on demand.
+        - inline: render now, in this process.
+        - background: render in a separate process from the written Parquet.
+
+        Returns:
+            multiprocessing.Process or None: The background process, if started.
+        """
+        mode = (self.config.get('feature_engineering', {}).get('figures', {}) or {}).get('mode', 'skip')
+        if mode == 'skip':
+            self.logger.info("Figure generation skipped (mode=skip).")
+            return None
+        if mode == 'inline':
+            self.render_figures(df)
+            return None
+        if mode != 'background':
+            raise ValueError(f"Unknown figures mode '{mode}'. Options: ['skip', 'inline', 'background']")
+
+        # spawn: the parent may hold logging threads, which fork would not carry safely
+        process = multiprocessing.get_context('spawn').Process(
+            target=_render_figures_process, args=(self.config,), name="feature-figures"
+        )
+        process.start()
+        self.logger.info("Figure generation started in background process %s.", process.pid)
+        return process
+
+    def figures_hash(self, df: pd.DataFrame) -> str:
+        """Content hash of the engineered frame the figures are rendered from."""
+        digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        digest.update(json.dumps([str(col) for col in df.columns]).encode())
+        return digest.hexdigest()
+
+    def render_figures(self, df: pd.DataFrame = None, force: bool = False) -> bool:
+        """
+        Renders the validation figures unless they are up to date.
+
+        Args:
+            df (pd.DataFrame): Engineered frame. Defaults to the written
+                `master_features.parquet`.
+            force (bool): Render even if the input hash has not changed.
+
+        Returns:
+            bool: True if the figures were rendered.
+        """
+        if df is None:
+            if not self.output_path.exists():
+                raise FileNotFoundError(f"Engineered data not found at: {self.output_path}")
+            df = pd.read_parquet(self.output_path)
+
+        stamp_file = self.figures_path / ".figures_hash"
+        input_hash = self.figures_hash(df)
+        if not force and stamp_file.exists() and stamp_file.read_text(encoding="utf-8") == input_hash:
+            self.logger.info("Figures up to date (input hash unchanged). Rendering skipped.")
+            return False
+
+        self.generate_figures(df)
+        stamp_file.write_text(input_hash, encoding="utf-8")
+        return True
+
+    def export_training_matrix(self, df: pd.DataFrame):
+        """
+        Writes the float32 training matrix (engineered features plus
+        `exogenous_to_keep`) if `feature_engineering.training_matrix.enabled`.
+
+        Returns:
+            dict or None: The matrix metadata, or None if disabled.
+        """
+        fe_config = self.config.get('feature_engineering', {})
+        matrix_cfg = fe_config.get('training_matrix', {}) or {}
+        if not matrix_cfg.get('enabled', False):
+            return None
+
+        target_col = self.config.get('project', {}).get('target_column', 'total_unidades_entregadas')
+        exogenous = set(fe_config.get('exogenous_to_keep', []))
+        feature_cols = [col for col in df.columns if col != target_col and (col in exogenous or col in self.registry)]
+        return export_training_matrix(
+            df, target_col, feature_cols, self.training_matrix_path,
+            dtype=matrix_cfg.get('dtype', 'float32'), metadata={"feature_version": self.feature_version}
+        )
+
+    def _params_key(self, features=None) -> str:
+        """Canonical feature parameters (config and requested features) of a feature dataset."""
+        return json.dumps({"config": feature_params(self.config), "features": features}, sort_keys=True, default=str)
+
+    def update_incremental(self, df_master: pd.DataFrame, features: list = None):
+        """
+        Computes features only for the months appended to the master since the last run.
+
+        New rows are engineered together with the look-back the requested
+        features declare (e.g. the lag of a marketing lag), then appended to
+        the existing `master_features.parquet`. Falls back to a full rebuild
+        (returns None) when there is no previous dataset, the feature
+        parameters changed, the previous months of the master changed, a
+        feature needs the whole history, or the master is multi-series.
+        With `feature_engineering.incremental.verify`, the result is checked
+        against a full rebuild.
+
+        Returns:
+            pd.DataFrame or None: Updated features, or None if a full rebuild is needed.
+        """
+        lookback = self.registry.lookback(features)
+        reason = None
+        if not self.output_path.exists() or not self.params_path.exists():
+            reason = "no previous feature dataset"
+        elif self.params_path.read_text(encoding="utf-8") != self._params_key(features):
+            reason = "feature parameters changed"
+        elif not df_master.index.is_unique:
+            reason = "multi-series master"
+        elif lookback is None:
+            reason = "features depend on the whole history"
+        if reason:
+            self.logger.info("Incremental update not possible (%s). Rebuilding all features...", reason)
+            return None
+
+        existing = pd.read_parquet(self.output_path)
+        n_old = len(existing)
+        base_cols = list(df_master.columns)
+        if n_old > len(df_master) or list(existing.columns[:len(base_cols)]) != base_cols \
+                or not existing[base_cols].equals(df_master.iloc[:n_old]):
+            self.logger.info("Master history changed since the last run. Rebuilding all features...")
+            return None
+
+        start = max(n_old - lookback, 0)
+        new_rows = self.compute_features(df_master.iloc[start:], features).iloc[n_old - start:]
+        self.appended_rows = len(new_rows)
+        updated = pd.concat([existing, new_rows]) if len(new_rows) else existing
+        self.logger.info("Incremental update: %s new month(s) computed with %s month(s) of look-back.", len(new_rows), n_old - start)
+
+        if (self.config.get('feature_engineering', {}).get('incremental', {}) or {}).get('verify', False):
+            full = self.compute_features(df_master, features)
+            try:
+                pd.testing.assert_frame_equal(updated, full, check_freq=False)
+            except AssertionError as e:
+                self.logger.warning("Incremental update differs from a full rebuild; using the full rebuild. %s", e)
+                self.appended_rows = 0
+                return None
+            self.logger.info("Incremental update matches a full rebuild.")
+        return updated
+
+    def _load_from_store(self, pinned: str = None, features: list = None):
+        """
+        Resolves the feature version and loads it from the store.
+
+        The version is `pinned` when given, otherwise the hash of the input
+        master file, the feature configuration and the requested `features`.
+        On a hit the stored features are also published as
+        `master_features.parquet` and the report is refreshed, without
+        re-engineering or re-plotting.
+
+        Returns:
+            pd.DataFrame or None: The stored features, or None on a cache miss.
+
+        Raises:
+            FileNotFoundError: If a pinned version is not in the store.
+        """
+        key_config = self.config
+        if features is not None:
+            key_config = {**self.config, 'feature_engineering': {**self.config.get('feature_engineering', {}), 'features': list(features)}}
+        self.feature_version = pinned or self.store.version_key(self.input_path, key_config)
+        df = self.store.get(self.feature_version)
+        if df is None:
+            if pinned:
+                raise FileNotFoundError(f"Feature version '{pinned}' not found in {self.store.root}")
+            self.logger.info("Feature store miss for version %s. Engineering features...", self.feature_version)
+            return None
+
+        self.store_hit = True
+        self.update_mode = 'store'
+        self.logger.info("Feature store hit: version %s (engineering skipped)", self.feature_version)
+        shutil.copyfile(self.store.path(self.feature_version), self.output_path)
+        # A pinned version may come from other parameters: the next incremental update rebuilds
+        if pinned:
+            self.params_path.unlink(missing_ok=True)
+        else:
+            self.params_path.write_text(self._params_key(features), encoding="utf-8")
+        original_cols = self.store.versions()[self.feature_version].get("original_columns", [])
+        self.export_training_matrix(df)
+        self.generate_report(df, original_cols)
         self.logger.info("Phase 4 completed successfully.")
         return df
 
     def generate_figures(self, df: pd.DataFrame):
         """Generates validation plots for the engineered features."""
         self.logger.info("Generating validation figures...")
+        # Plotting libraries are only imported when figures are actually rendered
+        import matplotlib
+        # Use Agg backend for non-interactive plot generation
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         target_col = self.config.get('project', {}).get('target_column', 'total_unidades_entregadas')
         
         # Set style from config if available
@@ -212,4 +702,10 @@ class FeatureEngineer:
             plt.savefig(self.figures_path / "03_correlacion_features.png")
             plt.close()
         
-        self.logger.info(f"Figures saved to {self.figures_path}")
+        self.logger.info("Figures saved to %s", self.figures_path)
+
+
+def _render_figures_process(config: dict):
+    """Entry point of the background figure process (module level, so it can be spawned)."""
+    setup_logging(config)
+    FeatureEngineer(config).render_figures()
@@ -0,0 +1,217 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.feature_registry import FeatureGraph
+from src.features import build_registry, window_params
+from src.window_features import window_features
+
+logger = logging.getLogger(__name__)
+
+
+def ma_projection_weights(window: int, horizon: int) -> np.ndarray:
+    """
+    Coefficients of the recursive moving-average projection.
+
+    Each projected month is the mean of the previous `window` months,
+    observed or projected, so every step is a fixed linear combination of
+    the last `window` observations. Row h holds the weights of step h + 1
+    (oldest observation first).
+
+    Returns:
+        np.ndarray: Array of shape (horizon, window).
+    """
+    if window < 1:
+        raise ValueError(f"Macro projection window must be >= 1, got {window}")
+    state = np.eye(window)
+    weights = np.empty((horizon, window))
+    for step in range(horizon):
+        weights[step] = state.mean(axis=0)
+        state = np.vstack([state[1:], weights[step]])
+    return weights
+
+
+def project_moving_average(values: np.ndarray, positions, window: int, horizon: int) -> np.ndarray:
+    """
+    Recursive MA projection of every column from many origins at once.
+
+    Args:
+        values: Monthly history, rows x columns.
+        positions: Row position of each origin (last observed month).
+        window (int): Months averaged per step.
+        horizon (int): Months projected.
+
+    Returns:
+        np.ndarray: Array of shape (origins, horizon, columns).
+
+    Raises:
+        ValueError: If an origin has fewer than `window` months of history.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.int64)
+    if positions.size and positions.min() < window - 1:
+        raise ValueError(f"Macro projection needs {window} months of history before every origin")
+
+    windows = values[positions[:, None] + np.arange(1 - window, 1)]
+    return np.einsum("hw,owc->ohc", ma_projection_weights(window, horizon), windows)
+
+
+class FutureExogBuilder:
+    """
+    Builds the exogenous matrix of the forecast horizon.
+
+    For every origin (last observed month) and every step of the horizon it
+    produces, in one vectorized call:
+    - Calendar features of the registry (cyclical encodings, business flags),
+      computed once per distinct future month.
+    - Marketing lags and window features, read from the history up to the
+      origin and from the known plans after it.
+    - Macro columns projected with `business_events.macro_projection`.
+    - Plan columns (known future values, e.g. investment and promo days).
+
+    Backtesting passes many origins at once; serving passes the last month
+    and takes `.xs(origin, level='origin')` as the exog of `predict`.
+    """
+
+    def __init__(self, config: dict, registry=None):
+        self.config = config
+        self.registry = registry if registry is not None else build_registry(config)
+
+        fe_config = config.get('feature_engineering', {})
+        exog_cfg = fe_config.get('future_exog', {}) or {}
+        self.macro_columns = list(exog_cfg.get('macro_columns', []))
+        self.plan_columns = list(exog_cfg.get('plan_columns', []))
+        self.plan_fill_value = exog_cfg.get('plan_fill_value', 0)
+        self.marketing_lags = fe_config.get('marketing_lags', [])
+
+        projection = config.get('business_events', {}).get('macro_projection', {}) or {}
+        self.projection_method = str(projection.get('method', 'MA')).upper()
+        self.projection_window = int(projection.get('window_size', 2))
+        self.horizon = int(config.get('validation', {}).get('horizon_months', 6))
+
+    def future_index(self, origins, horizon: int) -> pd.MultiIndex:
+        """(origin, fecha) index of the `horizon` months after every origin."""
+        origins = pd.DatetimeIndex(origins)
+        months = origins.values.astype('datetime64[M]')[:, None] + np.arange(1, horizon + 1)
+        dates = pd.DatetimeIndex(months.ravel().astype('datetime64[ns]'))
+        return pd.MultiIndex.from_arrays([origins.repeat(horizon), dates], names=['origin', 'fecha'])
+
+    def build(self, history: pd.DataFrame, origins=None, horizon: int = None, plans: pd.DataFrame = None, features=None) -> pd.DataFrame:
+        """
+        Returns the future exog matrix for every origin.
+
+        Args:
+            history (pd.DataFrame): Monthly master (single series, indexed by fecha).
+            origins: Last observed month of each forecast. Defaults to the last month of `history`.
+            horizon (int): Months ahead. Defaults to `validation.horizon_months`.
+            plans (pd.DataFrame): Known future values of the plan columns, indexed by fecha.
+                Missing months are filled with `plan_fill_value`.
+            features (list): Registry features to include. Defaults to
+                `feature_engineering.features` (None = whole catalog).
+
+        Returns:
+            pd.DataFrame: One row per (origin, fecha).
+
+        Raises:
+            ValueError: If the history is not a single monthly series, an origin is
+                not in the history or the projection method is unknown.
+        """
+        if not history.index.is_unique:
+            raise ValueError("Future exog needs a single-series history indexed by fecha")
+        if self.projection_method != 'MA':
+            raise ValueError(f"Unknown macro projection method '{self.projection_method}'. Options: ['MA']")
+
+        history = history.sort_index()
+        horizon = self.horizon if horizon is None else int(horizon)
+        origins = pd.DatetimeIndex([history.index[-1]] if origins is None else origins)
+        positions = history.index.get_indexer(origins)
+        if (positions < 0).any():
+            raise ValueError(f"Origins not in history: {list(origins[positions < 0].date)}")
+        if features is None:
+            features = self.config.get('feature_engineering', {}).get('features')
+
+        index = self.future_index(origins, horizon)
+        dates = index.get_level_values('fecha')
+        origin_months = np.repeat(origins.values.astype('datetime64[M]'), horizon)
+        columns = {}
+
+        # Calendar features only depend on the date: computed once per distinct month
+        specs = self.registry.resolve(features)
+        calendar_specs = [spec.name for spec in specs if not spec.inputs]
+        if calendar_specs:
+            unique_dates = dates.unique().sort_values()
+            calendar = FeatureGraph(self.registry, pd.DataFrame(index=unique_dates), self.config).compute(calendar_specs)
+            gather = unique_dates.get_indexer(dates)
+            for col in calendar.columns:
+                columns[col] = calendar[col].to_numpy()[gather]
+
+        # Marketing lags: history up to the origin, plans after it
+        lag_names = {spec.name for spec in specs if spec.group == 'marketing_lags'}
+        for cfg in self.marketing_lags:
+            col, lag, fill = cfg['column'], cfg['lag'], cfg.get('fill_value', 0)
+            name = f"{col}_lag_{lag}"
+            if name not in lag_names:
+                continue
+            source = dates.values.astype('datetime64[M]') - lag
+            observed = self._lookup(history, col, source, fill)
+            planned = self._lookup(plans, col, source, self.plan_fill_value)
+            columns[name] = np.where(source <= origin_months, observed, planned)
+
+        if any(spec.group == 'window_features' for spec in specs):
+            columns.update(self._window_columns(history, plans, positions, dates, horizon))
+
+        skipped = [spec.name for spec in specs if spec.inputs and spec.group not in ('marketing_lags', 'window_features')]
+        if skipped:
+            logger.warning("Features without a future projection skipped: %s", skipped)
+
+        # Macro: recursive moving average from each origin
+        macro_cols = [col for col in self.macro_columns if col in history.columns]
+        if macro_cols:
+            projected = project_moving_average(history[macro_cols].to_numpy(dtype=np.float64, na_value=np.nan), positions, self.projection_window, horizon)
+            for i, col in enumerate(macro_cols):
+                columns[col] = projected[:, :, i].ravel()
+
+        for col in self.plan_columns:
+            columns[col] = self._lookup(plans, col, dates.values.astype('datetime64[M]'), self.plan_fill_value)
+
+        return pd.DataFrame(columns, index=index)
+
+    def _window_columns(self, history, plans, positions, dates, horizon: int) -> dict:
+        """
+        Window features of the horizon rows.
+
+        Every origin gets its own series (history up to the origin followed by
+        the planned horizon values). All series are stacked and processed by one
+        `window_features` call with the origin as group.
+        """
+        params = window_params(self.config)
+        cols = params['columns']
+        lengths = positions + 1 + horizon
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        within = np.arange(lengths.sum()) - offsets
+        is_future = within > np.repeat(positions, lengths)
+
+        stacked = np.empty((len(within), len(cols)))
+        stacked[~is_future] = history.reindex(columns=cols).to_numpy(dtype=np.float64, na_value=np.nan)[within[~is_future]]
+        months = dates.values.astype('datetime64[M]')
+        for i, col in enumerate(cols):
+            stacked[is_future, i] = self._lookup(plans, col, months, self.plan_fill_value)
+
+        result = window_features(pd.DataFrame(stacked, columns=cols), groups=np.repeat(np.arange(len(positions)), lengths), **params)
+        return {col: result[col].to_numpy()[is_future] for col in result.columns}
+
+    @staticmethod
+    def _lookup(frame, col: str, months: np.ndarray, fill) -> np.ndarray:
+        """Values of `col` at the given months (missing months, columns or nulls -> `fill`)."""
+        if frame is None or col not in frame.columns:
+            return np.full(len(months), fill, dtype=np.float64)
+        frame_months = frame.index.values.astype('datetime64[M]')
+        order = np.argsort(frame_months, kind='stable')
+        frame_months = frame_months[order]
+        values = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+
+        pos = np.clip(np.searchsorted(frame_months, months), 0, max(len(frame_months) - 1, 0))
+        found = (frame_months[pos] == months) if len(frame_months) else np.zeros(len(months), dtype=bool)
+        result = np.where(found, values[pos] if len(values) else fill, fill)
+        return np.where(np.isnan(result), fill, result)
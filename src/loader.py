@@ -1,7 +1,6 @@
 import pandas as pd
 import numpy as np
 import yaml
-import json
 import logging
 from pathlib import Path
 from datetime import datetime, date
@@ -9,9 +8,9 @@ from typing import Dict, Any, List, Optional
 import os
 
 from src.connectors.supabase_connector import get_supabase_client
+from src.utils import save_json
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Handlers are configured once by src.utils.setup_logging
 logger = logging.getLogger(__name__)
 
 class DataLoader:
@@ -31,7 +30,7 @@ class DataLoader:
             if response.data:
                 return response.data[0][date_col]
         except Exception as e:
-            logger.error(f"Error getting max date for {table_name}: {e}")
+            logger.error("Error getting max date for %s: %s", table_name, e)
         return None
 
     def download_data(self, table_name: str, date_col: str, greater_than: Optional[str] = None) -> pd.DataFrame:
@@ -75,13 +74,13 @@ class DataLoader:
                     if isinstance(max_local, (pd.Timestamp, date, datetime)):
                         max_local = max_local.strftime('%Y-%m-%d')
             except Exception as e:
-                logger.warning(f"Error reading local file {local_file}: {e}. Triggering full update.")
+                logger.warning("Error reading local file %s: %s. Triggering full update.", local_file, e)
                 max_local = None
 
         final_df = local_df
         
         if full_update or max_local is None:
-            logger.info(f"Full update for {table_name}")
+            logger.info("Full update for %s", table_name)
             df_remote = self.download_data(table_name, date_col)
             if not df_remote.empty:
                 final_df = df_remote
@@ -95,7 +94,7 @@ class DataLoader:
                  # Check if remote > local
                  # Simple string comparison usually works for ISO dates, but be careful
                  if max_remote > max_local:
-                     logger.info(f"Incremental update for {table_name} from {max_local}")
+                     logger.info("Incremental update for %s from %s", table_name, max_local)
                      df_new = self.download_data(table_name, date_col, greater_than=max_local)
                      if not df_new.empty:
                          final_df = pd.concat([local_df, df_new]).drop_duplicates(subset=[date_col]) # simplistic dedup
@@ -448,7 +447,7 @@ class DataLoader:
         date_col = self.config['data']['date_column']
         
         for table in tables:
-            logger.info(f"Processing table: {table}")
+            logger.info("Processing table: %s", table)
             df = self.sync_table(table, date_col, full_update)
             
             if not df.empty:
@@ -465,7 +464,7 @@ class DataLoader:
                 
                 self.table_analysis[table] = stats
             else:
-                logger.warning(f"Table {table} is empty after sync.")
+                logger.warning("Table %s is empty after sync.", table)
         
         # Generate Report
         report = {
@@ -477,7 +476,6 @@ class DataLoader:
         }
         
         report_file = self.report_path / "phase_01_discovery.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=4, ensure_ascii=False)
+        save_json(report, report_file)
             
-        logger.info(f"Report generated at {report_file}")
+        logger.info("Report generated at %s", report_file)
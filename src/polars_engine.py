@@ -0,0 +1,412 @@
+import logging
+import pandas as pd
+import polars as pl
+import polars.selectors as cs
+import pyarrow as pa
+
+from src.calendar_dim import CalendarDimension
+from src.preprocessor import Preprocessor, FINANCIAL_OUTPUTS
+
+logger = logging.getLogger(__name__)
+
+# Polars expressions for `preprocessing.aggregation_rules`. `first`/`last`
+# skip nulls, like pandas GroupBy.first/last.
+AGGREGATIONS = {
+    "sum": lambda col: pl.col(col).sum(),
+    "mean": lambda col: pl.col(col).mean(),
+    "median": lambda col: pl.col(col).median(),
+    "min": lambda col: pl.col(col).min(),
+    "max": lambda col: pl.col(col).max(),
+    "count": lambda col: pl.col(col).count(),
+    "first": lambda col: pl.col(col).drop_nulls().first(),
+    "last": lambda col: pl.col(col).drop_nulls().last(),
+}
+
+
+def _over(expr: pl.Expr, keys: list) -> pl.Expr:
+    """Evaluates an order-dependent expression per series (whole frame if no keys)."""
+    return expr.over(keys) if keys else expr
+
+
+class PolarsPreprocessor(Preprocessor):
+    """
+    Polars execution backend for the preprocessing pipeline.
+
+    Every daily stage of `Preprocessor` (schema enforcement, dedup keep-last,
+    min_date filter, sentinel nulling, reindexing, business imputation,
+    financial recalculation and monthly aggregation) is expressed as one lazy
+    Polars query per source. All plans and their audit counts are executed
+    together with `pl.collect_all`, so the optimizer pushes projections and
+    predicates into the Parquet scan and runs sources and groups on all cores.
+
+    The monthly frames are handed back to pandas: unification, post-merge
+    imputation, the anti-leakage rule and the report reuse the reference
+    implementation, which keeps the output identical to the pandas engine.
+    """
+
+    def run(self):
+        """
+        Executes the preprocessing pipeline on the Polars engine.
+        """
+        logger.info("Starting Polars Preprocessing Pipeline...")
+        try:
+            self._run_stage(self._scan_schemas)
+            self._run_stage(self._validate_contract)
+            self._run_stage(self._standardize_names)
+            self._run_stage(self._enforce_schema)
+            self._run_stage(self._execute_plans)
+            df_master = self._run_stage(self._unify_sources)
+            df_master = self._run_stage(self._impute_post_merge, df_master)
+            df_master = self._run_stage(self._apply_anti_leakage_rule, df_master)
+            self._run_stage(self._export_and_report, df_master)
+        finally:
+            self.profiler.close()
+        logger.info("Polars Preprocessing Pipeline Completed.")
+
+    def _min_date(self):
+        filters = self.config.get("preprocessing", {}).get("filters", {})
+        return pd.to_datetime(filters.get("min_date", "2018-01-01"))
+
+    def _execute_plans(self):
+        """Builds the lazy plan of every source and collects monthly frames and stats."""
+        logger.info("Building lazy query plans...")
+        cleaned = {key: self._clean_plan(key) for key in self.files}
+
+        # Scan and dedup run once: the daily plans and their audit queries
+        # all start from the materialized frame instead of re-reading Parquet
+        results = iter(pl.collect_all(
+            [query for plan in cleaned.values() for query in (plan["deduped"], plan["counts"])]
+        ))
+        for plan in cleaned.values():
+            deduped, counts = next(results), next(results)
+            plan["counts"] = counts.row(0, named=True)
+            plan["counts"]["rows_deduped"] = deduped.height
+            plan["clean"] = deduped.lazy() if plan["pushdown"] else deduped.lazy().filter(plan["is_recent"])
+
+        # The reindex grid needs the latest date across sources
+        max_dates = pl.collect_all([plan["clean"].select(pl.col("fecha").max()) for plan in cleaned.values()])
+        max_dates = [frame.item() for frame in max_dates if frame.item() is not None]
+        global_max_date = pd.Timestamp(max(max_dates)) if max_dates else pd.Timestamp.now().normalize()
+
+        queries = []
+        for key, plan in cleaned.items():
+            plan.update(self._daily_plan(key, plan, global_max_date))
+            queries += [plan["monthly"], plan["audit"]]
+
+        logger.info("Executing plans (collect_all)...")
+        results = iter(pl.collect_all(queries))
+        for key, plan in cleaned.items():
+            monthly, audit = next(results), next(results)
+            self._record_stats(key, plan, audit.row(0, named=True))
+            if "_recalc_incomplete" in monthly.columns:
+                self.recalc_stats["incomplete"] = int(monthly["_recalc_incomplete"].sum())
+                monthly = monthly.drop("_recalc_incomplete")
+            self.monthly_dfs[key] = self._to_monthly_pandas(key, monthly, plan["keys"])
+
+        logger.info("Cleaning Statistics: %s", self.stats_cleaning)
+        logger.info("Sentinels replaced: %s", self.sentinel_stats)
+        logger.info("Rows added by reindexing: %s", self.reindex_stats)
+        logger.info("Aggregation completed.")
+
+    def _clean_plan(self, key):
+        """
+        Lazy scan of one source with renaming, schema enforcement, `fecha`
+        parsing and dedup keep-last.
+
+        As in the pandas engine, the min_date filter runs before
+        deduplication when it can be pushed into the reader (timestamp/date
+        `fecha`) and after it otherwise (`_execute_plans` applies it then).
+        Exact duplicates need no pass of their own: keep-last on
+        (keys, fecha) leaves the same rows and the same counts.
+        """
+        dataset, columns, columns_skipped, date_filter = self._scan_plan(key)
+        schema = dataset.schema
+        rename_map = self.config.get("preprocessing", {}).get("rename_map") or {}
+        template = list(self.dataframes[key].columns)
+        keys = [k for k in self.series_keys if k in template]
+        series_cols = keys + ["fecha"]
+        min_date = self._min_date()
+
+        selected = []
+        for col in columns or schema.names:
+            name = rename_map.get(col, col).lower().replace(" ", "_")
+            if name in template:
+                selected.append(pl.col(col).alias(name))
+        raw = pl.scan_parquet(self.files[key]).select(selected).with_columns(cs.float().fill_nan(None))
+
+        fecha_type = schema.field("fecha").type if "fecha" in schema.names else None
+        if fecha_type is not None and pa.types.is_string(fecha_type):
+            raw = raw.with_columns(pl.col("fecha").str.to_datetime())
+        elif fecha_type is not None and pa.types.is_date(fecha_type):
+            raw = raw.with_columns(pl.col("fecha").cast(pl.Datetime("us")))
+
+        is_recent = pl.col("fecha") >= pl.lit(min_date.to_pydatetime())
+        scanned = raw.filter(is_recent) if date_filter is not None else raw
+        deduped = (
+            scanned.unique(subset=series_cols, keep="last", maintain_order=True)
+            .sort(series_cols, maintain_order=True)
+        )
+
+        counts = pl.concat([
+            raw.select(pl.len().alias("rows_total")),
+            scanned.select(pl.len().alias("rows_scanned")),
+        ], how="horizontal")
+        return {
+            "keys": keys,
+            "deduped": deduped,
+            "counts": counts,
+            "is_recent": is_recent,
+            "pushdown": date_filter is not None,
+            "columns_read": columns or schema.names,
+            "columns_skipped": columns_skipped
+        }
+
+    def _daily_plan(self, key, plan, global_max_date):
+        """Adds sentinel nulling, reindexing, imputation and monthly aggregation to a source plan."""
+        keys = plan["keys"]
+        clean, sentinel_counts = self._null_sentinels(key, plan["clean"], keys)
+
+        dates = self._date_grid(key, self._min_date(), global_max_date)
+        grid = pl.LazyFrame({"fecha": dates})
+        grid = grid.with_columns(pl.col("fecha").cast(clean.collect_schema()["fecha"]))
+        if keys:
+            # Multi-series: every observed series gets the full date grid
+            skeleton = clean.select(keys).unique().sort(keys).join(grid, how="cross")
+        else:
+            skeleton = grid
+        full = skeleton.join(clean, on=keys + ["fecha"], how="left").sort(keys + ["fecha"], maintain_order=True)
+
+        imputed = self._impute_plan(key, full, keys, global_max_date)
+        monthly = self._monthly_plan(key, imputed, keys)
+
+        # Audit counts of the reindexed frame without materializing it: rows
+        # added by the grid are null in every value column
+        values = [col for col in clean.collect_schema().names() if col not in keys and col != "fecha"]
+        n_series = pl.struct(keys).n_unique() if keys else pl.lit(1, dtype=pl.UInt32)
+        audit = pl.concat([
+            clean.select(pl.len().alias("rows_clean"), n_series.alias("n_series")),
+            clean.join(grid, on="fecha", how="semi").select(
+                pl.len().alias("rows_on_grid"), *[pl.col(col).null_count() for col in values]
+            ),
+            sentinel_counts,
+        ], how="horizontal")
+        return {
+            "numeric": [col for col, dtype in full.collect_schema().items() if dtype.is_numeric() and col not in keys],
+            "values": values,
+            "grid_size": len(dates),
+            "monthly": monthly,
+            "audit": audit
+        }
+
+    def _null_sentinels(self, key, lf, keys):
+        """Replaces sentinel values with null. Returns (plan, per-column replacement counts)."""
+        sentinel_values = self.config.get("quality", {}).get("sentinel_values", {})
+        numeric_sentinels = sentinel_values.get("numeric", [])
+        text_sentinels = sentinel_values.get("text", [])
+
+        replacements = {}
+        for col, dtype in lf.collect_schema().items():
+            if col in keys or col == "fecha":
+                continue
+            if dtype.is_numeric():
+                values = [v for v in numeric_sentinels if not (key == "macro" and col == "confianza_consumidor" and v == -1)]
+                if values:
+                    replacements[col] = pl.col(col).cast(pl.Float64).is_in([float(v) for v in values])
+            elif dtype in (pl.String, pl.Categorical) and text_sentinels:
+                replacements[col] = pl.col(col).cast(pl.String).is_in([str(v) for v in text_sentinels])
+
+        if not replacements:
+            return lf, pl.LazyFrame({"replaced": [0]})
+        counts = lf.select(pl.sum_horizontal([mask.sum() for mask in replacements.values()]).alias("replaced"))
+        lf = lf.with_columns([
+            pl.when(mask).then(None).otherwise(pl.col(col)).alias(col) for col, mask in replacements.items()
+        ])
+        return lf, counts
+
+    def _calendar_frame(self, global_max_date, fecha_dtype):
+        """Business calendar (promo/campaign windows and labels) as a Polars frame."""
+        calendar = CalendarDimension.for_dates(self.config, [self._min_date(), global_max_date])
+        dates = calendar.frame.index
+        return pl.LazyFrame({
+            "fecha": dates,
+            "_promo_window": calendar.lookup("is_promo_window", dates).astype(bool),
+            "_campaign_window": calendar.lookup("is_campaign_window", dates).astype(bool),
+            "_campaign_id": calendar.lookup("campaign_id", dates).astype("int32"),
+            "_campaign_label": calendar.campaign_label(dates).astype(str),
+        }).with_columns(pl.col("fecha").cast(fecha_dtype)), calendar.default_label
+
+    def _impute_plan(self, key, full, keys, global_max_date):
+        """Business imputation of one source, mirroring `Preprocessor._impute_<source>`."""
+        schema = full.collect_schema()
+        columns = list(schema.names())
+
+        if key == "macro":
+            strategy, window = self.macro_imputation["strategy"], self.macro_imputation["window"]
+            numeric = [col for col, dtype in schema.items() if dtype.is_numeric() and col not in keys]
+            return full.with_columns([self._fill_expr(col, strategy, window, keys) for col in numeric])
+
+        if key == "promo":
+            if "es_promo" not in columns:
+                return full
+            calendar, _ = self._calendar_frame(global_max_date, schema["fecha"])
+            return full.join(calendar, on="fecha", how="left").with_columns(
+                pl.col("es_promo").fill_null(pl.col("_promo_window").cast(schema["es_promo"]))
+            ).select(columns)
+
+        if key == "marketing":
+            return self._impute_marketing_plan(full, keys, columns, global_max_date)
+
+        if key == "ventas":
+            return self._impute_ventas_plan(full, keys, columns)
+        return full
+
+    def _fill_expr(self, col, strategy, window, keys):
+        """Polars equivalent of the `src.imputation` strategies for one column."""
+        c = pl.col(col).cast(pl.Float64)
+        if strategy == "rolling_mean":
+            filled = c.fill_null(_over(c.rolling_mean(window, min_samples=1).shift(1), keys))
+            return _over(filled.backward_fill(), keys).alias(col)
+        if strategy in ("interpolate", "linear"):
+            return _over(c.interpolate().forward_fill().backward_fill(), keys).alias(col)
+        if strategy in ("mean", "median"):
+            return c.fill_null(_over(getattr(c, strategy)(), keys)).alias(col)
+        raise ValueError(f"Unknown imputation strategy '{strategy}'")
+
+    def _impute_marketing_plan(self, full, keys, columns, global_max_date):
+        calendar, default_label = self._calendar_frame(global_max_date, full.collect_schema()["fecha"])
+        lf = full.join(calendar, on="fecha", how="left")
+        target = "ciclo" if "ciclo" in columns else "campana"
+
+        exprs = []
+        if target in columns:
+            has_inv = (pl.col("inversion_facebook").fill_null(0) > 0) | (pl.col("inversion_instagram").fill_null(0) > 0)
+            in_campaign = pl.col("_campaign_label") != default_label
+            exprs.append(
+                pl.when(pl.col(target).is_null() & has_inv & in_campaign).then(pl.col("_campaign_label"))
+                .when(pl.col(target).is_null()).then(pl.lit(default_label))
+                .otherwise(pl.col(target).cast(pl.String)).alias(target)
+            )
+        # Investment gaps: interpolated per campaign-window segment, 0 outside windows
+        window_id = pl.when(pl.col("_campaign_window")).then(pl.col("_campaign_id")).otherwise(-1)
+        lf = lf.with_columns(_over(window_id.ne_missing(window_id.shift()).cum_sum(), keys).alias("_segment"))
+        for col in ["inversion_facebook", "inversion_instagram"]:
+            if col in columns:
+                interpolated = pl.col(col).cast(pl.Float64).interpolate().forward_fill().backward_fill()
+                exprs.append(
+                    pl.when(pl.col(col).is_null() & pl.col("_campaign_window"))
+                    .then(interpolated.over(keys + ["_segment"]).fill_null(0.0))
+                    .when(pl.col(col).is_null()).then(0.0)
+                    .otherwise(pl.col(col)).alias(col)
+                )
+        lf = lf.with_columns(exprs)
+
+        total = "inversion_marketing_total" if "inversion_marketing_total" in columns else "inversion_total_diaria"
+        if total in columns and "inversion_facebook" in columns and "inversion_instagram" in columns:
+            lf = lf.with_columns((pl.col("inversion_facebook") + pl.col("inversion_instagram")).alias(total))
+        return lf.select(columns)
+
+    def _impute_ventas_plan(self, full, keys, columns):
+        total = "total_unidades_entregadas"
+        lf = full.with_columns(pl.col(total).is_null().alias("_imputed"))
+
+        exprs = []
+        for col in ["precio_unitario_full", "costo_unitario"]:
+            if col in columns:
+                exprs.append(_over(pl.col(col).forward_fill().backward_fill(), keys).alias(col))
+        if total in columns:
+            units = _over(pl.col(total).cast(pl.Float64).interpolate().forward_fill(), keys).fill_null(0)
+            target_dtype = self._dtype_map("ventas").get(total)
+            if target_dtype and pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(target_dtype)):
+                # Compact dtype policy: unit counts stay integers
+                units = units.round()
+            exprs.append(units.alias(total))
+        for col in ["unidades_promo_pagadas", "unidades_promo_bonificadas"]:
+            if col in columns:
+                exprs.append(pl.col(col).fill_null(0))
+        lf = lf.with_columns(exprs)
+
+        if "unidades_precio_normal" in columns:
+            residual = pl.col(total) - (pl.col("unidades_promo_pagadas") + pl.col("unidades_promo_bonificadas"))
+            lf = lf.with_columns(pl.col("unidades_precio_normal").fill_null(residual).clip(lower_bound=0))
+
+        if self.config.get("preprocessing", {}).get("recalc_financials", False):
+            imputed = pl.col("_imputed")
+            costo = pl.col(total) * pl.col("costo_unitario")
+            ingresos = (pl.col("unidades_precio_normal") + pl.col("unidades_promo_pagadas")) * pl.col("precio_unitario_full")
+            lf = lf.with_columns(
+                pl.when(imputed).then(costo).otherwise(pl.col("costo_total")).alias("costo_total"),
+                pl.when(imputed).then(ingresos).otherwise(pl.col("ingresos_totales")).alias("ingresos_totales"),
+            ).with_columns(
+                pl.when(imputed).then(pl.col("ingresos_totales") - pl.col("costo_total"))
+                .otherwise(pl.col("utilidad")).alias("utilidad")
+            )
+            # Recalculated rows left incomplete, summed by the monthly plan for the report
+            incomplete = imputed & pl.any_horizontal([pl.col(col).is_null() for col in FINANCIAL_OUTPUTS])
+            return lf.with_columns(incomplete.alias("_recalc_incomplete")).select(columns + ["_recalc_incomplete"])
+        return lf.select(columns)
+
+    def _monthly_plan(self, key, imputed, keys):
+        """Monthly (MS) aggregation of one source with the configured rules."""
+        rules = self._aggregation_rules(key, self.dataframes[key])
+        if not rules:
+            schema = imputed.collect_schema()
+            rules = {col: "sum" for col, dtype in schema.items() if dtype.is_numeric() and col not in keys}
+
+        unknown = sorted(set(rules.values()) - set(AGGREGATIONS))
+        if unknown:
+            raise ValueError(f"Aggregation rules not supported by the Polars engine: {unknown}")
+
+        aggregations = [AGGREGATIONS[how](col).alias(col) for col, how in rules.items()]
+        if "_recalc_incomplete" in imputed.collect_schema().names():
+            aggregations.append(pl.col("_recalc_incomplete").sum())
+        month = pl.col("fecha").dt.truncate("1mo")
+        return imputed.group_by(keys + [month]).agg(aggregations).sort(keys + ["fecha"])
+
+    def _record_stats(self, key, plan, audit):
+        """Fills the audit stats of the pandas engine from the collected counts."""
+        counts = plan["counts"]
+        rows_filtered = counts["rows_total"] - counts["rows_scanned"]
+        self.load_stats[key] = {
+            "rows_read": int(counts["rows_scanned"]),
+            "rows_filtered": int(rows_filtered),
+            "columns_read": plan["columns_read"],
+            "columns_skipped": plan["columns_skipped"]
+        }
+        rows_full = audit["n_series"] * plan["grid_size"]
+        self.stats_cleaning["duplicates"][key] = int(counts["rows_scanned"] - counts["rows_deduped"])
+        self.stats_cleaning["filtered"][key] = int(rows_filtered + counts["rows_deduped"] - audit["rows_clean"])
+        self.sentinel_stats[key] = int(audit["replaced"] or 0)
+        self.reindex_stats[key] = int(rows_full - audit["rows_clean"])
+
+        added = rows_full - audit["rows_on_grid"]
+        nulls = {col: audit[col] + added for col in plan["values"]}
+        stats = {}
+        if key == "macro":
+            stats = {col: nulls[col] for col in plan["numeric"] if nulls[col]}
+        elif key == "promo" and nulls.get("es_promo"):
+            stats["es_promo_inferred"] = nulls["es_promo"]
+        elif key == "marketing":
+            target = "ciclo" if "ciclo" in nulls else "campana"
+            if nulls.get(target):
+                stats["campaigns_inferred"] = nulls[target]
+            for col in ["inversion_facebook", "inversion_instagram"]:
+                if nulls.get(col):
+                    stats[f"{col}_imputed"] = nulls[col]
+        elif key == "ventas":
+            stats["dates_missing_imputed"] = nulls.get("total_unidades_entregadas", 0)
+            for col in ["precio_unitario_full", "costo_unitario"]:
+                if nulls.get(col):
+                    stats[f"{col}_filled"] = nulls[col]
+            recalculated = self.config.get("preprocessing", {}).get("recalc_financials", False)
+            self.recalc_stats = {"rows": int(stats["dates_missing_imputed"]) if recalculated else 0, "incomplete": 0}
+        self.imputation_stats[key].update({stat: int(count) for stat, count in stats.items()})
+
+    def _to_monthly_pandas(self, key, monthly, keys):
+        """Converts a collected monthly frame to the pandas layout of `_aggregate_frame`."""
+        df_monthly = monthly.to_pandas().set_index(keys + ["fecha"])
+        if not keys:
+            df_monthly.index = pd.DatetimeIndex(df_monthly.index, name="fecha", freq="MS")
+        df_monthly = self._restore_dtypes(df_monthly, self._dtype_map(key))
+        if key == "promo" and "es_promo" in df_monthly.columns:
+            df_monthly.rename(columns={"es_promo": "dias_en_promo"}, inplace=True)
+        return df_monthly
@@ -1,4 +1,6 @@
 
+import importlib
+import logging
 import pandas as pd
 import numpy as np
 import yaml
@@ -6,7 +8,26 @@ from pathlib import Path
 import os
 from datetime import datetime
 import platform
-import json
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.calendar_dim import CalendarDimension
+from src.imputation import impute_frame, linear_interpolate, window_interpolate, forward_fill, backward_fill
+from src.profiling import StageProfiler
+from src.utils import save_json
+
+logger = logging.getLogger(__name__)
+
+# Selective financial recalculation: gathered inputs and recalculated outputs
+FINANCIAL_INPUTS = [
+    "total_unidades_entregadas", "costo_unitario", "unidades_precio_normal",
+    "unidades_promo_pagadas", "precio_unitario_full"
+]
+FINANCIAL_OUTPUTS = ["costo_total", "ingresos_totales", "utilidad"]
+
+# Optional engine dependencies (polars, duckdb) are listed here, not in requirements.txt
+ENGINE_REQUIREMENTS = "requirements-engines.txt"
 
 class Preprocessor:
     """
@@ -56,43 +77,250 @@ class Preprocessor:
             "macro": self.raw_data_path / "macro_economia.parquet"
         }
         self.columns_removed_log = {}
+        self.load_stats = {}
+        self.dtype_stats = {}
+        self.monthly_dfs = {}
+        multi_series_cfg = config.get("preprocessing", {}).get("multi_series", {}) or {}
+        self.series_keys = list(multi_series_cfg.get("keys") or [])
+        self.macro_imputation = self._macro_imputation_config()
+        self.profiler = StageProfiler.from_config(config, phase="phase_02_preprocessing", base_dir=self.base_dir)
 
 
     def run(self):
         """
         Executes the full preprocessing pipeline.
         """
-        print("Starting Preprocessing Pipeline...")
-        self._load_data()
-        self._validate_contract()
-        self._standardize_names()
-        self._enforce_schema()
-        self._clean_rows()
-        self._handle_sentinels()
-        self._ensure_temporal_completeness()
-        self._impute_business_logic()
-        self._recalculate_financials()
-        self._aggregate_monthly()
-        df_master = self._unify_sources()
-        df_master = self._impute_post_merge(df_master)
-        df_master = self._apply_anti_leakage_rule(df_master)
-        self._export_and_report(df_master)
-        print("Preprocessing Pipeline Completed.")
+        logger.info("Starting Preprocessing Pipeline...")
+        try:
+            self._run_stage(self._load_data)
+            self._run_stage(self._validate_contract)
+            self._run_stage(self._standardize_names)
+            self._run_stage(self._enforce_schema)
+            self._run_stage(self._clean_rows)
+            self._run_stage(self._handle_sentinels)
+            self._run_stage(self._ensure_temporal_completeness)
+            self._run_stage(self._impute_business_logic)
+            self._run_stage(self._recalculate_financials)
+            self._run_stage(self._aggregate_monthly)
+            df_master = self._run_stage(self._unify_sources)
+            df_master = self._run_stage(self._impute_post_merge, df_master)
+            df_master = self._run_stage(self._apply_anti_leakage_rule, df_master)
+            self._run_stage(self._export_and_report, df_master)
+        finally:
+            self.profiler.close()
+        logger.info("Preprocessing Pipeline Completed.")
+
+    def _run_stage(self, stage, *args):
+        """Runs one pipeline stage under the profiler, recording rows in/out."""
+        rows_in = len(args[0]) if args and isinstance(args[0], pd.DataFrame) else self._pipeline_rows()
+        with self.profiler.stage(stage.__name__.lstrip("_"), rows_in=rows_in) as record:
+            result = stage(*args)
+            record["rows_out"] = len(result) if isinstance(result, pd.DataFrame) else self._pipeline_rows()
+        return result
+
+    def _pipeline_rows(self):
+        """Total rows currently held by the pipeline (monthly once aggregated)."""
+        frames = self.monthly_dfs or self.dataframes
+        return int(sum(len(df) for df in frames.values()))
+
+    def _keys_in(self, df):
+        """Series key columns (multi-series mode) present in a dataframe or its index."""
+        names = set(df.columns) | set(name for name in df.index.names if name)
+        return [key for key in self.series_keys if key in names]
+
+    def _series_codes(self, df):
+        """
+        Contiguous integer series codes for a frame sorted by (keys, fecha).
+
+        Returns None for single-series frames so imputation kernels skip grouping.
+        """
+        keys = self._keys_in(df)
+        if not keys:
+            return None
+        return df.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
 
     def _load_data(self):
-        """Loads raw data from parquet files."""
-        print("Loading raw data...")
-        for key, path in self.files.items():
-            if path.exists():
-                df = pd.read_parquet(path)
-                self.dataframes[key] = df
-                print(f"  - {key}: {df.shape}")
-            else:
+        """
+        Loads raw data from parquet files concurrently.
+
+        The contract columns and the `filters.min_date` predicate are pushed
+        into the Arrow dataset scan, so row groups outside the date range are
+        skipped using their statistics and non-contract columns are never read.
+        """
+        logger.info("Loading raw data...")
+        for path in self.files.values():
+            if not path.exists():
+                raise FileNotFoundError(f"File not found: {path}")
+
+        io_cfg = self.config.get("preprocessing", {}).get("io", {}) or {}
+        max_workers = io_cfg.get("max_workers") or max(len(self.files), 1)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(self.files.keys(), executor.map(self._read_source, self.files.keys())))
+
+        for key, (df, stats) in results.items():
+            self.dataframes[key] = self._apply_dtype_policy(df, key, renamed=False)
+            self.load_stats[key] = stats
+            if stats["columns_skipped"]:
+                self.columns_removed_log[key] = stats["columns_skipped"]
+            logger.info("  - %s: %s (rows skipped by filter: %s)", key, df.shape, stats['rows_filtered'])
+
+    def _read_source(self, key):
+        """Reads one raw source applying column and predicate pushdown."""
+        dataset, columns, columns_skipped, date_filter = self._scan_plan(key)
+        table = dataset.to_table(columns=columns, filter=date_filter)
+
+        rows_filtered = dataset.count_rows() - table.num_rows if date_filter is not None else 0
+        stats = {
+            "rows_read": table.num_rows,
+            "rows_filtered": int(rows_filtered),
+            "columns_read": table.column_names,
+            "columns_skipped": columns_skipped
+        }
+        return table.to_pandas(), stats
+
+    def _scan_plan(self, key):
+        """
+        Builds the Arrow scan of one raw source.
+
+        Returns:
+            tuple: (dataset, projected columns or None, skipped columns, date predicate or None).
+        """
+        io_cfg = self.config.get("preprocessing", {}).get("io", {}) or {}
+        pushdown = io_cfg.get("pushdown", True)
+        dataset = ds.dataset(self.files[key], format="parquet")
+        schema = dataset.schema
+
+        columns = None
+        columns_skipped = []
+        contract_cols = list(self.config.get("data_contract", {}).get(self.file_map.get(key), {}).keys())
+        if pushdown and contract_cols:
+            # Missing contract columns are reported later by _validate_contract
+            keep_cols = contract_cols + self.series_keys
+            columns = [col for col in schema.names if col in keep_cols]
+            columns_skipped = [col for col in schema.names if col not in keep_cols]
+
+        date_filter = self._min_date_filter(schema) if pushdown else None
+        return dataset, columns, columns_skipped, date_filter
+
+    def _scan_schemas(self):
+        """
+        Opens every raw source and loads an empty frame with its projected schema.
+
+        Contract validation, renaming and schema enforcement then run on these
+        templates without reading any rows. Used by the streaming and Polars engines.
+        """
+        logger.info("Scanning raw data schemas...")
+        for path in self.files.values():
+            if not path.exists():
                 raise FileNotFoundError(f"File not found: {path}")
 
+        for key in self.files:
+            dataset, columns, columns_skipped, _ = self._scan_plan(key)
+            self.dataframes[key] = dataset.schema.empty_table().to_pandas()[columns or dataset.schema.names]
+            if columns_skipped:
+                self.columns_removed_log[key] = columns_skipped
+
+    def _min_date_filter(self, schema):
+        """Builds the Arrow predicate `fecha >= filters.min_date`, if the column type allows it."""
+        if "fecha" not in schema.names:
+            return None
+
+        filters = self.config.get("preprocessing", {}).get("filters", {})
+        min_date = pd.to_datetime(filters.get("min_date", "2018-01-01"))
+        field_type = schema.field("fecha").type
+
+        if pa.types.is_timestamp(field_type):
+            if field_type.tz is not None:
+                min_date = min_date.tz_localize(field_type.tz)
+            value = pa.scalar(min_date.to_pydatetime(), type=field_type)
+        elif pa.types.is_date(field_type):
+            value = pa.scalar(min_date.date(), type=field_type)
+        else:
+            # String dates are parsed in _clean_rows; filter there
+            return None
+        return ds.field("fecha") >= value
+
+    def _dtype_policy(self):
+        """Returns the dtype policy config, or an empty dict when disabled."""
+        policy = self.config.get("preprocessing", {}).get("dtype_policy", {}) or {}
+        return policy if policy.get("enabled", False) else {}
+
+    def _dtype_map(self, key, renamed=True):
+        """
+        Maps each contract column of a source to its compact dtype.
+
+        Args:
+            key (str): Source key (ventas, marketing, promo, macro).
+            renamed (bool): Whether column names already passed _standardize_names.
+
+        Returns:
+            dict: Column name -> target dtype. Empty when the policy is disabled.
+        """
+        policy = self._dtype_policy()
+        if not policy:
+            return {}
+
+        type_map = {
+            "int": policy.get("int", "Int32"),
+            "float": policy.get("float", "float32"),
+            "object": policy.get("object", "category")
+        }
+        overrides = policy.get("overrides") or {}
+        rename_map = self.config.get("preprocessing", {}).get("rename_map") or {}
+        contract = self.config.get("data_contract", {}).get(self.file_map.get(key), {})
+
+        dtype_map = {}
+        for col, contract_type in contract.items():
+            dtype = overrides.get(col, type_map.get(contract_type))
+            if dtype is None:
+                continue
+            name = rename_map.get(col, col).lower().replace(" ", "_") if renamed else col
+            dtype_map[name] = dtype
+        return dtype_map
+
+    def _apply_dtype_policy(self, df, key, renamed=True):
+        """Casts a source to its compact dtypes and records the bytes saved."""
+        dtype_map = {col: dtype for col, dtype in self._dtype_map(key, renamed).items() if col in df.columns}
+        if not dtype_map:
+            return df
+
+        bytes_before = int(df.memory_usage(deep=True).sum())
+        df = self._restore_dtypes(df, dtype_map)
+        bytes_after = int(df.memory_usage(deep=True).sum())
+        self.dtype_stats[key] = {
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after
+        }
+        return df
+
+    def _restore_dtypes(self, df, dtypes):
+        """
+        Casts columns back to `dtypes` after operations that upcast them.
+
+        Float values headed to an integer dtype are rounded first, since
+        interpolated unit counts may be fractional. No-op when the dtype
+        policy is disabled.
+        """
+        if not self._dtype_policy():
+            return df
+
+        changed = {
+            col: dtype for col, dtype in dict(dtypes).items()
+            if col in df.columns and str(df[col].dtype) != str(dtype)
+        }
+        if not changed:
+            return df
+
+        for col, dtype in changed.items():
+            if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype)) and pd.api.types.is_float_dtype(df[col].dtype):
+                df[col] = df[col].round()
+        return df.astype(changed)
+
     def _validate_contract(self):
         """Validates that loaded dataframes have the expected columns."""
-        print("Validating Data Contracts...")
+        logger.info("Validating Data Contracts...")
         data_contract = self.config.get("data_contract", {})
         self.data_contract_status = {}
 
@@ -104,28 +332,28 @@ class Preprocessor:
             
             if missing_cols:
                 error_msg = f"CRITICAL ERROR in {key}: Missing columns {missing_cols}"
-                print(error_msg)
+                logger.error(error_msg)
                 self.data_contract_status[key] = f"FAILED: Missing {missing_cols}"
                 raise RuntimeError(error_msg)
             else:
-                print(f"  - {key}: Contract Validation OK")
+                logger.info("  - %s: Contract Validation OK", key)
                 self.data_contract_status[key] = "OK"
 
     def _standardize_names(self):
         """Renames columns based on configuration and converts to snake_case."""
         rename_map = self.config.get("preprocessing", {}).get("rename_map") or {}
-        print(f"Applying rename_map: {rename_map}")
+        logger.info("Applying rename_map: %s", rename_map)
 
         for key, df in self.dataframes.items():
             df.rename(columns=rename_map, inplace=True)
             df.columns = [col.lower().replace(" ", "_") for col in df.columns]
             self.dataframes[key] = df
             
-        print("Names standardized.")
+        logger.info("Names standardized.")
 
     def _enforce_schema(self):
         """Selects only expected columns and logs removed ones."""
-        print("Applying Schema Enforcement...")
+        logger.info("Applying Schema Enforcement...")
         data_contract = self.config.get("data_contract", {})
         rename_map = self.config.get("preprocessing", {}).get("rename_map") or {}
 
@@ -138,207 +366,321 @@ class Preprocessor:
                 new_name = rename_map.get(col, col).lower().replace(" ", "_")
                 final_expected_cols.append(new_name)
             
+            final_expected_cols += self.series_keys
             cols_to_keep = [col for col in df.columns if col in final_expected_cols]
             removed = [col for col in df.columns if col not in final_expected_cols]
             
             if removed:
-                self.columns_removed_log[key] = removed
+                self.columns_removed_log[key] = self.columns_removed_log.get(key, []) + removed
             
             self.dataframes[key] = df[cols_to_keep].copy()
 
-        print("Columns removed:", self.columns_removed_log)
+        logger.info("Columns removed: %s", self.columns_removed_log)
 
     def _clean_rows(self):
         """Removes duplicates and filters data by date."""
-        print("Cleaning Rows...")
+        logger.info("Cleaning Rows...")
         filters = self.config.get("preprocessing", {}).get("filters", {})
         min_date = pd.to_datetime(filters.get("min_date", "2018-01-01"))
 
         for key, df in self.dataframes.items():
-            initial_rows = len(df)
-            
-            # 1. Exact Deduplication
-            df = df.drop_duplicates()
-            
-            # 2. Temporal Deduplication (Keep Last)
+            df, duplicates, filtered = self._clean_frame(df, min_date)
+            self.stats_cleaning["duplicates"][key] = duplicates
             if "fecha" in df.columns:
-                df = df.copy()
-                df["fecha"] = pd.to_datetime(df["fecha"])
-                df = df.sort_values("fecha")
-                duplicates_date = df.duplicated(subset=["fecha"], keep="last")
-                df = df[~duplicates_date]
-            
-            rows_after_dedup = len(df)
-            self.stats_cleaning["duplicates"][key] = initial_rows - rows_after_dedup
-            
-            # 3. Date Filtering
-            if "fecha" in df.columns:
-                df = df[df["fecha"] >= min_date].copy()
-                self.stats_cleaning["filtered"][key] = rows_after_dedup - len(df)
-            
+                rows_pushed_down = self.load_stats.get(key, {}).get("rows_filtered", 0)
+                self.stats_cleaning["filtered"][key] = rows_pushed_down + filtered
             self.dataframes[key] = df
             
-        print("Cleaning Statistics:", self.stats_cleaning)
+        logger.info("Cleaning Statistics: %s", self.stats_cleaning)
+
+    def _clean_frame(self, df, min_date):
+        """
+        Deduplicates and date-filters one frame.
+
+        Returns:
+            tuple: (cleaned frame, duplicates removed, rows filtered by date).
+        """
+        initial_rows = len(df)
+        
+        # 1. Exact Deduplication
+        df = df.drop_duplicates()
+        
+        # 2. Temporal Deduplication per series (Keep Last)
+        if "fecha" in df.columns:
+            series_cols = self._keys_in(df) + ["fecha"]
+            df = df.copy()
+            df["fecha"] = pd.to_datetime(df["fecha"])
+            df = df.sort_values(series_cols, kind="stable")
+            duplicates_date = df.duplicated(subset=series_cols, keep="last")
+            df = df[~duplicates_date]
+        
+        rows_after_dedup = len(df)
+        
+        # 3. Date Filtering
+        if "fecha" in df.columns:
+            df = df[df["fecha"] >= min_date].copy()
+        
+        return df, initial_rows - rows_after_dedup, rows_after_dedup - len(df)
 
     def _handle_sentinels(self):
         """Replaces sentinel values with NaN."""
-        print("Handling Sentinel Values...")
+        logger.info("Handling Sentinel Values...")
+        for key, df in self.dataframes.items():
+            self.sentinel_stats[key] = self._replace_sentinels(key, df)
+            self.dataframes[key] = df
+            
+        logger.info("Sentinels replaced: %s", self.sentinel_stats)
+
+    def _replace_sentinels(self, key, df):
+        """Replaces sentinel values with NaN in place. Returns the number replaced."""
         sentinel_values = self.config.get("quality", {}).get("sentinel_values", {})
         numeric_sentinels = sentinel_values.get("numeric", [])
         text_sentinels = sentinel_values.get("text", [])
 
-        for key, df in self.dataframes.items():
-            count_replaced = 0
-            for col in df.columns:
-                is_confianza = (key == "macro" and col == "confianza_consumidor")
-                
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    for val in numeric_sentinels:
-                        if is_confianza and val == -1:
-                            continue
-                        
-                        mask = (df[col] == val)
-                        if mask.any():
-                            count_replaced += mask.sum()
-                            df.loc[mask, col] = np.nan
-                            
-                elif pd.api.types.is_string_dtype(df[col]):
-                     for val in text_sentinels:
-                        mask = (df[col] == val)
-                        if mask.any():
-                            count_replaced += mask.sum()
-                            df.loc[mask, col] = np.nan
+        count_replaced = 0
+        for col in df.columns:
+            if col in self.series_keys:
+                continue
+            is_confianza = (key == "macro" and col == "confianza_consumidor")
             
-            self.sentinel_stats[key] = int(count_replaced)
-            self.dataframes[key] = df
-            
-        print("Sentinels replaced:", self.sentinel_stats)
+            if pd.api.types.is_numeric_dtype(df[col]):
+                for val in numeric_sentinels:
+                    if is_confianza and val == -1:
+                        continue
+                    
+                    mask = (df[col] == val).fillna(False)
+                    if mask.any():
+                        count_replaced += mask.sum()
+                        df.loc[mask, col] = np.nan
+                        
+            elif pd.api.types.is_string_dtype(df[col]):
+                 for val in text_sentinels:
+                    mask = (df[col] == val)
+                    if mask.any():
+                        count_replaced += mask.sum()
+                        df.loc[mask, col] = np.nan
+        
+        return int(count_replaced)
 
     def _ensure_temporal_completeness(self):
         """Reindexes dataframes to ensure temporal completeness."""
-        print("Ensuring Temporal Completeness...")
+        logger.info("Ensuring Temporal Completeness...")
         filters = self.config.get("preprocessing", {}).get("filters", {})
         min_date = pd.to_datetime(filters.get("min_date", "2018-01-01"))
         all_max_dates = [df["fecha"].max() for df in self.dataframes.values() if "fecha" in df.columns and not df.empty]
         global_max_date = max(all_max_dates) if all_max_dates else datetime.now()
 
-        freq_map = self.config.get("preprocessing", {}).get("data_frequency", {})
-
+        # One shared grid per frequency (daily, monthly)
+        grids = {}
         for key, df in self.dataframes.items():
             if "fecha" in df.columns and not df.empty:
-                config_key = self.file_map.get(key)
-                freq = freq_map.get(config_key, "D")
-                
-                print(f"  - Reindexing {key} with frequency: {freq}")
-                
-                full_idx = pd.date_range(start=min_date, end=global_max_date, freq=freq, name="fecha")
-                
-                df = df.set_index("fecha")
-                df = df[~df.index.duplicated(keep='last')]
-                
-                original_len = len(df)
-                df = df.reindex(full_idx)
-                df.index.name = "fecha"
-                df = df.reset_index()
-                
-                new_len = len(df)
-                self.reindex_stats[key] = new_len - original_len
+                freq = self._source_frequency(key)
+                logger.info("  - Reindexing %s with frequency: %s", key, freq)
+                if freq not in grids:
+                    grids[freq] = self._date_grid(key, min_date, global_max_date)
+                df, rows_added = self._reindex_frame(key, df, min_date, global_max_date, grid=grids[freq])
+                self.reindex_stats[key] = rows_added
                 self.dataframes[key] = df
         
-        print("Rows added by reindexing:", self.reindex_stats)
+        logger.info("Rows added by reindexing: %s", self.reindex_stats)
+
+    def _source_frequency(self, key):
+        """Data frequency of a source as configured in preprocessing.data_frequency."""
+        freq_map = self.config.get("preprocessing", {}).get("data_frequency", {})
+        return freq_map.get(self.file_map.get(key), "D")
+
+    def _date_grid(self, key, start, end):
+        """Full date grid of a source between `start` and `end` at its configured frequency."""
+        return pd.date_range(start=start, end=end, freq=self._source_frequency(key), name="fecha")
+
+    def _reindex_frame(self, key, df, start, end, grid=None):
+        """
+        Reindexes one frame on the full date grid between `start` and `end`.
+
+        Existing rows are located on the grid by integer position and gathered
+        into the output through a single take-indexer, so every column is
+        allocated once; missing slots are filled with NaN/NA. Duplicated
+        (keys, fecha) rows keep the last occurrence and dates off the grid are
+        dropped, as with `DataFrame.reindex`.
+
+        Args:
+            key (str): Source key.
+            df (pd.DataFrame): Frame with a `fecha` column (and series keys).
+            start: First grid date.
+            end: Last grid date.
+            grid (pd.DatetimeIndex): Precomputed grid shared by sources of the same frequency.
+
+        Returns:
+            tuple: (reindexed frame, rows added).
+        """
+        if grid is None:
+            grid = self._date_grid(key, start, end)
+        keys = self._keys_in(df)
+        series_cols = keys + ["fecha"]
+
+        rows = np.flatnonzero(~df.duplicated(subset=series_cols, keep="last").to_numpy())
+        date_pos = grid.get_indexer(pd.DatetimeIndex(df["fecha"].to_numpy()[rows]))
+
+        if keys:
+            # Multi-series: every observed series gets the full date grid, in key order
+            codes = df.groupby(keys, sort=True, dropna=False).ngroup().to_numpy()
+            _, series_rows = np.unique(codes, return_index=True)
+        else:
+            codes = np.zeros(len(df), dtype=np.intp)
+            series_rows = np.zeros(1, dtype=np.intp)
+
+        on_grid = date_pos >= 0
+        indexer = np.full(len(series_rows) * len(grid), -1, dtype=np.intp)
+        indexer[codes[rows[on_grid]] * len(grid) + date_pos[on_grid]] = rows[on_grid]
+
+        data = {k: df[k].array.take(np.repeat(series_rows, len(grid))) for k in keys}
+        data["fecha"] = np.tile(grid.values, len(series_rows))
+        for col in df.columns:
+            if col not in series_cols:
+                values = df[col].array if isinstance(df[col].dtype, pd.api.extensions.ExtensionDtype) else df[col].to_numpy()
+                data[col] = pd.api.extensions.take(values, indexer, allow_fill=True)
+
+        df_full = pd.DataFrame(data)
+        return df_full, len(df_full) - len(rows)
 
     def _impute_business_logic(self):
         """Applies business-specific imputation logic."""
-        print("Executing Business Imputation...")
-        
-        df_ventas = self.dataframes["ventas"]
-        df_marketing = self.dataframes["marketing"]
-        df_promo = self.dataframes["promo"]
-        df_macro = self.dataframes["macro"]
-
-        # --- Macro ---
-        cols_num_macro = df_macro.select_dtypes(include=np.number).columns
-        for col in cols_num_macro:
-            nulls_before = df_macro[col].isna().sum()
-            if nulls_before > 0:
-                df_macro[col] = df_macro[col].fillna(
-                    df_macro[col].rolling(window=60, min_periods=1).mean().shift(1)
-                )
-                df_macro[col] = df_macro[col].fillna(method='bfill')
-                self.imputation_stats["macro"][col] = int(nulls_before)
-
-        # --- Promos ---
+        logger.info("Executing Business Imputation...")
+        original_dtypes = {key: df.dtypes for key, df in self.dataframes.items()}
+
+        self.imputation_stats["macro"].update(self._impute_macro(self.dataframes["macro"]))
+        self.imputation_stats["promo"].update(self._impute_promo(self.dataframes["promo"]))
+        self.imputation_stats["marketing"].update(self._impute_marketing(self.dataframes["marketing"]))
+        ventas_stats, self.imputed_sales_mask = self._impute_ventas(self.dataframes["ventas"])
+        self.imputation_stats["ventas"].update(ventas_stats)
+            
+        for key, dtypes in original_dtypes.items():
+            self.dataframes[key] = self._restore_dtypes(self.dataframes[key], dtypes)
+            
+        logger.info("Business Imputation Completed.")
+
+    def _macro_imputation_config(self):
+        """
+        Macro imputation settings from `preprocessing.macro_imputation`.
+
+        Configs without `macro_imputation.strategy` keep their legacy
+        `quality.imputation_strategy` (with a deprecation warning).
+        """
+        macro_cfg = dict(self.config.get("preprocessing", {}).get("macro_imputation", {}) or {})
+        legacy_strategy = (self.config.get("quality", {}) or {}).get("imputation_strategy")
+        if "strategy" not in macro_cfg and legacy_strategy:
+            logger.warning(
+                "quality.imputation_strategy is deprecated; set preprocessing.macro_imputation.strategy instead. "
+                "Using '%s'.", legacy_strategy
+            )
+            macro_cfg["strategy"] = legacy_strategy
+        return {"strategy": macro_cfg.get("strategy", "rolling_mean"), "window": macro_cfg.get("window", 60)}
+
+    def _impute_macro(self, df_macro):
+        """Imputes macro indicators in place with the configured strategy. Returns null counts."""
+        macro_cfg = self.macro_imputation
+        cols_num_macro = [col for col in df_macro.select_dtypes(include=np.number).columns if col not in self.series_keys]
+        return impute_frame(
+            df_macro,
+            cols_num_macro,
+            strategy=macro_cfg["strategy"],
+            groups=self._series_codes(df_macro),
+            window=macro_cfg["window"]
+        )
+
+    def _impute_promo(self, df_promo):
+        """Infers missing promo flags from the configured promo windows, in place."""
+        stats = {}
         if "es_promo" in df_promo.columns:
             mask_null_promo = df_promo["es_promo"].isna()
             count_promo_nulls = mask_null_promo.sum()
             if count_promo_nulls > 0:
-                meses_promo = [4, 5, 9, 10]
-                months = df_promo["fecha"].dt.month
-                df_promo.loc[mask_null_promo & months.isin(meses_promo), "es_promo"] = 1
-                df_promo.loc[mask_null_promo & ~months.isin(meses_promo), "es_promo"] = 0
-                self.imputation_stats["promo"]["es_promo_inferred"] = int(count_promo_nulls)
+                calendar = CalendarDimension.for_dates(self.config, df_promo["fecha"])
+                in_promo_window = calendar.lookup("is_promo_window", df_promo["fecha"]).astype(bool)
+                df_promo.loc[mask_null_promo & in_promo_window, "es_promo"] = 1
+                df_promo.loc[mask_null_promo & ~in_promo_window, "es_promo"] = 0
+                stats["es_promo_inferred"] = int(count_promo_nulls)
+        return stats
+
+    def _impute_marketing(self, df_marketing):
+        """
+        Infers campaign labels and imputes investments in place.
+
+        Null cycles take the calendar campaign label when there was investment
+        inside a campaign, else the default label. Investment gaps are
+        interpolated within each campaign window (never across windows or
+        series) and zeroed outside them, both columns in one kernel pass.
+        """
+        stats = {}
+        calendar = CalendarDimension.for_dates(self.config, df_marketing["fecha"])
+        campaign_id = calendar.lookup("campaign_id", df_marketing["fecha"])
+        in_window = calendar.lookup("is_campaign_window", df_marketing["fecha"]).astype(bool)
+
+        inv_cols = [col for col in ["inversion_facebook", "inversion_instagram"] if col in df_marketing.columns]
+        inv_values = df_marketing[inv_cols].to_numpy(dtype=np.float64, na_value=np.nan)
 
-        # --- Marketing ---
         target_col_campana = "ciclo" if "ciclo" in df_marketing.columns else "campana"
-        mask_camp_null = df_marketing[target_col_campana].isna()
-        count_campana_nulls = mask_camp_null.sum()
-        
+        mask_camp_null = df_marketing[target_col_campana].isna().to_numpy()
+        count_campana_nulls = int(mask_camp_null.sum())
         if count_campana_nulls > 0:
-            fb_val = df_marketing["inversion_facebook"].fillna(0)
-            ig_val = df_marketing["inversion_instagram"].fillna(0)
-            has_inv = (fb_val > 0) | (ig_val > 0)
-            
-            months = df_marketing["fecha"].dt.month
-            mask_abr_may = months.isin([3, 4, 5])
-            mask_sep_oct = months.isin([8, 9, 10])
-            
-            df_marketing.loc[mask_camp_null & has_inv & mask_abr_may, target_col_campana] = "Ciclo Abr-May"
-            df_marketing.loc[mask_camp_null & has_inv & mask_sep_oct, target_col_campana] = "Ciclo Sep-Oct"
-            df_marketing.loc[mask_camp_null & df_marketing[target_col_campana].isna(), target_col_campana] = "Sin Campaña"
-            self.imputation_stats["marketing"]["campaigns_inferred"] = int(count_campana_nulls)
-
-        # Inversiones
-        fechas = df_marketing["fecha"]
-        rango1 = (((fechas.dt.month == 3) & (fechas.dt.day >= 15)) | (fechas.dt.month == 4) | ((fechas.dt.month == 5) & (fechas.dt.day <= 25)))
-        rango2 = (((fechas.dt.month == 8) & (fechas.dt.day >= 15)) | (fechas.dt.month == 9) | ((fechas.dt.month == 10) & (fechas.dt.day <= 25)))
-        rango_activo = rango1 | rango2
-        
-        for col in ["inversion_facebook", "inversion_instagram"]:
-            if col in df_marketing.columns:
-                mask_null = df_marketing[col].isna()
-                count_inv_nulls = mask_null.sum()
-                if count_inv_nulls > 0:
-                    mask_null_in_range = mask_null & rango_activo
-                    if mask_null_in_range.any():
-                        df_marketing[col] = df_marketing[col].interpolate(method='linear')
-                    
-                    mask_null_out_range = mask_null & ~rango_activo
-                    if mask_null_out_range.any():
-                        df_marketing.loc[mask_null_out_range, col] = 0
-                    
-                    self.imputation_stats["marketing"][f"{col}_imputed"] = int(count_inv_nulls)
-        
+            if isinstance(df_marketing[target_col_campana].dtype, pd.CategoricalDtype):
+                known = set(df_marketing[target_col_campana].cat.categories)
+                new_labels = [l for l in calendar.campaign_labels + [calendar.default_label] if l not in known]
+                df_marketing[target_col_campana] = df_marketing[target_col_campana].cat.add_categories(new_labels)
+
+            labels = np.array(calendar.campaign_labels + [calendar.default_label], dtype=object)[campaign_id]
+            has_inv = (np.nan_to_num(inv_values) > 0).any(axis=1)
+            in_campaign = campaign_id < len(calendar.campaign_labels)
+            inferred = np.where(has_inv & in_campaign, labels, calendar.default_label)
+            df_marketing.loc[mask_camp_null, target_col_campana] = inferred[mask_camp_null]
+            stats["campaigns_inferred"] = count_campana_nulls
+
+        # Inversiones: interpolación por segmento de ventana de campaña, 0 fuera de ellas
+        null_counts = np.isnan(inv_values).sum(axis=0)
+        if null_counts.any():
+            has_nulls = null_counts > 0
+            window_ids = np.where(in_window, campaign_id, -1)
+            filled = window_interpolate(inv_values[:, has_nulls], window_ids, self._series_codes(df_marketing))
+            df_marketing[[col for col, flag in zip(inv_cols, has_nulls) if flag]] = filled
+            stats.update({f"{col}_imputed": int(count) for col, count in zip(inv_cols, null_counts) if count > 0})
+
         target_col_marketing = "inversion_marketing_total" if "inversion_marketing_total" in df_marketing.columns else "inversion_total_diaria"
         if target_col_marketing in df_marketing.columns:
              # Recalculate total if possible
              if "inversion_facebook" in df_marketing.columns and "inversion_instagram" in df_marketing.columns:
                 df_marketing[target_col_marketing] = df_marketing["inversion_facebook"] + df_marketing["inversion_instagram"]
-        
-        # --- Ventas Diarias ---
-        self.imputed_sales_mask = df_ventas["total_unidades_entregadas"].isna()
-        self.imputation_stats["ventas"]["dates_missing_imputed"] = int(self.imputed_sales_mask.sum())
+        return stats
+
+    def _impute_ventas(self, df_ventas):
+        """
+        Imputes daily sales in place.
+
+        Returns:
+            tuple: (stats dict, boolean mask of rows whose sales were imputed).
+        """
+        stats = {}
+        ventas_codes = self._series_codes(df_ventas)
+        imputed_sales_mask = df_ventas["total_unidades_entregadas"].isna()
+        stats["dates_missing_imputed"] = int(imputed_sales_mask.sum())
         
         for col in ["precio_unitario_full", "costo_unitario"]:
             if col in df_ventas.columns:
                 nulls = df_ventas[col].isna().sum()
                 if nulls > 0:
-                    df_ventas[col] = df_ventas[col].ffill().bfill()
-                    self.imputation_stats["ventas"][f"{col}_filled"] = int(nulls)
+                    values = df_ventas[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                    df_ventas[col] = backward_fill(forward_fill(values, ventas_codes), ventas_codes)[:, 0]
+                    stats[f"{col}_filled"] = int(nulls)
         
         if "total_unidades_entregadas" in df_ventas.columns:
             s_total = df_ventas["total_unidades_entregadas"]
-            s_interp = s_total.interpolate(method='linear')
-            df_ventas["total_unidades_entregadas"] = s_interp.fillna(0)
+            values = s_total.to_numpy(dtype=np.float64, na_value=np.nan)
+            s_interp = pd.Series(
+                np.nan_to_num(linear_interpolate(values, ventas_codes)[:, 0], nan=0.0), index=s_total.index
+            )
+            if pd.api.types.is_integer_dtype(s_total.dtype):
+                # Compact dtype policy: unit counts stay integers
+                s_interp = s_interp.round().astype(s_total.dtype)
+            df_ventas["total_unidades_entregadas"] = s_interp
             
         for col in ["unidades_promo_pagadas", "unidades_promo_bonificadas"]:
             if col in df_ventas.columns:
@@ -348,176 +690,318 @@ class Preprocessor:
             residual = df_ventas["total_unidades_entregadas"] - (df_ventas["unidades_promo_pagadas"] + df_ventas["unidades_promo_bonificadas"])
             df_ventas["unidades_precio_normal"] = df_ventas["unidades_precio_normal"].fillna(residual)
             df_ventas["unidades_precio_normal"] = df_ventas["unidades_precio_normal"].clip(lower=0)
-            
-        print("Business Imputation Completed.")
+        return stats, imputed_sales_mask
 
     def _recalculate_financials(self):
         """Recalculates financial fields if configured."""
-        print("Recalculating Financials Selectively...")
+        logger.info("Recalculating Financials Selectively...")
         recalc_flag = self.config.get("preprocessing", {}).get("recalc_financials", False)
         df_ventas = self.dataframes["ventas"]
+        original_dtypes = df_ventas.dtypes
+        self.recalc_stats = {"rows": 0, "incomplete": 0}
 
         if recalc_flag:
             if hasattr(self, 'imputed_sales_mask') and self.imputed_sales_mask.any():
-                count = self.imputed_sales_mask.sum()
-                print(f"Recalculating {count} imputed rows...")
-                
-                idx = df_ventas[self.imputed_sales_mask].index
-                
-                df_ventas.loc[idx, "costo_total"] = (
-                    df_ventas.loc[idx, "total_unidades_entregadas"] * 
-                    df_ventas.loc[idx, "costo_unitario"]
-                )
-                
-                unidades_pagas = (
-                    df_ventas.loc[idx, "unidades_precio_normal"] + 
-                    df_ventas.loc[idx, "unidades_promo_pagadas"]
-                )
-                
-                df_ventas.loc[idx, "ingresos_totales"] = (
-                    unidades_pagas * df_ventas.loc[idx, "precio_unitario_full"]
-                )
-                
-                df_ventas.loc[idx, "utilidad"] = (
-                    df_ventas.loc[idx, "ingresos_totales"] - 
-                    df_ventas.loc[idx, "costo_total"]
-                )
+                logger.info("Recalculating %s imputed rows...", self.imputed_sales_mask.sum())
+                self.recalc_stats = self._recalculate_frame(df_ventas, self.imputed_sales_mask)
             else:
-                print("No imputed rows to recalculate.")
+                logger.info("No imputed rows to recalculate.")
         else:
-            print("Financial recalculation disabled.")
+            logger.info("Financial recalculation disabled.")
+            
+        self.dataframes["ventas"] = self._restore_dtypes(df_ventas, original_dtypes)
+
+    def _records_recalculated(self):
+        """Number of imputed sales records whose financials were recalculated."""
+        return int(getattr(self, "recalc_stats", {}).get("rows", 0))
+
+    def _recalculate_frame(self, df_ventas, imputed_mask):
+        """
+        Recalculates cost, revenue and utility for the imputed rows, in place.
+
+        The inputs of the imputed positions are gathered once into a NumPy
+        array, the three outputs are computed together and scattered back
+        with a single positional write.
+
+        Returns:
+            dict: Rows recalculated and, of those, rows left incomplete (a
+                price or cost input was missing).
+        """
+        positions = np.flatnonzero(np.asarray(imputed_mask, dtype=bool))
+        if positions.size == 0:
+            return {"rows": 0, "incomplete": 0}
+
+        inputs = df_ventas[FINANCIAL_INPUTS].take(positions).to_numpy(dtype=np.float64, na_value=np.nan)
+        unidades, costo_unitario, unidades_normal, unidades_pagadas, precio = inputs.T
+        costo_total = unidades * costo_unitario
+        ingresos_totales = (unidades_normal + unidades_pagadas) * precio
+        results = np.column_stack([costo_total, ingresos_totales, ingresos_totales - costo_total])
+
+        columns = df_ventas.columns.get_indexer(FINANCIAL_OUTPUTS)
+        dtypes = df_ventas.dtypes.iloc[columns]
+        if dtypes.nunique() == 1 and isinstance(dtypes.iloc[0], np.dtype):
+            df_ventas.iloc[positions, columns] = results.astype(dtypes.iloc[0])
+        else:
+            # Mixed or extension dtypes: one positional write per output column
+            for j, (loc, dtype) in enumerate(zip(columns, dtypes)):
+                df_ventas.iloc[positions, loc] = pd.array(results[:, j]).astype(dtype)
+        return {"rows": int(positions.size), "incomplete": int(np.isnan(results).any(axis=1).sum())}
 
     def _aggregate_monthly(self):
         """Aggregates dataframes to monthly frequency."""
-        print("Aggregating Monthly (MS)...")
-        agg_rules = self.config.get("preprocessing", {}).get("aggregation_rules", {})
+        logger.info("Aggregating Monthly (MS)...")
         self.monthly_dfs = {}
 
         for key, df in self.dataframes.items():
-            if "fecha" in df.columns:
-                df = df.set_index("fecha")
-            
-            # Filter rules for current DF
-            current_rules = {col: agg_rules[col] for col in df.columns if col in agg_rules}
-            
-            # Special rules
-            if key == "promo" and "es_promo" in df.columns:
-                current_rules["es_promo"] = "sum"
-            elif key == "macro":
-                current_rules = {col: "first" for col in df.columns}
-            
-            if current_rules:
-                df_monthly = df.resample("MS").agg(current_rules)
-            else:
-                df_monthly = df.resample("MS").sum(numeric_only=True)
-            
-            if key == "promo" and "es_promo" in df_monthly.columns:
-                df_monthly.rename(columns={"es_promo": "dias_en_promo"}, inplace=True)
-                
-            self.monthly_dfs[key] = df_monthly
+            self.monthly_dfs[key] = self._aggregate_frame(key, df)
             
-        print("Aggregation completed.")
+        logger.info("Aggregation completed.")
+
+    def _aggregation_rules(self, key, df):
+        """Aggregation rules (column -> function) applicable to one source."""
+        agg_rules = self.config.get("preprocessing", {}).get("aggregation_rules", {})
+        keys = self._keys_in(df)
+        
+        # Filter rules for current DF
+        current_rules = {col: agg_rules[col] for col in df.columns if col in agg_rules}
+        
+        # Special rules
+        if key == "promo" and "es_promo" in df.columns:
+            current_rules["es_promo"] = "sum"
+        elif key == "macro":
+            current_rules = {col: "first" for col in df.columns if col not in keys + ["fecha"]}
+        return current_rules
+
+    def _aggregate_frame(self, key, df):
+        """Aggregates one daily frame to monthly (MS) frequency."""
+        if "fecha" in df.columns:
+            df = df.set_index("fecha")
+        keys = self._keys_in(df)
+        current_rules = self._aggregation_rules(key, df)
+        
+        if keys:
+            # Multi-series: one vectorized groupby over (keys, month)
+            grouped = df.groupby(keys + [pd.Grouper(level="fecha", freq="MS")])
+        else:
+            grouped = df.resample("MS")
+        
+        if current_rules:
+            df_monthly = grouped.agg(current_rules)
+        else:
+            df_monthly = grouped.sum(numeric_only=True)
+        
+        df_monthly = self._restore_dtypes(df_monthly, df.dtypes)
+        
+        if key == "promo" and "es_promo" in df_monthly.columns:
+            df_monthly.rename(columns={"es_promo": "dias_en_promo"}, inplace=True)
+        return df_monthly
 
     def _unify_sources(self):
-        """Merges all monthly dataframes into a master dataframe."""
-        print("Merging Datasets...")
-        df_master = self.monthly_dfs["ventas"].copy()
+        """
+        Joins all monthly dataframes into a master dataframe.
 
-        for key in ["marketing", "promo", "macro"]:
-            other_df = self.monthly_dfs[key]
-            df_master = df_master.merge(other_df, left_index=True, right_index=True, how="left")
-            
-        print(f"Master Dataset Shape: {df_master.shape}")
+        Every source is aligned on the ventas DatetimeIndex (left join semantics)
+        and the master is built with a single column-wise concat. In
+        multi-series mode sources keyed by fewer series keys (e.g. macro, keyed
+        by date only) are broadcast to every series, and the master is returned
+        in long format: series keys as columns, `fecha` as index.
+
+        Raises:
+            ValueError: If two sources share a column name.
+        """
+        logger.info("Merging Datasets...")
+        keys = ["ventas"] + [key for key in self.monthly_dfs if key != "ventas"]
+        master_index = self.monthly_dfs["ventas"].index
+        self._check_collisions({key: self.monthly_dfs[key].columns for key in keys})
+
+        aligned = []
+        for key in keys:
+            df = self.monthly_dfs[key]
+            if df.index.equals(master_index):
+                aligned.append(df)
+            elif list(df.index.names) == list(master_index.names):
+                aligned.append(df.reindex(master_index))
+            else:
+                lookup = [master_index.get_level_values(name) for name in df.index.names]
+                lookup_index = lookup[0] if len(lookup) == 1 else pd.MultiIndex.from_arrays(lookup)
+                aligned.append(df.reindex(lookup_index).set_axis(master_index, axis=0))
+
+        df_master = pd.concat(aligned, axis=1)
+        master_keys = [name for name in master_index.names if name in self.series_keys]
+        if master_keys:
+            df_master = df_master.reset_index(level=master_keys)
+        logger.info("Master Dataset Shape: %s", df_master.shape)
         return df_master
 
+    def _check_collisions(self, columns):
+        """
+        Checks that no two sources share a column name.
+
+        Args:
+            columns (dict): Source key -> monthly column names, ventas first.
+
+        Raises:
+            ValueError: If two sources share a column name.
+        """
+        owners = {}
+        collisions = {}
+        for key, cols in columns.items():
+            for col in cols:
+                if col in owners:
+                    collisions.setdefault(col, [owners[col]]).append(key)
+                else:
+                    owners[col] = key
+        if collisions:
+            raise ValueError(f"Column collision while unifying sources: {collisions}")
+
     def _impute_post_merge(self, df_master):
         """Final imputation for any remaining structural gaps."""
-        print("Final Imputation...")
-        df_master = df_master.interpolate(method='linear').ffill().bfill()
+        logger.info("Final Imputation...")
+        original_dtypes = df_master.dtypes
+        # Linear interpolation + edge fill, per series in multi-series mode
+        num_cols = [col for col in df_master.select_dtypes(include=np.number).columns if col not in self.series_keys]
+        impute_frame(df_master, num_cols, strategy="interpolate", groups=self._series_codes(df_master))
+        df_master = self._restore_dtypes(df_master, original_dtypes)
         
-        nulos = df_master.isna().sum().sum()
+        # Null counts are kept for the report (updated if the anti-leakage rule drops rows)
+        self.master_null_stats = self._null_stats(df_master)
+        nulos = self.master_null_stats["total_nulls"]
         if nulos > 0:
-            print(f"WARNING: {nulos} null values remaining.")
+            logger.warning("%s null values remaining.", nulos)
         else:
-            print("Dataset clean.")
+            logger.info("Dataset clean.")
         return df_master
 
+    def _null_stats(self, df):
+        """Null counts of a frame in one pass: total, rows with any null and rows."""
+        null_mask = df.isna().to_numpy()
+        return {
+            "total_nulls": int(null_mask.sum()),
+            "rows_with_nulls": int(null_mask.any(axis=1).sum()),
+            "rows": len(df)
+        }
+
     def _apply_anti_leakage_rule(self, df_master):
         """
         Applies the Anti-Data Leakage rule by removing the current incomplete month.
         """
-        print("Applying Anti-Data Leakage Rule...")
+        logger.info("Applying Anti-Data Leakage Rule...")
         current_date = datetime.now()
         
         if not df_master.empty:
             # Ensure index is datetime
             if not isinstance(df_master.index, pd.DatetimeIndex):
-                 print("WARNING: Index is not DatetimeIndex. Skipping Anti-Leakage check.")
+                 logger.warning("Index is not DatetimeIndex. Skipping Anti-Leakage check.")
             else:
                 last_date = df_master.index.max() 
                 if last_date.year == current_date.year and last_date.month == current_date.month:
-                    print(f"  - Detected incomplete current month: {last_date.strftime('%Y-%m')}. Dropping to prevent leakage.")
-                    df_master = df_master.iloc[:-1]
+                    logger.info("  - Detected incomplete current month: %s. Dropping to prevent leakage.", last_date.strftime('%Y-%m'))
+                    is_current = df_master.index == last_date
+                    if hasattr(self, "master_null_stats"):
+                        dropped = self._null_stats(df_master[is_current])
+                        self.master_null_stats = {
+                            stat: value - dropped[stat] for stat, value in self.master_null_stats.items()
+                        }
+                    df_master = df_master[~is_current]
                 else:
-                    print(f"  - Last month ({last_date.strftime('%Y-%m')}) is closed. No drop needed.")
+                    logger.info("  - Last month (%s) is closed. No drop needed.", last_date.strftime('%Y-%m'))
                 
-        print(f"Final Master Dataset Shape (Closed Months): {df_master.shape}")
+        logger.info("Final Master Dataset Shape (Closed Months): %s", df_master.shape)
         return df_master
 
     def _export_and_report(self, df_master):
         """Exports the master dataframe and generates a JSON report."""
         output_file = self.cleansed_data_path / "master_monthly.parquet"
         df_master.to_parquet(output_file)
-        print(f"Saved to: {output_file}")
-        
-        final_shape = df_master.shape
+        logger.info("Saved to: %s", output_file)
         
-        # 1. Validaciones Temporales
-        is_series_complete = False
-        missing_expected_dates = []
-        duplicate_dates_count = 0
-        date_min = "N/A"
-        date_max = "N/A"
-        total_months = 0
-
-        if isinstance(df_master.index, pd.DatetimeIndex):
-            if not df_master.empty:
-                date_min = df_master.index.min().isoformat()
-                date_max = df_master.index.max().isoformat()
-                total_months = len(df_master)
-
-                # Chequear completitud (Freq MS)
-                expected_range = pd.date_range(start=df_master.index.min(), end=df_master.index.max(), freq='MS')
-                is_series_complete = len(expected_range) == len(set(df_master.index))
-                if not is_series_complete:
-                     missing_expected_dates = [d.isoformat() for d in set(expected_range) - set(df_master.index)]
-
-                # Chequear fechas duplicadas
-                duplicate_dates_count = int(df_master.index.duplicated().sum())
-
-        # 2. Integridad de Datos
-        duplicate_rows = int(df_master.duplicated().sum())
-        total_nulls = int(df_master.isna().sum().sum())
-        rows_with_nulls = int(df_master.isna().any(axis=1).sum())
-        column_types = df_master.dtypes.astype(str).to_dict()
-        columns_list = df_master.columns.tolist()
+        report = self._build_report(df_master, output_file)
+        report_path = self.artifacts_path / "phase_02_preprocessing.json"
+        save_json(report, report_path)
+            
+        logger.info("Detailed Report generated at: %s", report_path)
 
-        file_size_bytes = output_file.stat().st_size if output_file.exists() else 0
-        
-        # 3. Muestras de Datos (Serialize dates/timestamps for JSON)
-        def serialize_df(df_part):
+    def _temporal_audit(self, df_master):
+        """
+        Temporal coverage of the master in one vectorized pass.
+
+        Months are handled as integer month ordinals and series as integer
+        codes, so completeness and per-series duplicate dates come from
+        `np.unique` instead of Timestamp sets.
+        """
+        audit = {
+            "start_date": "N/A",
+            "end_date": "N/A",
+            "total_months": 0,
+            "is_series_complete": False,
+            "missing_expected_dates": [],
+            "duplicate_dates_count": 0
+        }
+        if not isinstance(df_master.index, pd.DatetimeIndex) or df_master.empty:
+            return audit
+
+        months = df_master.index.values.astype("datetime64[M]").astype(np.int64)
+        first, last = months.min(), months.max()
+        observed = np.unique(months)
+        missing = np.setdiff1d(np.arange(first, last + 1), observed)
+
+        # Chequear fechas duplicadas (por serie en modo multi-serie)
+        codes = self._series_codes(df_master)
+        series_months = months - first if codes is None else codes * (last - first + 1) + (months - first)
+
+        audit.update({
+            "start_date": df_master.index.min().isoformat(),
+            "end_date": df_master.index.max().isoformat(),
+            "total_months": int(len(observed)),
+            "is_series_complete": len(missing) == 0,
+            "missing_expected_dates": [d.isoformat() for d in pd.DatetimeIndex(missing.astype("datetime64[M]"))],
+            "duplicate_dates_count": int(len(series_months) - len(np.unique(series_months)))
+        })
+        return audit
+
+    def _sample_records(self, df_master):
+        """Head, tail and random samples serialized with a single `to_dict`."""
+        if df_master.empty:
+            return {"head_5": [], "tail_5": [], "random_5": []}
+
+        parts = [df_master.head(5), df_master.tail(5), df_master.sample(min(5, len(df_master)), random_state=42)]
+        sample = pd.concat(parts)
+        if isinstance(sample.index, pd.DatetimeIndex):
             # Convert timestamp index to string column for JSON
-            temp = df_part.copy()
-            if isinstance(temp.index, pd.DatetimeIndex):
-                temp = temp.reset_index()
-                temp['fecha'] = temp['fecha'].astype(str)
-            return temp.to_dict(orient='records')
+            sample = sample.reset_index()
+            sample["fecha"] = sample["fecha"].astype(str)
+        records = sample.to_dict(orient="records")
+
+        bounds = np.cumsum([0] + [len(part) for part in parts])
+        return {
+            name: records[bounds[i]:bounds[i + 1]]
+            for i, name in enumerate(["head_5", "tail_5", "random_5"])
+        }
+
+    def _build_report(self, df_master, output_file):
+        """
+        Builds the phase report, reusing statistics recorded by earlier stages.
+
+        Null counts come from `_impute_post_merge` (adjusted by the anti-leakage
+        rule); they are only recomputed when the master was modified elsewhere.
+        Duplicate rows are detected on row hashes.
+        """
+        final_shape = df_master.shape
+        master_keys = self._keys_in(df_master)
+        codes = self._series_codes(df_master)
+        series_count = int(codes.max()) + 1 if codes is not None and len(codes) else 1
+
+        null_stats = getattr(self, "master_null_stats", None)
+        if null_stats is None or null_stats["rows"] != len(df_master):
+            null_stats = self._null_stats(df_master)
+        total_nulls = null_stats["total_nulls"]
 
-        head_5 = serialize_df(df_master.head(5))
-        tail_5 = serialize_df(df_master.tail(5))
-        random_5 = serialize_df(df_master.sample(5, random_state=42))
+        temporal = self._temporal_audit(df_master)
+        row_hashes = pd.util.hash_pandas_object(df_master, index=False).to_numpy()
+        duplicate_rows = int(len(row_hashes) - len(np.unique(row_hashes)))
+        file_size_bytes = output_file.stat().st_size if output_file.exists() else 0
 
-        report = {
+        return {
             "phase": "Phase 2 - Preprocessing",
             "timestamp": datetime.now().isoformat(),
             "environment_info": {
@@ -527,13 +1011,18 @@ class Preprocessor:
             },
             "execution_context": {
                 "description": "Limpieza exhaustiva, imputación de negocio, agregación mensual y corte de mes en curso (Anti-Data Leakage).",
-                "validation_status": "SUCCESS" if total_nulls == 0 and is_series_complete and duplicate_dates_count == 0 else "WARNING"
+                "validation_status": "SUCCESS" if total_nulls == 0 and temporal["is_series_complete"] and temporal["duplicate_dates_count"] == 0 else "WARNING"
             },
             "data_quality_audit": {
                 "contract_validation": self.data_contract_status if hasattr(self, 'data_contract_status') else {},
                 "schema_enforcement": {
                     "columns_removed": self.columns_removed_log
                 },
+                "load_pushdown": self.load_stats,
+                "memory_optimization": {
+                    "dtype_policy_enabled": bool(self._dtype_policy()),
+                    "bytes_saved_per_table": self.dtype_stats
+                },
                 "cleaning_stats": {
                     "rows_filtered_logic": self.stats_cleaning.get("filtered", {}),
                     "duplicates_removed": self.stats_cleaning.get("duplicates", {}),
@@ -541,7 +1030,8 @@ class Preprocessor:
                     "temporal_gaps_reindexed": self.reindex_stats
                 },
                 "imputation_metrics": {
-                    "financial_records_recalculated": int(self.imputed_sales_mask.sum()) if hasattr(self, 'imputed_sales_mask') else 0,
+                    "financial_records_recalculated": self._records_recalculated(),
+                    "financial_records_incomplete": int(getattr(self, "recalc_stats", {}).get("incomplete", 0)),
                     "remaining_nulls_final": total_nulls,
                     "details": self.imputation_stats
                 }
@@ -554,34 +1044,66 @@ class Preprocessor:
                     "rows": final_shape[0],
                     "columns": final_shape[1]
                 },
+                "series": {
+                    "keys": master_keys,
+                    "count": series_count
+                },
                 "temporal_coverage": {
-                    "start_date": date_min,
-                    "end_date": date_max,
+                    "start_date": temporal["start_date"],
+                    "end_date": temporal["end_date"],
                     "frequency": "MS (Month Start)",
-                    "total_months": total_months,
-                    "is_series_complete": is_series_complete,
-                    "missing_expected_dates": missing_expected_dates,
-                    "duplicate_dates_count": duplicate_dates_count
+                    "total_months": temporal["total_months"],
+                    "is_series_complete": temporal["is_series_complete"],
+                    "missing_expected_dates": temporal["missing_expected_dates"],
+                    "duplicate_dates_count": temporal["duplicate_dates_count"]
                 },
                 "data_integrity": {
                     "duplicate_rows": duplicate_rows,
-                    "rows_with_nulls": rows_with_nulls,
+                    "rows_with_nulls": null_stats["rows_with_nulls"],
                     "total_nulls": total_nulls
                 },
                 "schema": {
-                    "columns": columns_list,
-                    "dtypes": column_types
+                    "columns": df_master.columns.tolist(),
+                    "dtypes": df_master.dtypes.astype(str).to_dict()
                 }
             },
-            "sample_data": {
-                "head_5": head_5,
-                "tail_5": tail_5,
-                "random_5": random_5
-            }
+            "performance_profile": self.profiler.summary(),
+            "sample_data": self._sample_records(df_master)
         }
-        
-        report_path = self.artifacts_path / "phase_02_preprocessing.json"
-        with open(report_path, "w", encoding='utf-8') as f:
-            json.dump(report, f, indent=4)
-            
-        print(f"Detailed Report generated at: {report_path}")
+
+def _engine_class(engine: str, module: str, class_name: str, package: str):
+    """
+    Imports the backend of an engine with an optional dependency.
+
+    Raises:
+        ImportError: Naming the missing package if it is not installed.
+    """
+    try:
+        return getattr(importlib.import_module(module), class_name)
+    except ModuleNotFoundError as e:
+        if e.name != package:
+            raise
+        raise ImportError(
+            f"Preprocessing engine '{engine}' requires the optional package '{package}'. "
+            f"Install it with: pip install -r {ENGINE_REQUIREMENTS}"
+        ) from e
+
+def get_preprocessor(config: dict) -> Preprocessor:
+    """
+    Returns the preprocessor for the engine set in `preprocessing.engine`.
+
+    Raises:
+        ValueError: If the engine is unknown.
+        ImportError: If the engine's optional package is not installed.
+    """
+    engine = config.get("preprocessing", {}).get("engine", "pandas")
+    if engine == "pandas":
+        return Preprocessor(config)
+    if engine == "streaming":
+        from src.streaming import StreamingPreprocessor
+        return StreamingPreprocessor(config)
+    if engine == "polars":
+        return _engine_class("polars", "src.polars_engine", "PolarsPreprocessor", "polars")(config)
+    if engine == "duckdb":
+        return _engine_class("duckdb", "src.duckdb_engine", "DuckDBPreprocessor", "duckdb")(config)
+    raise ValueError(f"Unknown preprocessing engine '{engine}'. Options: ['pandas', 'streaming', 'polars', 'duckdb']")
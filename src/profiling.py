@@ -0,0 +1,125 @@
+import json
+import logging
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from src.utils import log_context
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, row counts and, optionally, peak memory per
+    pipeline stage.
+
+    Records are kept in memory for the phase report and optionally appended
+    to a JSON-lines trace file, one line per stage. Each completed stage is
+    also logged with its duration, and log records emitted inside a stage
+    carry the run_id, phase and stage fields.
+
+    Peak memory (`trace_memory`) uses tracemalloc, which hooks every Python
+    allocation and slows allocation-heavy stages several times over, so it
+    is off by default and meant for diagnostic runs.
+    """
+
+    def __init__(self, phase: str, enabled: bool = True, trace_memory: bool = False, trace_file=None, run_id: str = None):
+        self.phase = phase
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.trace_file = Path(trace_file) if trace_file else None
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_config(cls, config: dict, phase: str, section: str = "preprocessing", base_dir=None) -> "StageProfiler":
+        """
+        Builds a profiler from `<section>.instrumentation` in config.yaml.
+
+        Args:
+            config (dict): The configuration dictionary.
+            phase (str): Phase name written into every record.
+            section (str): Config section holding the `instrumentation` block.
+            base_dir: Directory the trace file path is relative to.
+        """
+        cfg = config.get(section, {}).get("instrumentation", {}) or {}
+        trace_file = cfg.get("trace_file")
+        if trace_file and base_dir is not None:
+            trace_file = Path(base_dir) / trace_file
+        return cls(
+            phase=phase,
+            enabled=cfg.get("enabled", True),
+            trace_memory=cfg.get("trace_memory", False),
+            trace_file=trace_file
+        )
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        """
+        Context manager timing one stage.
+
+        Yields the record dict so the caller can add fields such as `rows_out`.
+        """
+        with self.context(), log_context(stage=name):
+            yield from self._measure(name, rows_in)
+
+    def context(self):
+        """Log context with this run's run_id and phase."""
+        return log_context(run_id=self.run_id, phase=self.phase)
+
+    def _measure(self, name: str, rows_in: int = None):
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time_s"] = round(time.perf_counter() - wall_start, 6)
+            record["cpu_time_s"] = round(time.process_time() - cpu_start, 6)
+            if self.trace_memory:
+                record["peak_memory_bytes"] = int(tracemalloc.get_traced_memory()[1] - mem_start)
+            self.records.append(record)
+            self._write_trace(record)
+            logger.info(
+                "Stage %s finished in %.3fs", name, record["wall_time_s"],
+                extra={"duration_s": record["wall_time_s"], "rows_in": rows_in, "rows_out": record["rows_out"]}
+            )
+
+    def _write_trace(self, record: dict):
+        if self.trace_file is None:
+            return
+        self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+        line = {"run_id": self.run_id, "phase": self.phase, "timestamp": datetime.now().isoformat(), **record}
+        with open(self.trace_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line) + "\n")
+
+    def summary(self) -> dict:
+        """Returns the profile of the stages completed so far."""
+        return {
+            "run_id": self.run_id,
+            "enabled": self.enabled,
+            "total_wall_time_s": round(sum(r.get("wall_time_s", 0) for r in self.records), 6),
+            "stages": list(self.records)
+        }
+
+    def close(self):
+        """Stops tracemalloc if this profiler started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
@@ -0,0 +1,407 @@
+import logging
+import numpy as np
+import pandas as pd
+
+from src.preprocessor import Preprocessor
+
+logger = logging.getLogger(__name__)
+
+# Columns whose imputation depends on neighbouring rows (interpolation,
+# forward/backward fill). Rows after their last observed value stay pending
+# until the next batch brings a valid value. Macro: every numeric column.
+SEQUENTIAL_COLUMNS = {
+    "ventas": ["precio_unitario_full", "costo_unitario", "total_unidades_entregadas"],
+    "marketing": ["inversion_facebook", "inversion_instagram"],
+    "promo": []
+}
+
+# Imputation stats whose name does not derive from the imputed column
+STAT_COLUMNS = {
+    "campaigns_inferred": ["ciclo", "campana"],
+    "dates_missing_imputed": ["total_unidades_entregadas"]
+}
+
+
+class MonthlyCombiner:
+    """
+    Combines partial monthly aggregates of consecutive daily chunks.
+
+    Each chunk is reduced to one row per (series keys, month) holding the
+    partial state of every aggregation rule (sum; sum and count for mean;
+    first/last non-null; min/max). States are merged eagerly, so memory is
+    bounded by the number of months, not by the number of daily rows.
+    """
+
+    MERGE_RULES = {"sum": "sum", "count": "sum", "first": "first", "last": "last", "min": "min", "max": "max"}
+
+    def __init__(self, rules: dict, keys: list = None):
+        unsupported = {how for how in rules.values() if how != "mean" and how not in self.MERGE_RULES}
+        if unsupported:
+            raise ValueError(f"Aggregation rules not supported in streaming mode: {sorted(unsupported)}")
+        self.rules = dict(rules)
+        self.keys = list(keys or [])
+        self.state = None
+
+    def _partials(self):
+        """Partial state columns as (name, source column, function)."""
+        partials = []
+        for col, how in self.rules.items():
+            if how == "mean":
+                partials += [(f"{col}__sum", col, "sum"), (f"{col}__count", col, "count")]
+            else:
+                partials.append((col, col, how))
+        return partials
+
+    def update(self, df: pd.DataFrame):
+        """Adds a chunk of daily rows (with a `fecha` column) to the monthly state."""
+        if df.empty:
+            return
+        fechas = df["fecha"].to_numpy()
+        month = pd.Series(fechas.astype("datetime64[M]").astype(fechas.dtype), index=df.index, name="fecha")
+        grouped = df.groupby([df[k] for k in self.keys] + [month])
+        partial = pd.DataFrame({name: grouped[col].agg(how) for name, col, how in self._partials()})
+
+        if self.state is not None:
+            merge = {name: self.MERGE_RULES[how] for name, _, how in self._partials()}
+            partial = pd.concat([self.state, partial]).groupby(level=list(range(len(self.keys) + 1))).agg(merge)
+        self.state = partial
+
+    def result(self) -> pd.DataFrame:
+        """Final monthly frame indexed by (keys, fecha), or by fecha for a single series."""
+        if self.state is None:
+            return pd.DataFrame(columns=list(self.rules))
+
+        monthly = {}
+        for col, how in self.rules.items():
+            if how == "mean":
+                counts = self.state[f"{col}__count"]
+                monthly[col] = (self.state[f"{col}__sum"] / counts.where(counts > 0)).astype(float)
+            else:
+                monthly[col] = self.state[col]
+        monthly = pd.DataFrame(monthly, index=self.state.index)
+        if not self.keys:
+            monthly.index = pd.DatetimeIndex(monthly.index, name="fecha", freq="MS")
+        return monthly
+
+
+class StreamingPreprocessor(Preprocessor):
+    """
+    Out-of-core variant of the preprocessing pipeline.
+
+    Raw Parquet sources are scanned in Arrow record batches. Each batch is
+    cleaned, sentinel-replaced, reindexed and imputed with the same per-frame
+    helpers as `Preprocessor`, carrying a small look-back of raw rows so
+    interpolation and rolling windows see the same neighbours as the in-memory
+    run. Finalized daily rows are folded into a `MonthlyCombiner`, so peak
+    memory is bounded by `preprocessing.streaming.batch_rows` (plus the
+    longest run of missing values), not by the dataset size.
+
+    Sources must be sorted by (series keys, fecha). The monthly result then
+    goes through the regular unify, post-merge imputation and export stages.
+    """
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        stream_cfg = config.get("preprocessing", {}).get("streaming", {}) or {}
+        self.batch_rows = int(stream_cfg.get("batch_rows", 100000))
+        self.lookback_rows = max(int(stream_cfg.get("lookback_rows", 60)), int(self.macro_imputation["window"]), 1)
+        self.recalc_stats = {"rows": 0, "incomplete": 0}
+
+    def run(self):
+        """
+        Executes the streaming preprocessing pipeline.
+        """
+        logger.info("Starting Streaming Preprocessing Pipeline...")
+        macro_strategy = self.macro_imputation["strategy"]
+        if macro_strategy in ("mean", "median"):
+            raise ValueError(f"Macro imputation strategy '{macro_strategy}' needs the full history; not supported in streaming mode")
+
+        try:
+            self._run_stage(self._scan_schemas)
+            self._run_stage(self._validate_contract)
+            self._run_stage(self._standardize_names)
+            self._run_stage(self._enforce_schema)
+            self._run_stage(self._stream_sources)
+            df_master = self._run_stage(self._unify_sources)
+            df_master = self._run_stage(self._impute_post_merge, df_master)
+            df_master = self._run_stage(self._apply_anti_leakage_rule, df_master)
+            self._run_stage(self._export_and_report, df_master)
+        finally:
+            self.profiler.close()
+        logger.info("Streaming Preprocessing Pipeline Completed.")
+
+    def _stream_sources(self):
+        """Streams every source through cleaning, imputation and monthly aggregation."""
+        logger.info("Streaming sources in batches of %s rows...", self.batch_rows)
+        self.global_max_date = self._scan_max_date()
+        for key in self.files:
+            self.monthly_dfs[key] = self._stream_source(key)
+            logger.info("  - %s: %s batches -> %s", key, self.load_stats[key]['batches'], self.monthly_dfs[key].shape)
+
+        logger.info("Cleaning Statistics: %s", self.stats_cleaning)
+        logger.info("Sentinels replaced: %s", self.sentinel_stats)
+        logger.info("Rows added by reindexing: %s", self.reindex_stats)
+        logger.info("Aggregation completed.")
+
+    def _batches(self, key, dataset, columns, date_filter):
+        """Yields record batches of a source, in file order."""
+        return dataset.to_batches(columns=columns, filter=date_filter, batch_size=self.batch_rows)
+
+    def _scan_max_date(self):
+        """Latest date across all sources after the `min_date` filter, reading only `fecha`."""
+        filters = self.config.get("preprocessing", {}).get("filters", {})
+        min_date = pd.to_datetime(filters.get("min_date", "2018-01-01"))
+
+        max_dates = []
+        for key in self.files:
+            dataset, _, _, date_filter = self._scan_plan(key)
+            if "fecha" not in dataset.schema.names:
+                continue
+            for batch in self._batches(key, dataset, ["fecha"], date_filter):
+                fechas = pd.to_datetime(batch.column("fecha").to_pandas())
+                fechas = fechas[fechas >= min_date]
+                if not fechas.empty:
+                    max_dates.append(fechas.max())
+        return max(max_dates) if max_dates else pd.Timestamp.now().normalize()
+
+    def _prepare_batch(self, key, batch, columns):
+        """Renames, enforces the schema and applies the dtype policy to one raw batch."""
+        rename_map = self.config.get("preprocessing", {}).get("rename_map") or {}
+        df = batch.to_pandas().rename(columns=rename_map)
+        df.columns = [col.lower().replace(" ", "_") for col in df.columns]
+        df = df[columns]
+
+        previous = self.dtype_stats.get(key)
+        df = self._apply_dtype_policy(df, key)
+        if previous and key in self.dtype_stats:
+            self.dtype_stats[key] = {stat: previous[stat] + self.dtype_stats[key][stat] for stat in previous}
+        return df
+
+    def _stream_source(self, key):
+        """Streams one source and returns its monthly aggregate."""
+        filters = self.config.get("preprocessing", {}).get("filters", {})
+        min_date = pd.to_datetime(filters.get("min_date", "2018-01-01"))
+        columns = list(self.dataframes[key].columns)
+        keys = [k for k in self.series_keys if k in columns]
+        series_cols = keys + ["fecha"]
+
+        dataset, scan_columns, columns_skipped, date_filter = self._scan_plan(key)
+        stats = {"rows_read": 0, "rows_filtered": 0, "columns_read": [], "columns_skipped": columns_skipped, "batches": 0}
+        self.stats_cleaning["duplicates"][key] = 0
+        self.stats_cleaning["filtered"][key] = 0
+        self.sentinel_stats[key] = 0
+        self.reindex_stats[key] = 0
+
+        combiner = None
+        carry = None  # (raw rows of the open series, rows already emitted)
+        finished = set()
+        dtypes = None
+
+        for batch in self._batches(key, dataset, scan_columns, date_filter):
+            stats["rows_read"] += batch.num_rows
+            stats["batches"] += 1
+            stats["columns_read"] = batch.schema.names
+            df = self._prepare_batch(key, batch, columns)
+
+            df, duplicates, filtered = self._clean_frame(df, min_date)
+            self.stats_cleaning["duplicates"][key] += duplicates
+            self.stats_cleaning["filtered"][key] += filtered
+            if df.empty:
+                continue
+            self.sentinel_stats[key] += self._replace_sentinels(key, df)
+            if dtypes is None:
+                # Categories differ between batches: restore to a plain 'category'
+                dtypes = {col: "category" if isinstance(dtype, pd.CategoricalDtype) else dtype for col, dtype in df.dtypes.items()}
+
+            if combiner is None:
+                combiner = MonthlyCombiner(self._streaming_rules(key, df), keys)
+
+            n_context = 0
+            if carry is not None:
+                self._check_order(key, carry[0], df, keys, finished)
+                combined = pd.concat([carry[0], df], ignore_index=True)
+                duplicated = combined.duplicated(subset=series_cols, keep="last")
+                self.stats_cleaning["duplicates"][key] += int(duplicated.sum())
+                df = combined[~duplicated].sort_values(series_cols, kind="stable").reset_index(drop=True)
+                n_context = carry[1]
+
+            carry = self._process_segments(key, df, keys, n_context, carry, combiner, finished, dtypes, final=False)
+
+        if carry is not None:
+            self._process_segments(key, carry[0], keys, carry[1], carry, combiner, finished, dtypes, final=True)
+
+        if date_filter is not None:
+            stats["rows_filtered"] = int(dataset.count_rows() - stats["rows_read"])
+        self.stats_cleaning["filtered"][key] += stats["rows_filtered"]
+        self.load_stats[key] = stats
+        self.imputation_stats[key] = {stat: int(count) for stat, count in self.imputation_stats[key].items()}
+
+        if combiner is None:
+            return pd.DataFrame()
+        df_monthly = self._restore_dtypes(combiner.result(), dtypes)
+        if key == "promo" and "es_promo" in df_monthly.columns:
+            df_monthly.rename(columns={"es_promo": "dias_en_promo"}, inplace=True)
+        return df_monthly
+
+    def _streaming_rules(self, key, df):
+        """Aggregation rules of a source, defaulting to a numeric sum like `_aggregate_frame`."""
+        rules = self._aggregation_rules(key, df)
+        if not rules:
+            keys = self._keys_in(df)
+            rules = {col: "sum" for col in df.select_dtypes(include=np.number).columns if col not in keys}
+        return rules
+
+    def _check_order(self, key, carried, df, keys, finished):
+        """
+        Ensures the new batch continues the carried series chronologically.
+
+        Raises:
+            ValueError: If a series reappears after being closed or dates go backwards.
+        """
+        carried_series = tuple(carried[keys].iloc[-1]) if keys else ()
+        if keys:
+            batch_series = set(map(tuple, df[keys].drop_duplicates().itertuples(index=False)))
+            reopened = batch_series & finished
+            if reopened:
+                raise ValueError(f"{key}: series {sorted(reopened)} reappear in a later batch; streaming requires input sorted by {keys + ['fecha']}")
+            same = (df[keys] == pd.Series(carried_series, index=keys)).all(axis=1)
+        else:
+            same = pd.Series(True, index=df.index)
+        if same.any() and df.loc[same, "fecha"].min() < carried["fecha"].iloc[-1]:
+            raise ValueError(f"{key}: dates go backwards across batches; streaming requires input sorted by {keys + ['fecha']}")
+
+    def _process_segments(self, key, df, keys, n_context, carry, combiner, finished, dtypes, final):
+        """
+        Processes every series of a batch. Series closed by the batch are
+        finalized; the last one stays open and its raw tail is returned as the
+        new carry.
+        """
+        if keys:
+            codes = df.groupby(keys, sort=False).ngroup().to_numpy()
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            segments = np.split(np.arange(len(df)), bounds)
+        else:
+            segments = [np.arange(len(df))]
+
+        carried_series = tuple(carry[0][keys].iloc[-1]) if carry is not None and keys else ()
+        new_carry = None
+        for i, rows in enumerate(segments):
+            segment = df.iloc[rows].reset_index(drop=True)
+            series = tuple(segment[keys].iloc[0]) if keys else ()
+            is_carried = carry is not None and series == carried_series
+            is_last = i == len(segments) - 1
+            new_carry = self._process_segment(
+                key, segment,
+                n_context=n_context if is_carried else 0,
+                start=segment["fecha"].iloc[0] if is_carried else None,
+                combiner=combiner,
+                dtypes=dtypes,
+                final=final or not is_last
+            )
+            if final or not is_last:
+                finished.add(series)
+        return new_carry
+
+    def _process_segment(self, key, raw, n_context, start, combiner, dtypes, final):
+        """
+        Reindexes, imputes and emits the finalized rows of one series segment.
+
+        Args:
+            key (str): Source key.
+            raw (pd.DataFrame): Cleaned rows of one series; the first `n_context`
+                were already emitted and are only look-back context.
+            n_context (int): Number of leading context rows.
+            start: First grid date, or None for a new series (grid starts at `min_date`).
+            combiner (MonthlyCombiner): Receives the finalized daily rows.
+            dtypes: Source dtypes restored after imputation.
+            final (bool): Whether the series is complete (grid runs to the global max date).
+
+        Returns:
+            tuple: (raw carry frame, rows of it already emitted), or None when final.
+        """
+        if start is None:
+            filters = self.config.get("preprocessing", {}).get("filters", {})
+            start = pd.to_datetime(filters.get("min_date", "2018-01-01"))
+        end = self.global_max_date if final else raw["fecha"].iloc[-1]
+
+        frame, rows_added = self._reindex_frame(key, raw, start, end)
+        self.reindex_stats[key] += rows_added
+
+        imputed = frame.copy()
+        stats, imputed_mask = self._impute_source(key, imputed)
+        imputed = self._restore_dtypes(imputed, dtypes)
+
+        sequential = self._sequential_values(key, frame)
+        cut = len(frame) if final else self._finalized_rows(sequential, len(frame))
+        cut = max(cut, n_context)
+
+        if cut > n_context:
+            emitted = imputed.iloc[n_context:cut].copy()
+            if imputed_mask is not None:
+                emitted_mask = imputed_mask.iloc[n_context:cut]
+                if self.config.get("preprocessing", {}).get("recalc_financials", False) and emitted_mask.any():
+                    counts = self._recalculate_frame(emitted, emitted_mask)
+                    self.recalc_stats = {stat: self.recalc_stats[stat] + counts[stat] for stat in counts}
+                    emitted = self._restore_dtypes(emitted, dtypes)
+            self._count_imputed(key, stats, frame.iloc[n_context:cut])
+            combiner.update(emitted)
+
+        if final:
+            return None
+        carry_start = self._carry_start(sequential, cut)
+        return frame.iloc[carry_start:].reset_index(drop=True), cut - carry_start
+
+    def _impute_source(self, key, df):
+        """Runs the business imputation of one source. Returns (stats, imputed sales mask or None)."""
+        if key == "ventas":
+            return self._impute_ventas(df)
+        imputers = {"macro": self._impute_macro, "promo": self._impute_promo, "marketing": self._impute_marketing}
+        return imputers[key](df), None
+
+    def _sequential_values(self, key, frame):
+        """Raw values (rows x columns) of the columns imputed from neighbouring rows."""
+        if key == "macro":
+            columns = [col for col in frame.select_dtypes(include=np.number).columns if col not in self.series_keys]
+        else:
+            columns = [col for col in SEQUENTIAL_COLUMNS.get(key, []) if col in frame.columns]
+        return frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def _finalized_rows(self, sequential, n_rows):
+        """
+        Number of leading rows whose imputation can no longer change.
+
+        Rows after the last observed value of any sequential column wait for
+        the next batch, and so does the last date (it may be duplicated there).
+        """
+        cut = n_rows - 1
+        if sequential.shape[1]:
+            valid = ~np.isnan(sequential)
+            last_valid = np.where(valid.any(axis=0), n_rows - 1 - np.argmax(valid[::-1], axis=0), -1)
+            cut = min(cut, int(last_valid.min()) + 1)
+        return max(cut, 0)
+
+    def _carry_start(self, sequential, cut):
+        """
+        First row to carry: `lookback_rows` before the cut, extended back to
+        the last observed value of every sequential column.
+        """
+        start = max(cut - self.lookback_rows, 0)
+        if sequential.shape[1] and cut > 0:
+            valid = ~np.isnan(sequential[:cut])
+            has_valid = valid.any(axis=0)
+            if has_valid.any():
+                last_valid = cut - 1 - np.argmax(valid[::-1], axis=0)
+                start = min(start, int(last_valid[has_valid].min()))
+        return start
+
+    def _count_imputed(self, key, stats, raw_emitted):
+        """Adds the nulls imputed in the emitted rows to the imputation stats."""
+        nulls = raw_emitted.isna().sum()
+        totals = self.imputation_stats[key]
+        for stat in stats:
+            candidates = STAT_COLUMNS.get(stat) or [stat] + [
+                stat[: -len(suffix)] for suffix in ("_inferred", "_imputed", "_filled") if stat.endswith(suffix)
+            ]
+            column = next((col for col in candidates if col in nulls.index), None)
+            if column is not None:
+                totals[stat] = totals.get(stat, 0) + int(nulls[column])
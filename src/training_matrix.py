@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FEATURES_FILE = "X.npy"
+TARGET_FILE = "y.npy"
+METADATA_FILE = "metadata.json"
+
+
+def _save_array(path: Path, array: np.ndarray):
+    """Writes an .npy file atomically (temporary file + rename)."""
+    tmp_path = path.with_suffix(".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def export_training_matrix(df: pd.DataFrame, target_col: str, feature_cols: list, out_dir, dtype="float32", metadata: dict = None) -> dict:
+    """
+    Saves a training-ready copy of the features: a C-contiguous feature block
+    `X.npy` (rows x features), the target vector `y.npy` and `metadata.json`.
+
+    The arrays are written once in the training dtype, so workers can
+    memory-map them (`load_training_matrix`) instead of converting the
+    pandas frame on every fit.
+
+    Args:
+        df (pd.DataFrame): Engineered frame.
+        target_col (str): Target column.
+        feature_cols (list): Feature columns, in matrix order.
+        out_dir: Output directory.
+        dtype: Matrix dtype.
+        metadata (dict): Extra metadata fields (e.g. feature version).
+
+    Returns:
+        dict: The written metadata.
+
+    Raises:
+        ValueError: If a column is missing or not numeric.
+    """
+    missing = [col for col in feature_cols + [target_col] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Training matrix columns not found: {missing}")
+    non_numeric = [col for col in feature_cols + [target_col] if not pd.api.types.is_numeric_dtype(df[col])]
+    if non_numeric:
+        raise ValueError(f"Training matrix columns must be numeric: {non_numeric}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / METADATA_FILE).unlink(missing_ok=True)
+    X = np.ascontiguousarray(df[feature_cols].to_numpy(dtype=dtype, na_value=np.nan))
+    y = np.ascontiguousarray(df[target_col].to_numpy(dtype=dtype, na_value=np.nan))
+    _save_array(out_dir / FEATURES_FILE, X)
+    _save_array(out_dir / TARGET_FILE, y)
+
+    # Metadata last: its presence marks a complete export
+    info = {
+        "created_at": datetime.now().isoformat(),
+        "dtype": str(X.dtype),
+        "shape": list(X.shape),
+        "target": target_col,
+        "columns": list(feature_cols),
+        "index_name": df.index.name,
+        "index": [value.isoformat() if hasattr(value, "isoformat") else value for value in df.index],
+        **(metadata or {})
+    }
+    with open(out_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=4, default=str)
+    logger.info("Training matrix %s (%s) saved to %s", X.shape, X.dtype, out_dir)
+    return info
+
+
+def load_training_matrix(out_dir, mmap: bool = True):
+    """
+    Loads a training matrix written by `export_training_matrix`.
+
+    Args:
+        out_dir: Export directory.
+        mmap (bool): Memory-map the arrays read-only (zero copy, shared by
+            the page cache across worker processes).
+
+    Returns:
+        tuple: (X, y, metadata).
+
+    Raises:
+        FileNotFoundError: If the export is missing or incomplete.
+    """
+    out_dir = Path(out_dir)
+    metadata_file = out_dir / METADATA_FILE
+    if not metadata_file.exists():
+        raise FileNotFoundError(f"Training matrix not found at: {out_dir}")
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    mmap_mode = "r" if mmap else None
+    X = np.load(out_dir / FEATURES_FILE, mmap_mode=mmap_mode)
+    y = np.load(out_dir / TARGET_FILE, mmap_mode=mmap_mode)
+    return X, y, metadata
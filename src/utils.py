@@ -1,13 +1,141 @@
+import atexit
+import contextvars
 import logging
+import logging.handlers
 import json
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
 import yaml
 
-def setup_logging(config_path: str = "config.yaml"):
+try:
+    import orjson
+except ImportError:  # Optional fast serializer (requirements-engines.txt); falls back to the stdlib json
+    orjson = None
+
+# Fields copied from the log context / `extra` into structured records
+LOG_FIELDS = ("run_id", "phase", "stage", "duration_s", "rows_in", "rows_out")
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_log_context = contextvars.ContextVar("log_context", default={})
+_log_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Adds fields (run_id, phase, stage...) to every log record emitted inside the block.
+
+    Context variables follow the calling thread/task, so concurrent stages
+    keep their own fields.
     """
-    Sets up logging configuration.
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the active log context onto each record (explicit `extra` wins)."""
+
+    def filter(self, record):
+        for field, value in _log_context.get().items():
+            if not hasattr(record, field):
+                setattr(record, field, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line for log ingestion."""
+
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=_json_value)
+
+
+def _formatter(name: str) -> logging.Formatter:
+    return JsonFormatter() if name == "json" else logging.Formatter(TEXT_FORMAT)
+
+
+def _stop_log_listener():
+    """Flushes pending records and stops the queue listener, if running."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+atexit.register(_stop_log_listener)
+
+
+def setup_logging(config=None):
     """
-    # TODO: Load config and setup logging
-    pass
+    Configures the root logger from the `logging` section of config.yaml.
+
+    Records are enqueued by a QueueHandler on the calling thread and written
+    to the console and the JSON-lines file by a QueueListener thread, so log
+    I/O never blocks the pipeline. Calling it again replaces the previous
+    configuration.
+
+    Args:
+        config (dict | str): Configuration dictionary or path to the YAML file.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener, or None when
+            `logging.queue` is disabled.
+    """
+    global _log_listener
+    if config is None or isinstance(config, (str, Path)):
+        config = load_config(config or "config.yaml")
+    log_cfg = config.get("logging", {}) or {}
+
+    handlers = []
+    if log_cfg.get("console", True):
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(_formatter(log_cfg.get("console_format", "text")))
+        handlers.append(console)
+    if log_cfg.get("file"):
+        log_file = Path(log_cfg["file"])
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(_formatter(log_cfg.get("file_format", "json")))
+        handlers.append(file_handler)
+
+    _stop_log_listener()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(str(log_cfg.get("level", "INFO")).upper())
+
+    if log_cfg.get("queue", True):
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(ContextFilter())
+        root.addHandler(queue_handler)
+        _log_listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        return _log_listener
+
+    for handler in handlers:
+        handler.addFilter(ContextFilter())
+        root.addHandler(handler)
+    return None
 
 def load_config(config_path: str = "config.yaml") -> dict:
     """
@@ -22,13 +150,69 @@ def load_config(config_path: str = "config.yaml") -> dict:
     with open(config_path, 'r') as file:
         return yaml.safe_load(file)
 
+JSON_INDENT = 2  # The only indent orjson supports; the stdlib path matches it
+
+def _json_value(obj):
+    """
+    Converts a scalar to a plain JSON value: numpy scalars to Python,
+    timestamps to ISO strings, NaN/inf and missing values to None.
+
+    Used by `save_json` and as the `default` of the structured log formatter.
+
+    Raises:
+        TypeError: If the value has no JSON representation.
+    """
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float):
+        return obj if np.isfinite(obj) else None
+    if obj is None or obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (str, int)):
+        return obj
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_key(key) -> str:
+    """Object keys as strings, the same way on every serializer path."""
+    key = _json_value(key)
+    if isinstance(key, bool) or key is None:
+        return json.dumps(key)
+    return str(key)
+
+def _json_ready(obj):
+    """
+    Normalizes a payload to plain JSON types before serializing.
+
+    NaN/inf and missing values become null and keys become strings, so the
+    written file is the same with and without orjson (and is valid JSON).
+    """
+    if isinstance(obj, dict):
+        return {_json_key(key): _json_ready(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, set, np.ndarray)):
+        return [_json_ready(value) for value in obj]
+    return _json_value(obj)
+
 def save_json(data: dict, filepath: str):
     """
     Saves a dictionary to a JSON file.
+
+    The payload is normalized first (see `_json_ready`) and written with a
+    2-space indent and UTF-8 text, using orjson when installed (several
+    times faster on large reports) or the standard library json module.
+    Both paths write the same keys, values, nulls and layout; only the
+    exponent notation of very large or small floats may differ.
     
     Args:
         data (dict): The data to save.
         filepath (str): The output file path.
     """
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=4)
+    data = _json_ready(data)
+    if orjson is not None:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=JSON_INDENT, ensure_ascii=False, allow_nan=False)
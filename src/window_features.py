@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.imputation import group_bounds
+
+# Statistics over each rolling window (axis -1 of the window view). Like pandas
+# `rolling(window)`, a window with any missing value yields NaN.
+ROLLING_STATS = {
+    "mean": lambda windows: windows.mean(axis=-1),
+    "sum": lambda windows: windows.sum(axis=-1),
+    "std": lambda windows: windows.std(axis=-1, ddof=1),
+    "min": lambda windows: windows.min(axis=-1),
+    "max": lambda windows: windows.max(axis=-1),
+}
+
+EXPANDING_STATS = ("mean", "sum", "std")
+
+
+def _expanding(values: np.ndarray, stats, start: np.ndarray) -> dict:
+    """
+    Expanding statistics of every column up to each row (NaNs skipped), within groups.
+
+    Cumulative sums are rebased at each group start, so the whole block is
+    processed with three cumsums regardless of the number of series.
+    """
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, values.shape[1]))
+    csum = np.vstack([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    csq = np.vstack([zeros, np.cumsum(np.where(valid, values, 0.0) ** 2, axis=0)])
+    ccount = np.vstack([zeros, np.cumsum(valid, axis=0)])
+
+    end = np.arange(1, values.shape[0] + 1)
+    total = csum[end] - csum[start]
+    squares = csq[end] - csq[start]
+    count = ccount[end] - ccount[start]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+        var = np.where(count > 1, (squares - count * mean ** 2) / (count - 1), np.nan)
+    results = {"mean": mean, "sum": np.where(count > 0, total, np.nan), "std": np.sqrt(np.clip(var, 0, None))}
+    return {stat: results[stat] for stat in stats}
+
+
+def window_feature_names(columns, lags=(), windows=(), stats=("mean",), expanding=()) -> list:
+    """Output columns of `window_features`, in the order they are produced."""
+    names = [f"{col}_lag_{lag}" for lag in lags for col in columns]
+    names += [f"{col}_roll_{stat}_{window}" for window in windows for stat in stats for col in columns]
+    names += [f"{col}_exp_{stat}" for stat in expanding for col in columns]
+    return names
+
+
+def window_features(df: pd.DataFrame, columns, lags=(), windows=(), stats=("mean",), expanding=(),
+                    shift: int = 0, fill_value=np.nan, groups=None) -> pd.DataFrame:
+    """
+    Builds lag, rolling and expanding features for many columns at once.
+
+    The columns are read once into a contiguous rows x columns block. Lags
+    are one gather over all (lag, column) pairs. Rolling statistics are
+    reduced over a zero-copy `sliding_window_view` per window size, and
+    expanding statistics use cumulative sums. All outputs are returned
+    as a single frame.
+
+    Args:
+        df (pd.DataFrame): Frame sorted by (series, date).
+        columns (list): Numeric columns to derive features from.
+        lags (list): Lags, named `{col}_lag_{lag}`.
+        windows (list): Rolling window sizes, named `{col}_roll_{stat}_{window}`.
+        stats (list): Rolling statistics, keys of ROLLING_STATS.
+        expanding (list): Expanding statistics (EXPANDING_STATS), named `{col}_exp_{stat}`.
+        shift (int): Rows between a window's last value and the current row
+            (1 = only past values, no leakage of the current month).
+        fill_value: Value of rows without enough history.
+        groups: Contiguous integer series codes, or None for a single series.
+
+    Returns:
+        pd.DataFrame: The new columns, indexed like `df`.
+
+    Raises:
+        ValueError: If a statistic is unknown or a lag/window is not positive.
+    """
+    columns, lags, windows = list(columns), [int(lag) for lag in lags], [int(w) for w in windows]
+    unknown = sorted(set(stats) - set(ROLLING_STATS)) + sorted(set(expanding) - set(EXPANDING_STATS))
+    if unknown:
+        raise ValueError(f"Unknown window statistics {unknown}. Options: {list(ROLLING_STATS)}")
+    if any(value < 1 for value in lags + windows) or shift < 0:
+        raise ValueError("Lags and windows must be >= 1 and shift >= 0")
+
+    n_rows = len(df)
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64, na_value=np.nan))
+    start = group_bounds(groups, n_rows)[0][:, 0]
+    rows = np.arange(n_rows)
+    blocks = []
+
+    # Padding on top so every lag/window index is valid; padded rows are NaN
+    pad = max(lags + [w + shift - 1 for w in windows] + [0])
+    padded = np.vstack([np.full((pad, len(columns)), np.nan), values])
+
+    if lags:
+        lag_arr = np.asarray(lags)
+        source = rows[:, None] - lag_arr[None, :]
+        lagged = padded[source + pad]
+        lagged[source < start[:, None]] = np.nan
+        blocks.append(lagged.reshape(n_rows, -1))
+
+    for window in windows:
+        first = rows - shift - window + 1
+        view = sliding_window_view(padded, window, axis=0)[first + pad]
+        complete = (first >= start)[:, None]
+        for stat in stats:
+            blocks.append(np.where(complete, ROLLING_STATS[stat](view), np.nan))
+
+    if expanding:
+        # Expanding stats at row t cover [group start, t - shift]
+        shifted = np.full_like(values, np.nan)
+        if shift:
+            shifted[shift:] = values[:-shift]
+            shifted[rows - shift < start] = np.nan
+        else:
+            shifted = values
+        for result in _expanding(shifted, expanding, start).values():
+            blocks.append(result)
+
+    if not blocks:
+        return pd.DataFrame(index=df.index)
+
+    result = np.hstack(blocks)
+    if not (isinstance(fill_value, float) and np.isnan(fill_value)):
+        result = np.where(np.isnan(result), fill_value, result)
+    return pd.DataFrame(result, index=df.index, columns=window_feature_names(columns, lags, windows, stats, expanding))
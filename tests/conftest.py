@@ -0,0 +1,141 @@
+"""Shared fixtures for the alternative preprocessing engines."""
+import pytest
+import pandas as pd
+import numpy as np
+
+# --- Fixtures ---
+
+@pytest.fixture
+def engine_config():
+    """Config with full daily contracts so every imputation branch runs."""
+    return {
+        "data_contract": {
+            "ventas_diarias": {
+                "fecha": "datetime",
+                "total_unidades_entregadas": "int",
+                "unidades_precio_normal": "int",
+                "unidades_promo_pagadas": "int",
+                "unidades_promo_bonificadas": "int",
+                "precio_unitario_full": "float",
+                "costo_unitario": "float",
+                "ingresos_totales": "float",
+                "costo_total": "float",
+                "utilidad": "float"
+            },
+            "redes_sociales": {
+                "fecha": "datetime",
+                "ciclo": "object",
+                "inversion_facebook": "float",
+                "inversion_instagram": "float"
+            },
+            "promocion_diaria": {
+                "fecha": "datetime",
+                "es_promo": "int"
+            },
+            "macro_economia": {
+                "fecha": "datetime",
+                "ipc_mensual": "float"
+            }
+        },
+        "preprocessing": {
+            "rename_map": {},
+            "data_frequency": {
+                "ventas_diarias": "D",
+                "redes_sociales": "D",
+                "promocion_diaria": "D",
+                "macro_economia": "MS"
+            },
+            "filters": {
+                "min_date": "2023-01-01"
+            },
+            "recalc_financials": True,
+            "macro_imputation": {"strategy": "rolling_mean", "window": 3},
+            "streaming": {"batch_rows": 16, "lookback_rows": 5},
+            "instrumentation": {"enabled": False, "trace_file": None},
+            "aggregation_rules": {
+                "total_unidades_entregadas": "sum",
+                "unidades_precio_normal": "sum",
+                "unidades_promo_pagadas": "sum",
+                "unidades_promo_bonificadas": "sum",
+                "ingresos_totales": "sum",
+                "costo_total": "sum",
+                "utilidad": "sum",
+                "precio_unitario_full": "mean",
+                "costo_unitario": "mean",
+                "inversion_facebook": "sum",
+                "inversion_instagram": "sum",
+                "es_promo": "sum",
+                "ipc_mensual": "first"
+            }
+        },
+        "quality": {
+            "sentinel_values": {
+                "numeric": [-1, 999],
+                "text": ["NULL"]
+            }
+        }
+    }
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """Writes raw parquet sources with gaps, duplicates, sentinels and nulls."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2022-12-20", "2023-07-10", freq="D")
+    n = len(dates)
+
+    units = rng.integers(50, 100, n).astype(float)
+    units[[30, 31, 32, 90]] = np.nan
+    units[60] = 999
+    price = np.full(n, 5000.0)
+    price[[40, 41, 120]] = np.nan
+    ventas = pd.DataFrame({
+        "fecha": dates,
+        "total_unidades_entregadas": units,
+        "unidades_precio_normal": units - 10,
+        "unidades_promo_pagadas": 5.0,
+        "unidades_promo_bonificadas": 5.0,
+        "precio_unitario_full": price,
+        "costo_unitario": 2000.0,
+        "ingresos_totales": units * 5000.0,
+        "costo_total": units * 2000.0,
+        "utilidad": units * 3000.0,
+        "extra_col": 1
+    }).drop(index=[70, 71, 150])
+    # Duplicated date straddling a batch boundary
+    ventas = pd.concat([ventas.iloc[:45], ventas.iloc[[44]].assign(total_unidades_entregadas=77.0), ventas.iloc[45:]])
+
+    inversion = rng.uniform(100, 200, n)
+    inversion[[100, 101, 102, 103, 104, 105]] = np.nan
+    marketing = pd.DataFrame({
+        "fecha": dates,
+        "ciclo": np.where(np.arange(n) % 7 == 0, "NULL", "Ciclo Abr-May"),
+        "inversion_facebook": inversion,
+        "inversion_instagram": inversion / 2
+    })
+
+    promo = pd.DataFrame({"fecha": dates, "es_promo": (np.arange(n) % 3 == 0).astype(float)})
+    promo.loc[[10, 11, 95], "es_promo"] = np.nan
+
+    months = pd.date_range("2022-12-01", "2023-07-01", freq="MS")
+    macro = pd.DataFrame({"fecha": months, "ipc_mensual": [4.0, 4.1, np.nan, np.nan, 4.4, -1, 4.6, 4.7]})
+
+    raw = tmp_path / "data" / "01_raw"
+    raw.mkdir(parents=True)
+    for name, df in {
+        "ventas_diarias": ventas, "redes_sociales": marketing,
+        "promocion_diaria": promo, "macro_economia": macro
+    }.items():
+        df.to_parquet(raw / f"{name}.parquet", row_group_size=20)
+    return tmp_path
+
+@pytest.fixture
+def run_engine(raw_dir, monkeypatch):
+    """Runs a preprocessor class on `raw_dir` and returns (preprocessor, master)."""
+    monkeypatch.chdir(raw_dir)
+
+    def run(cls, config):
+        prep = cls(config)
+        prep.run()
+        master = pd.read_parquet(raw_dir / "data" / "02_cleansed" / "master_monthly.parquet")
+        return prep, master
+    return run
@@ -0,0 +1,84 @@
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from src import calendar_dim
+from src.calendar_dim import CalendarDimension
+
+@pytest.fixture
+def mock_config():
+    return {
+        'preprocessing': {'filters': {'min_date': '2023-01-01'}},
+        'validation': {'horizon_months': 6},
+        'business_events': {
+            'novenas': {'start_day': 16, 'end_day': 23, 'month': 12},
+            'primas': {'months': [6, 12], 'day_range': [15, 20]},
+            'promotions': {'windows': [[4, 5], [9, 10]]},
+            'peak_days': {'days': ['Saturday', 'Sunday'], 'holidays_as': 'Saturday'},
+            'holidays': ['2023-01-09'],
+            'pandemic': {'start_date': '2020-04-01', 'end_date': '2021-12-31'}
+        }
+    }
+
+def test_calendar_range_and_cache(mock_config):
+    cal = CalendarDimension.from_config(mock_config, end='2023-12-15')
+    assert cal.start == pd.Timestamp('2023-01-01')
+    assert cal.end == pd.Timestamp('2023-12-31')
+    assert len(cal.frame) == 365
+    # Same parameters must hit the cache
+    assert CalendarDimension.from_config(mock_config, end='2023-12-20') is cal
+
+def test_calendar_default_end_is_stable(mock_config, monkeypatch):
+    calendars = []
+    for today in [datetime(2023, 3, 2, 9, 30), datetime(2023, 5, 17, 18, 0)]:
+        monkeypatch.setattr(calendar_dim, 'datetime', type('FixedDatetime', (), {'now': staticmethod(lambda today=today: today)}))
+        calendars.append(CalendarDimension.from_config(mock_config))
+
+    # The default end is the year end after the horizon, not today: the cache survives new days
+    assert calendars[0].end == pd.Timestamp('2023-12-31')
+    assert calendars[1] is calendars[0]
+
+def test_calendar_rule_masks(mock_config):
+    cal = CalendarDimension.from_config(mock_config, end='2023-12-31')
+    dates = pd.to_datetime(['2023-03-14', '2023-03-15', '2023-05-25', '2023-05-26', '2023-12-16', '2023-12-24'])
+    
+    assert cal.lookup('is_campaign_window', dates).tolist() == [0, 1, 1, 0, 0, 0]
+    assert cal.lookup('is_novenas', dates).tolist() == [0, 0, 0, 0, 1, 0]
+    assert cal.campaign_label(dates).tolist() == [
+        'Ciclo Abr-May', 'Ciclo Abr-May', 'Ciclo Abr-May', 'Ciclo Abr-May', 'Sin Campaña', 'Sin Campaña'
+    ]
+    # 2023-01-09 is a Monday holiday treated as Saturday
+    assert cal.lookup('is_peak_day', pd.to_datetime(['2023-01-09', '2023-01-10'])).tolist() == [1, 0]
+
+def test_calendar_monthly_aggregation(mock_config):
+    cal = CalendarDimension.from_config(mock_config, end='2023-12-31')
+    months = pd.date_range('2023-01-01', '2023-12-01', freq='MS')
+    
+    primas_days = cal.monthly('is_primas', months, how='sum')
+    assert primas_days[5] == 6 and primas_days[11] == 6
+    assert primas_days.sum() == 12
+    assert cal.monthly('is_novenas', months, how='max').tolist() == [0] * 11 + [1]
+
+def test_calendar_out_of_range(mock_config):
+    cal = CalendarDimension.from_config(mock_config, end='2023-12-31')
+    with pytest.raises(ValueError):
+        cal.offsets(pd.to_datetime(['2022-12-31']))
+    
+    extended = CalendarDimension.for_dates(mock_config, pd.to_datetime(['2022-06-15']))
+    assert extended.start <= pd.Timestamp('2022-06-15')
+
+def test_calendar_monthly_many(mock_config):
+    cal = CalendarDimension.from_config(mock_config, end='2023-12-31')
+    months = pd.date_range('2023-01-01', '2023-12-01', freq='MS')
+    columns = ['is_novenas', 'is_weekend', 'is_holiday', 'is_peak_day']
+
+    counts = cal.monthly_many(columns, months, how='sum')
+    assert counts.shape == (12, 4)
+    for i, col in enumerate(columns):
+        np.testing.assert_array_equal(counts[:, i], cal.monthly(col, months, how='sum'))
+    # January 2023: 9 weekend days plus the Monday holiday treated as Saturday
+    assert counts[0].tolist() == [0, 9, 1, 10]
+    assert counts[:, 0].sum() == 8
+
+    with pytest.raises(ValueError, match="Unknown calendar columns"):
+        cal.monthly_many(['is_missing'], months)
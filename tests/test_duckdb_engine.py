@@ -0,0 +1,90 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.preprocessor import Preprocessor, get_preprocessor
+
+duckdb = pytest.importorskip("duckdb")
+from src.duckdb_engine import DuckDBPreprocessor  # noqa: E402
+
+# --- Tests ---
+
+class TestDuckDBPreprocessor:
+
+    @pytest.mark.parametrize("dtype_policy", [False, True])
+    def test_matches_pandas_engine(self, engine_config, run_engine, dtype_policy):
+        """Test that SQL aggregation and unification reproduce the pandas master."""
+        engine_config["preprocessing"]["dtype_policy"] = {"enabled": dtype_policy}
+
+        prep, expected = run_engine(Preprocessor, engine_config)
+        engine, result = run_engine(DuckDBPreprocessor, engine_config)
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-5)
+        assert engine.monthly_tables["ventas"][1] == len(prep.monthly_dfs["ventas"])
+
+    def test_multi_series(self, engine_config, run_engine, raw_dir):
+        """Test that macro is broadcast to every store by the SQL join."""
+        engine_config["preprocessing"]["multi_series"] = {"keys": ["store_id"]}
+        raw = raw_dir / "data" / "01_raw"
+        for name in ["ventas_diarias", "redes_sociales", "promocion_diaria"]:
+            df = pd.read_parquet(raw / f"{name}.parquet")
+            store_b = df.assign(**{col: df[col] * 2 for col in df.select_dtypes(include=np.number).columns})
+            pd.concat([df.assign(store_id=1), store_b.assign(store_id=2)]).to_parquet(raw / f"{name}.parquet")
+
+        _, expected = run_engine(Preprocessor, engine_config)
+        _, result = run_engine(DuckDBPreprocessor, engine_config)
+
+        assert result["store_id"].nunique() == 2
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-5)
+
+    def test_out_of_core_settings(self, engine_config, run_engine, raw_dir, monkeypatch):
+        """Test that DuckDB scans the staged daily Parquet under the configured spill settings."""
+        engine_config["preprocessing"]["duckdb"] = {"memory_limit": "256MB", "temp_directory": "spill"}
+        aggregate = DuckDBPreprocessor._aggregate_monthly
+        staged = {}
+
+        def spy(self):
+            aggregate(self)
+            staged["files"] = sorted(p.name for p in self.temp_directory.glob("daily_*.parquet"))
+            staged["memory_limit"] = self.con.execute("SELECT current_setting('memory_limit')").fetchone()[0]
+            staged["temp_directory"] = self.con.execute("SELECT current_setting('temp_directory')").fetchone()[0]
+
+        monkeypatch.setattr(DuckDBPreprocessor, "_aggregate_monthly", spy)
+        engine, _ = run_engine(DuckDBPreprocessor, engine_config)
+
+        assert staged["files"] == sorted(f"daily_{key}.parquet" for key in engine.dataframes)
+        assert staged["memory_limit"] == "244.1 MiB"  # 256 MB
+        assert staged["temp_directory"] == str(raw_dir / "spill")
+        # Daily frames are released after staging and the staged files removed after the run
+        assert all(df.empty for df in engine.dataframes.values())
+        assert not list((raw_dir / "spill").glob("daily_*.parquet"))
+
+    def test_aggregation_sql(self, engine_config, tmp_path, monkeypatch):
+        """Test the SQL generated for each aggregation rule."""
+        monkeypatch.chdir(tmp_path)
+        engine_config["preprocessing"]["aggregation_rules"] = {"units": "sum", "price": "mean", "ipc": "first"}
+        dates = pd.date_range("2023-01-01", "2023-02-28", freq="D")
+        daily = pd.DataFrame({
+            "fecha": dates,
+            "units": np.arange(len(dates)),
+            "price": np.where(np.arange(len(dates)) % 4 == 0, np.nan, 10.0),
+            "ipc": np.where(dates.day < 3, np.nan, dates.month.astype(float))
+        })
+
+        engine = DuckDBPreprocessor(engine_config)
+        engine.con.register("daily_ventas", daily)
+        result = engine.con.execute(engine._aggregation_sql("ventas", daily)).to_arrow_table().to_pandas()
+
+        expected = daily.set_index("fecha").resample("MS").agg({"units": "sum", "price": "mean", "ipc": "first"})
+        pd.testing.assert_frame_equal(result.set_index("fecha"), expected, check_freq=False, check_index_type=False)
+
+    def test_unsupported_aggregation(self, engine_config, run_engine):
+        """Test that rules without a SQL equivalent are rejected."""
+        engine_config["preprocessing"]["aggregation_rules"]["total_unidades_entregadas"] = "nunique"
+
+        with pytest.raises(ValueError, match="not supported by the DuckDB engine"):
+            run_engine(DuckDBPreprocessor, engine_config)
+
+    def test_engine_selection(self, engine_config):
+        """Test that preprocessing.engine='duckdb' selects this backend."""
+        engine_config["preprocessing"]["engine"] = "duckdb"
+        assert isinstance(get_preprocessor(engine_config), DuckDBPreprocessor)
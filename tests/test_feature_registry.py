@@ -0,0 +1,106 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.feature_registry import FeatureGraph, FeatureRegistry, FeatureSpec
+
+@pytest.fixture
+def base_df():
+    dates = pd.date_range(start='2022-01-01', periods=12, freq='MS')
+    return pd.DataFrame({'sales': np.arange(12, dtype=float)}, index=dates)
+
+@pytest.fixture
+def registry():
+    """sales -> sales_x2 -> sales_x4, plus an independent scaled feature."""
+    calls = []
+    registry = FeatureRegistry()
+    registry.calls = calls
+
+    @registry.feature('double', outputs=('sales_x2',), inputs=('sales',))
+    def double(frame, params):
+        calls.append('double')
+        return {'sales_x2': frame['sales'] * 2}
+
+    @registry.feature('quadruple', outputs=('sales_x4',), inputs=('sales_x2',))
+    def quadruple(frame, params):
+        calls.append('quadruple')
+        return {'sales_x4': frame['sales_x2'] * 2}
+
+    @registry.feature('scaled', outputs=('sales_scaled',), inputs=('sales',), config_keys=('features.scale',))
+    def scaled(frame, params):
+        calls.append('scaled')
+        return {'sales_scaled': frame['sales'] * params['features.scale']}
+
+    return registry
+
+def test_resolve_only_needed_features(registry):
+    assert [spec.name for spec in registry.resolve(['sales_x4'])] == ['double', 'quadruple']
+    assert [spec.name for spec in registry.resolve(['scaled'])] == ['scaled']
+    assert [spec.name for spec in registry.resolve()] == ['double', 'quadruple', 'scaled']
+
+    with pytest.raises(ValueError, match="Unknown feature 'missing'"):
+        registry.resolve(['missing'])
+
+def test_register_conflicts_and_cycles(registry):
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(FeatureSpec('double', ('other',), lambda frame, params: {}))
+    with pytest.raises(ValueError, match="already produced"):
+        registry.register(FeatureSpec('other', ('sales_x2',), lambda frame, params: {}))
+
+    cyclic = FeatureRegistry()
+    cyclic.register(FeatureSpec('a', ('col_a',), lambda frame, params: {}, inputs=('col_b',)))
+    cyclic.register(FeatureSpec('b', ('col_b',), lambda frame, params: {}, inputs=('col_a',)))
+    with pytest.raises(ValueError, match="cycle"):
+        cyclic.resolve(['a'])
+
+def test_graph_computes_lazily_and_caches(registry, base_df):
+    config = {'features': {'scale': 10}}
+    graph = FeatureGraph(registry, base_df, config)
+
+    # The intermediate feature is computed but not returned
+    result = graph.compute(['sales_x4'])
+    assert result.columns.tolist() == ['sales', 'sales_x4']
+    assert (result['sales_x4'] == base_df['sales'] * 4).all()
+    assert registry.calls == ['double', 'quadruple']
+
+    # Cached features are reused; only the new one is computed
+    result = graph.compute(['double', 'scaled'])
+    assert result.columns.tolist() == ['sales', 'sales_x2', 'sales_scaled']
+    assert registry.calls == ['double', 'quadruple', 'scaled']
+
+    # A config change invalidates only the features that depend on it
+    config['features']['scale'] = 100
+    result = graph.compute()
+    assert registry.calls == ['double', 'quadruple', 'scaled', 'scaled']
+    assert (result['sales_scaled'] == base_df['sales'] * 100).all()
+
+def test_graph_missing_inputs(registry, base_df):
+    graph = FeatureGraph(registry, base_df.rename(columns={'sales': 'units'}), {'features': {'scale': 1}})
+
+    # The full catalog skips what cannot be computed; an explicit request fails
+    assert graph.compute().columns.tolist() == ['units']
+    with pytest.raises(ValueError, match="missing input columns"):
+        graph.compute(['sales_x4'])
+
+def test_graph_long_format(registry, base_df):
+    seen = {}
+
+    @registry.feature('month_number', outputs=('month_number',))
+    def month_number(frame, params):
+        seen['rows'] = len(frame)
+        return {'month_number': frame.index.month}
+
+    @registry.feature('sales_prev', outputs=('sales_prev',), inputs=('sales',), per_series=True)
+    def sales_prev(frame, params, groups=None):
+        seen['groups'] = groups
+        return {'sales_prev': frame['sales'].groupby(groups).shift(1)}
+
+    long_df = pd.concat([base_df, base_df + 100])
+    groups = np.repeat([0, 1], len(base_df))
+    result = FeatureGraph(registry, long_df, {}, groups=groups).compute(['month_number', 'sales_prev'])
+
+    # Index-only features run once per distinct date and are broadcast to every series
+    assert seen['rows'] == len(base_df)
+    assert result['month_number'].tolist() == list(base_df.index.month) * 2
+    # Per-series features receive the series codes
+    assert seen['groups'] is groups
+    assert result['sales_prev'].isna().sum() == 2
@@ -0,0 +1,127 @@
+import json
+import pytest
+import pandas as pd
+import numpy as np
+from src.feature_store import FeatureStore
+from src.features import FeatureEngineer
+
+@pytest.fixture
+def store_config():
+    return {
+        'project': {'target_column': 'total_unidades_entregadas'},
+        'paths': {
+            'data': {
+                'cleansed': 'data/02_cleansed/',
+                'features': 'data/03_features/'
+            },
+            'prod': {
+                'reports': 'outputs/reports/',
+                'figures': 'outputs/figures/'
+            }
+        },
+        'feature_engineering': {
+            'cyclical_columns': ['month'],
+            'marketing_lags': [{'column': 'inversion_total', 'lag': 1, 'fill_value': 0}],
+            'store': {'enabled': True, 'max_versions': 3}
+        },
+        'business_events': {'primas': {'months': [6, 12]}}
+    }
+
+@pytest.fixture
+def master_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dates = pd.date_range(start='2020-01-01', end='2022-12-01', freq='MS', name='fecha')
+    df = pd.DataFrame({
+        'total_unidades_entregadas': np.arange(len(dates)) * 10.0,
+        'inversion_total': np.arange(len(dates)) * 100.0
+    }, index=dates)
+    path = tmp_path / 'data' / '02_cleansed' / 'master_monthly.parquet'
+    path.parent.mkdir(parents=True)
+    df.to_parquet(path)
+    return path
+
+def make_frame(n):
+    return pd.DataFrame({'value': np.arange(n, dtype=float)})
+
+def test_version_key(store_config, master_file):
+    key = FeatureStore.version_key(master_file, store_config)
+    assert key == FeatureStore.version_key(master_file, store_config)
+
+    # Store settings do not change the version, feature parameters do
+    store_config['feature_engineering']['store']['max_versions'] = 1
+    assert FeatureStore.version_key(master_file, store_config) == key
+    store_config['business_events']['primas']['months'] = [6]
+    assert FeatureStore.version_key(master_file, store_config) != key
+
+def test_put_get_manifest(tmp_path):
+    store = FeatureStore(tmp_path / 'store')
+    assert store.get('v1') is None
+
+    df = make_frame(5)
+    store.put('v1', df, {'input_file': 'master_monthly.parquet'})
+    pd.testing.assert_frame_equal(store.get('v1'), df)
+
+    entry = store.versions()['v1']
+    assert entry['rows'] == 5
+    assert entry['input_file'] == 'master_monthly.parquet'
+    assert entry['size_bytes'] == store.path('v1').stat().st_size
+    assert entry['last_accessed'] >= entry['created_at']
+
+def test_lru_eviction(tmp_path):
+    store = FeatureStore(tmp_path / 'store', max_versions=2)
+    store.put('v1', make_frame(1))
+    store.put('v2', make_frame(2))
+    store.get('v1')  # v2 becomes the least recently used
+    store.put('v3', make_frame(3))
+
+    assert list(store.versions()) == ['v1', 'v3']
+    assert not (tmp_path / 'store' / 'v2').exists()
+
+def test_size_eviction(tmp_path):
+    store = FeatureStore(tmp_path / 'store')
+    store.put('v1', make_frame(1000))
+    store.max_bytes = store.versions()['v1']['size_bytes'] + 1
+
+    # The newest version is always kept, even if it alone exceeds the budget
+    store.put('v2', make_frame(1000))
+    assert list(store.versions()) == ['v2']
+
+def test_feature_engineer_cache_hit(store_config, master_file, monkeypatch):
+    first = FeatureEngineer(store_config)
+    monkeypatch.setattr(FeatureEngineer, 'generate_figures', lambda self, df: None)
+    expected = first.run()
+    assert not first.store_hit
+
+    second = FeatureEngineer(store_config)
+    monkeypatch.setattr(second, 'compute_features', lambda *args: pytest.fail("features recomputed"))
+    result = second.run()
+
+    assert second.store_hit
+    assert second.feature_version == first.feature_version
+    assert first.update_mode == 'full' and second.update_mode == 'store'
+    report = json.loads((second.artifacts_path / "phase_04_feature_engineering_prod.json").read_text(encoding="utf-8"))
+    assert report["update"]["mode"] == 'store'
+    pd.testing.assert_frame_equal(result, expected)
+    pd.testing.assert_frame_equal(pd.read_parquet(second.output_path), expected)
+
+    # A new master file is a new version
+    master = pd.read_parquet(master_file)
+    master.iloc[0, 0] = -1.0
+    master.to_parquet(master_file)
+    third = FeatureEngineer(store_config)
+    third.run()
+    assert not third.store_hit
+    assert len(third.store.versions()) == 2
+
+def test_pinned_version(store_config, master_file, monkeypatch):
+    monkeypatch.setattr(FeatureEngineer, 'generate_figures', lambda self, df: None)
+    version = FeatureEngineer(store_config)
+    expected = version.run()
+
+    master_file.unlink()  # A pinned version does not need the input file
+    store_config['feature_engineering']['store']['version'] = version.feature_version
+    pd.testing.assert_frame_equal(FeatureEngineer(store_config).run(), expected)
+
+    store_config['feature_engineering']['store']['version'] = 'missing'
+    with pytest.raises(FileNotFoundError, match="Feature version 'missing' not found"):
+        FeatureEngineer(store_config).run()
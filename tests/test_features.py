@@ -105,3 +105,222 @@ def test_report_generation(mock_config, sample_df, tmp_path):
     
     report_file = report_dir / "phase_04_feature_engineering_prod.json"
     assert report_file.exists()
+    # Same writer (and layout) as the other phase reports: save_json, 2-space indent
+    assert report_file.read_text(encoding="utf-8").startswith('{\n  "phase"')
+
+def test_compute_requested_features(mock_config, sample_df):
+    engineer = FeatureEngineer(mock_config)
+    assert 'month_cyclical' in engineer.registry.names(group='cyclical')
+
+    df = engineer.compute_features(sample_df.copy(), ['is_primas', 'inversion_total_lag_1'])
+    assert df.columns.tolist() == list(sample_df.columns) + ['is_primas', 'inversion_total_lag_1']
+
+    # Disabled business flags are not part of the catalog
+    mock_config['feature_engineering']['binary_features'] = {'is_pandemic': False}
+    assert 'is_pandemic' not in FeatureEngineer(mock_config).registry
+
+def test_event_counts(mock_config, sample_df):
+    mock_config['feature_engineering']['event_counts'] = {
+        'novenas_days': 'is_novenas', 'primas_days': 'is_primas', 'weekend_days': 'is_weekend'
+    }
+    engineer = FeatureEngineer(mock_config)
+    df = engineer.add_event_counts(sample_df.copy())
+
+    # Day windows from business_events: novenas 16-23 Dec, primas 15-20 Jun/Dec
+    assert df.loc['2022-12-01', ['novenas_days', 'primas_days']].tolist() == [8, 6]
+    assert df.loc['2022-06-01', ['novenas_days', 'primas_days']].tolist() == [0, 6]
+    assert df.loc['2022-01-01', 'weekend_days'] == 10
+    assert df['novenas_days'].sum() == 8 * 3
+
+def test_window_features_overrides(mock_config, sample_df):
+    engineer = FeatureEngineer(mock_config)
+    assert engineer.add_window_features(sample_df.copy()).columns.tolist() == list(sample_df.columns)
+
+    df = engineer.add_window_features(sample_df.copy(), columns=['inversion_total'], lags=[2, 3], windows=[3], stats=['mean', 'max'])
+    assert df.columns.tolist()[2:] == [
+        'inversion_total_lag_2', 'inversion_total_lag_3', 'inversion_total_roll_mean_3', 'inversion_total_roll_max_3'
+    ]
+    # shift=1 by default: the window ends in the previous month
+    assert df['inversion_total_roll_max_3'].iloc[3] == sample_df['inversion_total'].iloc[:3].max()
+
+@pytest.fixture
+def figures_run(mock_config, sample_df, tmp_path, monkeypatch):
+    """Writes a master file in a temporary project and returns a FeatureEngineer factory."""
+    monkeypatch.chdir(tmp_path)
+    master = tmp_path / 'data' / '02_cleansed' / 'master_monthly.parquet'
+    master.parent.mkdir(parents=True)
+    sample_df.rename_axis('fecha').to_parquet(master)
+
+    def make(mode):
+        mock_config['feature_engineering']['figures'] = {'mode': mode}
+        return FeatureEngineer(mock_config)
+    return make
+
+def test_figures_skipped_by_default(figures_run, monkeypatch):
+    monkeypatch.setattr(FeatureEngineer, 'generate_figures', lambda self, df: pytest.fail("figures rendered"))
+    engineer = figures_run('skip')
+    engineer.run()
+    assert engineer.output_path.exists()
+    assert engineer.figures_process is None
+
+def test_figures_rendered_once_per_input(figures_run, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(FeatureEngineer, 'generate_figures', lambda self, df: rendered.append(len(df)))
+    engineer = figures_run('inline')
+    df = engineer.run()
+    assert rendered == [len(df)]
+
+    # Unchanged features: no rendering, unless forced
+    assert not engineer.render_figures()
+    assert engineer.render_figures(force=True)
+    assert engineer.render_figures(df.iloc[:-1])
+    assert rendered == [len(df), len(df), len(df) - 1]
+
+def test_figures_background_process(figures_run):
+    engineer = figures_run('background')
+    engineer.run()
+    engineer.figures_process.join(timeout=120)
+
+    assert engineer.figures_process.exitcode == 0
+    assert sorted(p.name for p in engineer.figures_path.glob('*.png')) == [
+        '01_validacion_eventos.png', '02_ciclos_mensuales.png', '03_correlacion_features.png'
+    ]
+    assert not engineer.render_figures()
+
+def test_incremental_update(mock_config, sample_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock_config['feature_engineering']['incremental'] = {'enabled': True, 'verify': True}
+    mock_config['feature_engineering']['window_features'] = {
+        'columns': ['inversion_total'], 'lags': [2], 'rolling_windows': [3], 'rolling_stats': ['mean']
+    }
+    master = tmp_path / 'data' / '02_cleansed' / 'master_monthly.parquet'
+    master.parent.mkdir(parents=True)
+    full_df = sample_df.rename_axis('fecha')
+    full_df.iloc[:-4].to_parquet(master)
+
+    first = FeatureEngineer(mock_config)
+    first.run()
+    assert first.update_mode == 'full'
+    assert first.registry.lookback() == 3
+
+    # Appended months: only they (plus the look-back) are engineered
+    full_df.to_parquet(master)
+    computed = []
+    original = FeatureEngineer.compute_features
+    monkeypatch.setattr(FeatureEngineer, 'compute_features', lambda self, df, features=None: computed.append(len(df)) or original(self, df, features))
+    second = FeatureEngineer(mock_config)
+    result = second.run()
+
+    assert second.update_mode == 'incremental'
+    assert second.appended_rows == 4
+    assert computed == [4 + 3, len(full_df)]  # Incremental rows, then the verification rebuild
+    pd.testing.assert_frame_equal(result, original(second, full_df.copy()), check_freq=False)
+
+    # A revised past month invalidates the incremental path
+    full_df.iloc[0, 0] = -1
+    full_df.to_parquet(master)
+    third = FeatureEngineer(mock_config)
+    third.run()
+    assert third.update_mode == 'full'
+
+def test_cyclical_lookup_tables(mock_config):
+    mock_config['feature_engineering']['cyclical_columns'] = ['month', 'quarter', 'semester', 'dayofweek', 'dayofyear', 'weekofyear']
+    engineer = FeatureEngineer(mock_config)
+    days = pd.date_range('2023-11-20', '2024-02-10', freq='D')
+    # Long format: every date repeated for three series
+    df = pd.DataFrame({'store_id': np.repeat([1, 2, 3], len(days))}, index=days.append([days, days]))
+
+    result = engineer.add_cyclical_features(df)
+    index = df.index
+    expected = {
+        'month': (index.month, 12), 'quarter': (index.quarter, 4), 'semester': ((index.month - 1) // 6 + 1, 2),
+        'dayofweek': (index.dayofweek, 7), 'dayofyear': (index.dayofyear, 366),
+        'weekofyear': (index.isocalendar().week.to_numpy(dtype=int), 53)
+    }
+    for col, (values, period) in expected.items():
+        np.testing.assert_array_equal(result[f'{col}_sin'], np.sin(2 * np.pi * np.asarray(values) / period))
+        np.testing.assert_array_equal(result[f'{col}_cos'], np.cos(2 * np.pi * np.asarray(values) / period))
+
+def test_multi_series_features(mock_config, sample_df):
+    mock_config['preprocessing'] = {'multi_series': {'keys': ['store_id']}}
+    mock_config['feature_engineering']['window_features'] = {
+        'columns': ['inversion_total'], 'lags': [2], 'rolling_windows': [3], 'rolling_stats': ['mean'],
+        'expanding_stats': ['sum'], 'shift': 1, 'fill_value': 0
+    }
+    engineer = FeatureEngineer(mock_config)
+    stores = [sample_df.assign(store_id=store, inversion_total=sample_df['inversion_total'] * store) for store in (1, 2, 3)]
+    long_df = pd.concat(stores)
+
+    result = engineer.compute_features(long_df)
+
+    # Every series equals the single-series pipeline on its own rows: lags and windows never cross series
+    single = FeatureEngineer({**mock_config, 'preprocessing': {}})
+    for store, store_df in zip((1, 2, 3), stores):
+        expected = single.compute_features(store_df)
+        pd.testing.assert_frame_equal(result[result['store_id'] == store], expected, check_freq=False)
+    assert (result['inversion_total_lag_1'].iloc[[0, len(sample_df), 2 * len(sample_df)]] == 0).all()
+
+    with pytest.raises(ValueError, match="sorted by"):
+        engineer.compute_features(long_df.sort_index(kind='stable'))
+
+def test_graph_reused_across_steps(mock_config, sample_df, monkeypatch):
+    import src.features as features
+    calls = []
+    business_flag = features._business_flag
+
+    def counted(frame, flag, config):
+        calls.append(flag)
+        return business_flag(frame, flag, config)
+
+    monkeypatch.setattr(features, '_business_flag', counted)
+    engineer = FeatureEngineer(mock_config)
+
+    # Chained steps on the same input frame share one graph: nothing is computed twice
+    df = engineer.compute_features(sample_df, ['is_primas'])
+    df = engineer.add_marketing_lags(df)
+    df = engineer.add_business_flags(df)
+    assert calls == ['is_primas', 'is_novenas', 'is_pandemic']
+    assert df.columns.tolist() == list(sample_df.columns) + ['is_primas', 'inversion_total_lag_1', 'is_novenas', 'is_pandemic']
+
+    # Config changes reach the computation through the feature params
+    engineer.config['feature_engineering']['marketing_lags'][0]['fill_value'] = -1
+    engineer.config['business_events']['primas']['months'] = [1]
+    df = engineer.compute_features(sample_df, ['inversion_total_lag_1', 'is_primas'])
+    assert df['inversion_total_lag_1'].iloc[0] == -1
+    assert df.loc[df['is_primas'] == 1].index.month.unique().tolist() == [1]
+    assert calls[-1] == 'is_primas'
+
+def test_cyclical_year_end_precedes_year_start(mock_config):
+    mock_config['feature_engineering']['cyclical_columns'] = ['dayofyear', 'weekofyear']
+    engineer = FeatureEngineer(mock_config)
+    # 2020-12-31 is day 366 of a leap year; 2020-12-28 starts ISO week 53 of 2020
+    dates = pd.to_datetime(['2020-12-28', '2020-12-31', '2021-01-01', '2021-01-04'])
+    df = engineer.add_cyclical_features(pd.DataFrame(index=dates))
+
+    def step(col, start, end):
+        """Forward angle from one date's encoding to another's."""
+        angle = np.arctan2(df[f'{col}_sin'], df[f'{col}_cos'])
+        return (angle.loc[end] - angle.loc[start]) % (2 * np.pi)
+
+    # The last day/week of the year is one step before the first, not past it
+    assert step('dayofyear', '2020-12-31', '2021-01-01') == pytest.approx(2 * np.pi / 366)
+    assert step('dayofyear', '2020-12-28', '2020-12-31') == pytest.approx(3 * 2 * np.pi / 366)
+    assert step('weekofyear', '2020-12-28', '2021-01-04') == pytest.approx(2 * np.pi / 53)
+
+def test_graph_rebuilt_after_in_place_edit(mock_config, sample_df):
+    engineer = FeatureEngineer(mock_config)
+    df = sample_df.copy()
+    df['inversion_total'] = np.arange(len(df)) * 10
+
+    # Editing the frame between chained steps invalidates the cached graph
+    df = engineer.add_cyclical_features(df)
+    df['inversion_total'] *= 2
+    df = engineer.add_marketing_lags(df)
+    assert df['inversion_total_lag_1'].iloc[:4].tolist() == [0, 0, 20, 40]
+
+    base = sample_df.copy()
+    first = engineer.compute_features(base, ['inversion_total_lag_1'])
+    base['inversion_total'] = -1
+    second = engineer.compute_features(base, ['inversion_total_lag_1'])
+    assert (second['inversion_total_lag_1'].iloc[1:] == -1).all()
+    assert not first['inversion_total_lag_1'].equals(second['inversion_total_lag_1'])
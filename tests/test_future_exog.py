@@ -0,0 +1,101 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.features import FeatureEngineer
+from src.future_exog import FutureExogBuilder, ma_projection_weights
+
+@pytest.fixture
+def exog_config():
+    return {
+        'validation': {'horizon_months': 3},
+        'feature_engineering': {
+            'cyclical_columns': ['month'],
+            'marketing_lags': [{'column': 'inversion_total', 'lag': 2, 'fill_value': 0}],
+            'future_exog': {
+                'macro_columns': ['ipc_mensual'],
+                'plan_columns': ['inversion_total'],
+                'plan_fill_value': 0
+            }
+        },
+        'business_events': {
+            'primas': {'months': [6, 12]},
+            'macro_projection': {'method': 'MA', 'window_size': 2}
+        }
+    }
+
+@pytest.fixture
+def history():
+    dates = pd.date_range(start='2022-01-01', end='2023-12-01', freq='MS', name='fecha')
+    return pd.DataFrame({
+        'total_unidades_entregadas': np.arange(len(dates)) * 10.0,
+        'inversion_total': np.arange(len(dates)) * 100.0,
+        'ipc_mensual': np.linspace(1.0, 3.0, len(dates))
+    }, index=dates)
+
+def naive_ma(values, window, horizon):
+    values = list(values)
+    for _ in range(horizon):
+        values.append(np.mean(values[-window:]))
+    return values[-horizon:]
+
+def test_ma_projection_weights():
+    np.testing.assert_allclose(ma_projection_weights(2, 3), [[0.5, 0.5], [0.25, 0.75], [0.375, 0.625]])
+    np.testing.assert_allclose(ma_projection_weights(3, 4) @ [1.0, 5.0, 9.0], naive_ma([1.0, 5.0, 9.0], 3, 4))
+
+def test_build_single_origin(exog_config, history):
+    plans = pd.DataFrame({'inversion_total': [7000.0, 8000.0]}, index=pd.to_datetime(['2024-01-01', '2024-02-01']))
+    exog = FutureExogBuilder(exog_config).build(history, plans=plans)
+
+    origin = history.index[-1]
+    future = exog.xs(origin, level='origin')
+    assert list(future.index) == list(pd.date_range('2024-01-01', periods=3, freq='MS'))
+
+    # Calendar features match the historical pipeline on the same dates
+    expected = FeatureEngineer(exog_config).compute_features(pd.DataFrame(index=future.index), ['month_cyclical', 'is_primas'])
+    pd.testing.assert_frame_equal(future[expected.columns], expected, check_freq=False)
+
+    # Lag 2: history for the first two steps, the plan for the third
+    assert future['inversion_total_lag_2'].tolist() == [2200.0, 2300.0, 7000.0]
+    assert future['inversion_total'].tolist() == [7000.0, 8000.0, 0.0]
+    np.testing.assert_allclose(future['ipc_mensual'], naive_ma(history['ipc_mensual'], 2, 3))
+
+def test_build_many_origins(exog_config, history):
+    builder = FutureExogBuilder(exog_config)
+    origins = history.index[5:]
+    exog = builder.build(history, origins=origins, horizon=4)
+    assert len(exog) == len(origins) * 4
+
+    # The batched matrix equals one build per origin on the truncated history
+    for origin in origins[::6]:
+        single = builder.build(history.loc[:origin], horizon=4)
+        pd.testing.assert_frame_equal(exog.xs(origin, level='origin', drop_level=False), single)
+
+def test_build_errors(exog_config, history):
+    builder = FutureExogBuilder(exog_config)
+    with pytest.raises(ValueError, match="Origins not in history"):
+        builder.build(history, origins=['2030-01-01'])
+    with pytest.raises(ValueError, match="needs 2 months of history"):
+        builder.build(history, origins=history.index[:1])
+
+    exog_config['business_events']['macro_projection']['method'] = 'ARIMA'
+    with pytest.raises(ValueError, match="Unknown macro projection method"):
+        FutureExogBuilder(exog_config).build(history)
+
+def test_build_window_features(exog_config, history):
+    exog_config['feature_engineering']['window_features'] = {
+        'columns': ['inversion_total'], 'lags': [3], 'rolling_windows': [2], 'rolling_stats': ['mean'],
+        'expanding_stats': ['sum'], 'shift': 1, 'fill_value': 0
+    }
+    plans = pd.DataFrame({'inversion_total': [7000.0, 8000.0, 9000.0]}, index=pd.date_range('2023-07-01', periods=3, freq='MS'))
+    origins = history.index[[10, 17]]
+    exog = FutureExogBuilder(exog_config).build(history, origins=origins, plans=plans)
+
+    # Same as the historical pipeline on history up to the origin followed by the plan
+    for origin in origins:
+        future = pd.date_range(origin + pd.DateOffset(months=1), periods=3, freq='MS')
+        timeline = pd.concat([history.loc[:origin, ['inversion_total']],
+                              plans.reindex(future).fillna(0)])
+        expected = FeatureEngineer(exog_config).add_window_features(timeline).loc[future]
+        result = exog.xs(origin, level='origin')
+        for col in ['inversion_total_lag_3', 'inversion_total_roll_mean_2', 'inversion_total_exp_sum']:
+            np.testing.assert_allclose(result[col], expected[col])
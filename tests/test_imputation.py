@@ -0,0 +1,87 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.imputation import (
+    shifted_rolling_mean, linear_interpolate, backward_fill, impute_frame, window_interpolate
+)
+
+@pytest.fixture
+def macro_df():
+    rng = np.random.default_rng(42)
+    values = rng.uniform(1, 10, size=(120, 3))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[0, 1] = np.nan  # Leading gap
+    values[-3:, 2] = np.nan  # Trailing gap
+    dates = pd.date_range("2015-01-01", periods=120, freq="MS")
+    return pd.DataFrame(values, columns=["ipc_mensual", "trm_promedio", "tasa_desempleo"], index=dates)
+
+def test_shifted_rolling_mean_matches_pandas(macro_df):
+    expected = macro_df.rolling(window=60, min_periods=1).mean().shift(1).to_numpy()
+    result = shifted_rolling_mean(macro_df.to_numpy(), window=60)
+    np.testing.assert_allclose(result, expected, rtol=1e-9)
+
+def test_linear_interpolate_matches_pandas(macro_df):
+    expected = macro_df.interpolate(method="linear").to_numpy()
+    np.testing.assert_allclose(linear_interpolate(macro_df.to_numpy()), expected, rtol=1e-9)
+
+def test_backward_fill_matches_pandas(macro_df):
+    np.testing.assert_allclose(backward_fill(macro_df.to_numpy()), macro_df.bfill().to_numpy())
+
+def test_impute_frame_rolling_mean(macro_df):
+    expected = macro_df.copy()
+    for col in expected.columns:
+        expected[col] = expected[col].fillna(expected[col].rolling(window=60, min_periods=1).mean().shift(1)).bfill()
+    
+    df = macro_df.copy()
+    stats = impute_frame(df, df.columns, strategy="rolling_mean", window=60)
+    
+    pd.testing.assert_frame_equal(df, expected)
+    assert stats == macro_df.isna().sum().astype(int).to_dict()
+
+@pytest.mark.parametrize("strategy,method", [("mean", "mean"), ("median", "median")])
+def test_impute_frame_statistics(macro_df, strategy, method):
+    df = macro_df.copy()
+    impute_frame(df, df.columns, strategy=strategy)
+    expected = macro_df.fillna(getattr(macro_df, method)())
+    pd.testing.assert_frame_equal(df, expected)
+
+def test_impute_frame_unknown_strategy(macro_df):
+    with pytest.raises(ValueError):
+        impute_frame(macro_df.copy(), macro_df.columns, strategy="spline")
+
+def test_grouped_kernels_do_not_cross_series(macro_df):
+    long_df = pd.concat([macro_df.assign(series=0), macro_df.assign(series=1)])
+    groups = long_df["series"].to_numpy()
+    values = long_df[macro_df.columns].to_numpy()
+    
+    expected = long_df.groupby("series")[list(macro_df.columns)].transform(
+        lambda s: s.interpolate(method="linear")
+    ).to_numpy()
+    np.testing.assert_allclose(linear_interpolate(values, groups), expected, rtol=1e-9)
+    
+    expected_mean = long_df.groupby("series")[list(macro_df.columns)].transform(
+        lambda s: s.rolling(window=60, min_periods=1).mean().shift(1)
+    ).to_numpy()
+    np.testing.assert_allclose(shifted_rolling_mean(values, 60, groups), expected_mean, rtol=1e-9)
+
+def test_window_interpolate_segments():
+    nan = np.nan
+    values = np.array([
+        [1.0, nan, nan, 4.0, nan, 10.0, nan, nan, nan, 7.0, nan, nan],
+        [nan, 2.0, nan, 6.0, nan, nan, nan, nan, 3.0, nan, nan, 5.0],
+    ]).T
+    window_ids = np.array([0, 0, 0, 0, 0, -1, -1, 1, 1, 1, 1, 1])
+    groups = np.array([0] * 10 + [1] * 2)
+
+    result = window_interpolate(values, window_ids, groups)
+
+    # Window 0: interior interpolation, edges from the segment's own values
+    np.testing.assert_allclose(result[:5, 0], [1.0, 2.0, 3.0, 4.0, 4.0])
+    np.testing.assert_allclose(result[:5, 1], [2.0, 2.0, 4.0, 6.0, 6.0])
+    # Outside windows: 0, never the neighbouring windows' values
+    np.testing.assert_allclose(result[5:7].ravel(), [10.0, 0.0, 0.0, 0.0])
+    # Window 1 splits at the series boundary; a segment without values is 0
+    np.testing.assert_allclose(result[7:10, 0], [7.0, 7.0, 7.0])
+    np.testing.assert_allclose(result[10:, 0], [0.0, 0.0])
+    np.testing.assert_allclose(result[7:10, 1], [3.0, 3.0, 3.0])
+    np.testing.assert_allclose(result[10:, 1], [5.0, 5.0])
@@ -0,0 +1,72 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.preprocessor import Preprocessor, get_preprocessor
+
+pl = pytest.importorskip("polars")
+from src.polars_engine import PolarsPreprocessor  # noqa: E402
+
+# --- Tests ---
+
+class TestPolarsPreprocessor:
+
+    def assert_parity(self, prep, expected, engine, result):
+        check_dtype = bool(prep._dtype_policy())
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-5, check_dtype=check_dtype)
+        assert engine.stats_cleaning == prep.stats_cleaning
+        assert engine.sentinel_stats == prep.sentinel_stats
+        assert engine.reindex_stats == prep.reindex_stats
+        assert engine.imputation_stats == prep.imputation_stats
+        assert engine.load_stats["ventas"]["rows_filtered"] == prep.load_stats["ventas"]["rows_filtered"]
+        assert engine._records_recalculated() == prep._records_recalculated()
+        assert engine.recalc_stats == prep.recalc_stats
+
+    @pytest.mark.parametrize("dtype_policy", [False, True])
+    def test_matches_pandas_engine(self, engine_config, run_engine, dtype_policy):
+        """Test that the lazy Polars plan reproduces the pandas master and audit stats."""
+        engine_config["preprocessing"]["dtype_policy"] = {"enabled": dtype_policy}
+
+        prep, expected = run_engine(Preprocessor, engine_config)
+        engine, result = run_engine(PolarsPreprocessor, engine_config)
+
+        self.assert_parity(prep, expected, engine, result)
+
+    @pytest.mark.parametrize("strategy", ["interpolate", "median"])
+    def test_macro_strategies(self, engine_config, run_engine, strategy):
+        """Test parity of the alternative macro imputation strategies."""
+        engine_config["preprocessing"]["macro_imputation"] = {"strategy": strategy}
+
+        prep, expected = run_engine(Preprocessor, engine_config)
+        engine, result = run_engine(PolarsPreprocessor, engine_config)
+
+        self.assert_parity(prep, expected, engine, result)
+
+    def test_multi_series(self, engine_config, run_engine, raw_dir):
+        """Test parity in multi-series mode with interleaved (unsorted) stores."""
+        engine_config["preprocessing"]["multi_series"] = {"keys": ["store_id"]}
+        raw = raw_dir / "data" / "01_raw"
+        for name in ["ventas_diarias", "redes_sociales", "promocion_diaria"]:
+            df = pd.read_parquet(raw / f"{name}.parquet")
+            store_b = df.sample(frac=0.9, random_state=1).sort_index()
+            numeric = store_b.select_dtypes(include=np.number).columns
+            store_b[numeric] = store_b[numeric] * 2
+            multi = pd.concat([df.assign(store_id=1), store_b.assign(store_id=2)]).sort_values("fecha", kind="stable")
+            multi.to_parquet(raw / f"{name}.parquet")
+
+        prep, expected = run_engine(Preprocessor, engine_config)
+        engine, result = run_engine(PolarsPreprocessor, engine_config)
+
+        assert result["store_id"].nunique() == 2
+        self.assert_parity(prep, expected, engine, result)
+
+    def test_unsupported_aggregation(self, engine_config, run_engine):
+        """Test that rules without a Polars equivalent are rejected."""
+        engine_config["preprocessing"]["aggregation_rules"]["total_unidades_entregadas"] = "nunique"
+
+        with pytest.raises(ValueError, match="not supported by the Polars engine"):
+            run_engine(PolarsPreprocessor, engine_config)
+
+    def test_engine_selection(self, engine_config):
+        """Test that preprocessing.engine='polars' selects this backend."""
+        engine_config["preprocessing"]["engine"] = "polars"
+        assert isinstance(get_preprocessor(engine_config), PolarsPreprocessor)
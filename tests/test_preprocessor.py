@@ -4,7 +4,8 @@ import pandas as pd
 import numpy as np
 import yaml
 from pathlib import Path
-from src.preprocessor import Preprocessor
+import sys
+from src.preprocessor import Preprocessor, get_preprocessor
 from src.utils import load_config
 from datetime import datetime
 from unittest.mock import patch
@@ -168,6 +169,27 @@ class TestPreprocessor:
         assert pd.Timestamp("2023-01-02") in res["fecha"].values
         assert prep.reindex_stats["ventas"] > 0
 
+    def test_reindex_frame_positions(self, mock_config):
+        """Test that the position-based reindex matches DataFrame.reindex semantics."""
+        prep = Preprocessor(mock_config)
+        grid = pd.date_range("2023-01-01", "2023-01-05", freq="D", name="fecha")
+        df = pd.DataFrame({
+            "fecha": pd.to_datetime(["2023-01-04", "2023-01-01", "2023-01-04", "2022-12-31"]),
+            "units": pd.array([4, 1, 40, 0], dtype="Int32"),
+            "ciclo": pd.Categorical(["A", "B", "A", "B"])
+        })
+
+        res, rows_added = prep._reindex_frame("ventas", df, grid[0], grid[-1], grid=grid)
+
+        assert res["fecha"].tolist() == grid.tolist()
+        assert res["units"].dtype == "Int32"
+        assert isinstance(res["ciclo"].dtype, pd.CategoricalDtype)
+        assert res["units"].tolist()[0] == 1
+        assert res["units"].tolist()[3] == 40  # Duplicated date keeps the last row
+        assert res["units"].isna().sum() == 3
+        # 3 unique dates in (one off the grid is dropped) -> 5 out
+        assert rows_added == 2
+
     def test_aggregation(self, mock_config, mock_dataframes):
         """Test monthly aggregation."""
         prep = Preprocessor(mock_config)
@@ -206,6 +228,59 @@ class TestPreprocessor:
         # Should be interpolated between 20 and 40 -> 30
         assert df_ventas["total_unidades_entregadas"].iloc[2] == 30.0
 
+    def test_impute_marketing_by_campaign_window(self, mock_config):
+        """Test that investment gaps are interpolated within campaign windows only."""
+        prep = Preprocessor(mock_config)
+        # Default windows: Ciclo Abr-May 15/03-25/05, Ciclo Sep-Oct 15/08-25/10
+        dates = pd.to_datetime([
+            "2023-03-14", "2023-03-15", "2023-03-16", "2023-03-17", "2023-03-18",
+            "2023-05-25", "2023-05-26", "2023-08-15", "2023-08-16"
+        ])
+        df = pd.DataFrame({
+            "fecha": dates,
+            "ciclo": [np.nan, np.nan, "Ciclo Abr-May", np.nan, np.nan, np.nan, np.nan, np.nan, np.nan],
+            "inversion_facebook": [50.0, np.nan, 10.0, np.nan, 30.0, np.nan, np.nan, np.nan, 80.0],
+            "inversion_instagram": [0.0, 5.0, 5.0, 5.0, 5.0, 0.0, np.nan, 0.0, 8.0]
+        })
+
+        stats = prep._impute_marketing(df)
+
+        # Leading gap of the window takes its first value, not the pre-window 50
+        assert df["inversion_facebook"].tolist() == [50.0, 10.0, 10.0, 20.0, 30.0, 30.0, 0.0, 80.0, 80.0]
+        assert df["inversion_instagram"].iloc[6] == 0.0
+        # Labels follow the campaign month span; rows without investment get the default
+        assert df["ciclo"].tolist() == [
+            "Ciclo Abr-May", "Ciclo Abr-May", "Ciclo Abr-May", "Ciclo Abr-May", "Ciclo Abr-May",
+            "Sin Campaña", "Sin Campaña", "Sin Campaña", "Ciclo Sep-Oct"
+        ]
+        assert stats == {"campaigns_inferred": 8, "inversion_facebook_imputed": 5, "inversion_instagram_imputed": 1}
+
+    @pytest.mark.parametrize("dtype", ["float64", "float32", "Float64"])
+    def test_recalculate_frame(self, mock_config, dtype):
+        """Test the gather/compute/scatter recalculation of imputed rows."""
+        prep = Preprocessor(mock_config)
+        df = pd.DataFrame({
+            "total_unidades_entregadas": [10.0, 20.0, 30.0, 40.0],
+            "unidades_precio_normal": [8.0, 15.0, 25.0, 30.0],
+            "unidades_promo_pagadas": [1.0, 3.0, 2.0, 5.0],
+            "precio_unitario_full": [100.0, 100.0, np.nan, 100.0],
+            "costo_unitario": [40.0, 40.0, 40.0, 40.0],
+            "costo_total": [1.0, 2.0, 3.0, 4.0],
+            "ingresos_totales": [1.0, 2.0, 3.0, 4.0],
+            "utilidad": [1.0, 2.0, 3.0, 4.0]
+        }, index=[10, 11, 12, 13]).astype({"costo_total": dtype, "ingresos_totales": dtype, "utilidad": dtype})
+        mask = pd.Series([False, True, True, False], index=df.index)
+
+        counts = prep._recalculate_frame(df, mask)
+
+        assert counts == {"rows": 2, "incomplete": 1}
+        assert df["costo_total"].tolist()[:3] == [1.0, 800.0, 1200.0]
+        assert df.loc[11, "ingresos_totales"] == 1800.0
+        assert df.loc[11, "utilidad"] == 1000.0
+        assert pd.isna(df.loc[12, "ingresos_totales"])
+        assert df.loc[13].tolist()[-3:] == [4.0, 4.0, 4.0]
+        assert str(df["utilidad"].dtype) == dtype
+
     def test_anti_data_leakage(self, mock_config):
         """Test anti-data leakage functionality."""
         prep = Preprocessor(mock_config)
@@ -236,3 +311,189 @@ class TestPreprocessor:
             res_ok = prep._apply_anti_leakage_rule(df_ok.copy())
             assert len(res_ok) == 4
             assert res_ok.index.max() == pd.Timestamp("2023-04-01")
+
+    def test_load_data_pushdown(self, mock_config, tmp_path):
+        """Test that contract columns and min_date are pushed into the reader."""
+        prep = Preprocessor(mock_config)
+        
+        dates = pd.date_range("2022-12-25", "2023-01-05", freq="D")
+        files = {}
+        for key, config_name in prep.file_map.items():
+            contract_cols = [c for c in mock_config["data_contract"][config_name] if c != "fecha"]
+            df = pd.DataFrame({"fecha": dates, "extra_col": 1.0})
+            for col in contract_cols:
+                df[col] = np.arange(len(dates), dtype=float)
+            path = tmp_path / f"{config_name}.parquet"
+            df.to_parquet(path, row_group_size=4)
+            files[key] = path
+        prep.files = files
+        
+        prep._load_data()
+        
+        ventas = prep.dataframes["ventas"]
+        assert list(ventas.columns) == ["fecha", "total_unidades_entregadas"]
+        assert ventas["fecha"].min() == pd.Timestamp("2023-01-01")
+        assert len(ventas) == 5
+        assert prep.load_stats["ventas"]["rows_filtered"] == 7
+        assert prep.columns_removed_log["ventas"] == ["extra_col"]
+        
+        prep._clean_rows()
+        assert prep.stats_cleaning["filtered"]["ventas"] == 7
+
+    def test_unify_sources_single_join(self, mock_config, mock_dataframes):
+        """Test that sources are aligned on the ventas index and collisions are rejected."""
+        prep = Preprocessor(mock_config)
+        prep.dataframes = mock_dataframes
+        prep._aggregate_monthly()
+        
+        master = prep._unify_sources()
+        assert master.index.equals(prep.monthly_dfs["ventas"].index)
+        assert "dias_en_promo" in master.columns
+        assert master.loc["2023-01-01", "ipc_mensual"] == 5.0
+        
+        prep.monthly_dfs["macro"]["total_unidades_entregadas"] = 1
+        with pytest.raises(ValueError, match="collision"):
+            prep._unify_sources()
+
+    def test_dtype_policy(self, mock_config, mock_dataframes):
+        """Test compact dtypes are applied at load and kept through imputation and aggregation."""
+        mock_config["preprocessing"]["dtype_policy"] = {
+            "enabled": True, "int": "Int32", "float": "float32", "object": "category"
+        }
+        mock_config["data_contract"]["redes_sociales"]["ciclo"] = "object"
+        prep = Preprocessor(mock_config)
+        prep.dataframes = {
+            key: prep._apply_dtype_policy(df, key, renamed=False) for key, df in mock_dataframes.items()
+        }
+        
+        assert prep.dataframes["ventas"]["total_unidades_entregadas"].dtype == "Int32"
+        assert prep.dataframes["marketing"]["inversion_facebook"].dtype == np.float32
+        assert isinstance(prep.dataframes["marketing"]["ciclo"].dtype, pd.CategoricalDtype)
+        assert prep.dtype_stats["marketing"]["bytes_saved"] > 0
+        
+        prep.dataframes["marketing"].loc[0, "ciclo"] = np.nan
+        prep._impute_business_logic()
+        prep._aggregate_monthly()
+        
+        ventas = prep.dataframes["ventas"]
+        assert ventas["total_unidades_entregadas"].dtype == "Int32"
+        assert ventas["total_unidades_entregadas"].iloc[2] == 30
+        assert prep.dataframes["marketing"]["ciclo"].iloc[0] == "Sin Campaña"
+        assert prep.monthly_dfs["ventas"]["total_unidades_entregadas"].dtype == "Int32"
+        assert prep.monthly_dfs["marketing"]["inversion_facebook"].dtype == np.float32
+
+    def test_stage_instrumentation(self, mock_config, mock_dataframes, tmp_path):
+        """Test that stages record timings, memory and rows in/out, and write the trace file."""
+        trace_file = tmp_path / "trace.jsonl"
+        mock_config["preprocessing"]["instrumentation"] = {
+            "enabled": True, "trace_memory": True, "trace_file": str(trace_file)
+        }
+        prep = Preprocessor(mock_config)
+        prep.dataframes = mock_dataframes
+        
+        prep._run_stage(prep._aggregate_monthly)
+        df_master = prep._run_stage(prep._unify_sources)
+        prep.profiler.close()
+        
+        records = prep.profiler.summary()["stages"]
+        assert [r["stage"] for r in records] == ["aggregate_monthly", "unify_sources"]
+        assert records[0]["rows_in"] == sum(len(df) for df in mock_dataframes.values())
+        assert records[1]["rows_out"] == len(df_master)
+        assert all(r["wall_time_s"] >= 0 and r["peak_memory_bytes"] >= 0 for r in records)
+        assert len(trace_file.read_text().splitlines()) == 2
+
+    def test_stage_instrumentation_default_skips_memory(self, mock_config, mock_dataframes):
+        """Test that memory tracing is opt-in: the default profiler only records timings."""
+        mock_config["preprocessing"]["instrumentation"] = {"enabled": True}
+        prep = Preprocessor(mock_config)
+        prep.dataframes = mock_dataframes
+
+        prep._run_stage(prep._aggregate_monthly)
+        record = prep.profiler.summary()["stages"][0]
+        assert not prep.profiler.trace_memory
+        assert "peak_memory_bytes" not in record and record["wall_time_s"] >= 0
+
+    def test_macro_imputation_legacy_strategy(self, mock_config, caplog):
+        """Test that quality.imputation_strategy is used (with a warning) when macro_imputation has no strategy."""
+        mock_config["quality"]["imputation_strategy"] = "median"
+        mock_config["preprocessing"].pop("macro_imputation", None)
+        with caplog.at_level("WARNING"):
+            assert Preprocessor(mock_config).macro_imputation == {"strategy": "median", "window": 60}
+        assert "quality.imputation_strategy is deprecated" in caplog.text
+
+        # The new key wins when both are set
+        mock_config["preprocessing"]["macro_imputation"] = {"strategy": "interpolate", "window": 12}
+        assert Preprocessor(mock_config).macro_imputation == {"strategy": "interpolate", "window": 12}
+
+    @pytest.mark.parametrize("engine, module", [("polars", "src.polars_engine"), ("duckdb", "src.duckdb_engine")])
+    def test_get_preprocessor_missing_engine_package(self, mock_config, monkeypatch, engine, module):
+        """Test that an engine without its optional package fails naming the package."""
+        monkeypatch.setitem(sys.modules, engine, None)
+        monkeypatch.delitem(sys.modules, module, raising=False)
+        mock_config["preprocessing"]["engine"] = engine
+        with pytest.raises(ImportError, match=f"requires the optional package '{engine}'.*requirements-engines.txt"):
+            get_preprocessor(mock_config)
+
+    def test_multi_series_pipeline(self, mock_config, mock_dataframes):
+        """Test that series keys are carried through dedup, reindex, imputation and aggregation."""
+        mock_config["preprocessing"]["multi_series"] = {"keys": ["store_id"]}
+        prep = Preprocessor(mock_config)
+        
+        ventas = mock_dataframes["ventas"]
+        store_b = ventas.copy()
+        store_b["total_unidades_entregadas"] = [1, np.nan, np.nan, 4, 5, 6, 7, 8, 9, 10]
+        store_b = store_b.drop(index=5)  # Date gap only in store 2
+        multi_ventas = pd.concat([ventas.assign(store_id=1), store_b.assign(store_id=2)], ignore_index=True)
+        
+        marketing = mock_dataframes["marketing"]
+        prep.dataframes = {
+            "ventas": multi_ventas,
+            "marketing": pd.concat([marketing.assign(store_id=1), marketing.assign(store_id=2)], ignore_index=True),
+            "promo": mock_dataframes["promo"],
+            "macro": mock_dataframes["macro"]
+        }
+        
+        prep._clean_rows()
+        prep._ensure_temporal_completeness()
+        # Grid runs to the macro max date (2023-02-01): 22 new days per store + store 2 gap
+        assert prep.reindex_stats["ventas"] == 2 * 22 + 1
+        
+        prep._impute_business_logic()
+        daily = prep.dataframes["ventas"].set_index(["store_id", "fecha"])["total_unidades_entregadas"]
+        assert daily.loc[(1, pd.Timestamp("2023-01-03"))] == 30.0
+        # Interpolated within store 2 only: 1 -> 4
+        assert daily.loc[(2, pd.Timestamp("2023-01-02"))] == 2.0
+        
+        prep._aggregate_monthly()
+        master = prep._unify_sources()
+        master = prep._impute_post_merge(master)
+        
+        assert master["store_id"].tolist() == [1, 1, 2, 2]
+        assert master.index.name == "fecha"
+        january = master.loc["2023-01-01"]
+        assert january["ipc_mensual"].tolist() == [5.0, 5.0]  # Macro broadcast to every store
+        assert january["dias_en_promo"].tolist() == [4, 4]
+
+    def test_build_report(self, mock_config, tmp_path):
+        """Test the vectorized temporal audit, hashed duplicates and reused null counts."""
+        prep = Preprocessor(mock_config)
+        months = pd.to_datetime(["2023-01-01", "2023-02-01", "2023-04-01", "2023-04-01", "2023-05-01", "2023-06-01"])
+        df_master = pd.DataFrame({
+            "total_unidades_entregadas": [1.0, 2.0, 4.0, 4.0, np.nan, 6.0],
+            "ipc_mensual": [5.0, 5.1, 5.3, 5.3, 5.4, np.nan]
+        }, index=pd.Index(months, name="fecha"))
+        prep.master_null_stats = prep._null_stats(df_master)
+        output_file = tmp_path / "master.parquet"
+        df_master.to_parquet(output_file)
+
+        report = prep._build_report(df_master, output_file)
+
+        coverage = report["output_artifact_details"]["temporal_coverage"]
+        assert coverage["missing_expected_dates"] == ["2023-03-01T00:00:00"]
+        assert coverage["total_months"] == 5
+        assert coverage["duplicate_dates_count"] == 1
+        integrity = report["output_artifact_details"]["data_integrity"]
+        assert integrity == {"duplicate_rows": 1, "rows_with_nulls": 2, "total_nulls": 2}
+        assert report["execution_context"]["validation_status"] == "WARNING"
+        assert report["sample_data"]["head_5"][0]["fecha"] == "2023-01-01"
+        assert len(report["sample_data"]["random_5"]) == 5
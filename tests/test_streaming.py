@@ -0,0 +1,77 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.preprocessor import Preprocessor, get_preprocessor
+from src.streaming import StreamingPreprocessor, MonthlyCombiner
+
+# --- Tests ---
+
+class TestStreamingPreprocessor:
+
+    @pytest.mark.parametrize("dtype_policy", [False, True])
+    def test_matches_in_memory_pipeline(self, engine_config, run_engine, dtype_policy):
+        """Test that batch-wise processing reproduces the in-memory master and stats."""
+        engine_config["preprocessing"]["dtype_policy"] = {"enabled": dtype_policy}
+
+        prep, expected = run_engine(Preprocessor, engine_config)
+        stream, result = run_engine(StreamingPreprocessor, engine_config)
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-5)
+        assert stream.load_stats["ventas"]["batches"] > 1
+        assert stream.stats_cleaning == prep.stats_cleaning
+        assert stream.sentinel_stats == prep.sentinel_stats
+        assert stream.reindex_stats == prep.reindex_stats
+        assert stream.imputation_stats == prep.imputation_stats
+        assert stream.columns_removed_log == prep.columns_removed_log
+        assert stream._records_recalculated() == prep._records_recalculated()
+        assert stream.recalc_stats == prep.recalc_stats
+
+    def test_multi_series_requires_sorted_input(self, engine_config, tmp_path, monkeypatch):
+        """Test that a series reappearing in a later batch is rejected."""
+        engine_config["preprocessing"]["multi_series"] = {"keys": ["store_id"]}
+        engine_config["preprocessing"]["streaming"]["batch_rows"] = 4
+        raw = tmp_path / "data" / "01_raw"
+        raw.mkdir(parents=True)
+        dates = pd.date_range("2023-01-01", "2023-01-06", freq="D")
+        for name, contract in engine_config["data_contract"].items():
+            df = pd.DataFrame({col: 1.0 for col in contract if col != "fecha"}, index=range(len(dates)))
+            if "ciclo" in df.columns:
+                df["ciclo"] = "C1"
+            df["fecha"] = dates
+            if name != "macro_economia":
+                # Stores interleaved instead of sorted by (store_id, fecha)
+                df = pd.concat([df.assign(store_id=1), df.assign(store_id=2)]).sort_values("fecha")
+            df.to_parquet(raw / f"{name}.parquet")
+        monkeypatch.chdir(tmp_path)
+
+        with pytest.raises(ValueError, match="sorted"):
+            StreamingPreprocessor(engine_config).run()
+
+    def test_monthly_combiner(self):
+        """Test that merged chunk states equal a one-shot monthly aggregation."""
+        dates = pd.date_range("2023-01-01", "2023-03-31", freq="D")
+        df = pd.DataFrame({
+            "fecha": dates,
+            "units": np.arange(len(dates), dtype=float),
+            "price": np.where(np.arange(len(dates)) % 4 == 0, np.nan, 10.0 + np.arange(len(dates))),
+            "ipc": np.where(dates.day < 3, np.nan, dates.month.astype(float))
+        })
+        rules = {"units": "sum", "price": "mean", "ipc": "first"}
+
+        combiner = MonthlyCombiner(rules)
+        for start in range(0, len(df), 13):
+            combiner.update(df.iloc[start:start + 13])
+
+        expected = df.set_index("fecha").resample("MS").agg(rules)
+        pd.testing.assert_frame_equal(combiner.result(), expected)
+
+    def test_get_preprocessor(self, engine_config):
+        """Test engine selection from preprocessing.engine."""
+        assert type(get_preprocessor(engine_config)) is Preprocessor
+
+        engine_config["preprocessing"]["engine"] = "streaming"
+        assert isinstance(get_preprocessor(engine_config), StreamingPreprocessor)
+
+        engine_config["preprocessing"]["engine"] = "spark"
+        with pytest.raises(ValueError, match="Unknown preprocessing engine"):
+            get_preprocessor(engine_config)
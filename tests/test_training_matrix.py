@@ -0,0 +1,60 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.features import FeatureEngineer
+from src.training_matrix import export_training_matrix, load_training_matrix
+
+@pytest.fixture
+def features_df():
+    dates = pd.date_range(start='2022-01-01', periods=24, freq='MS', name='fecha')
+    return pd.DataFrame({
+        'total_unidades_entregadas': np.arange(24) * 10,
+        'month_sin': np.sin(np.arange(24)),
+        'ipc_mensual': pd.array([1.5] * 23 + [None], dtype='Float64'),
+        'ciclo': ['Sin Campaña'] * 24
+    }, index=dates)
+
+def test_export_and_mmap_load(features_df, tmp_path):
+    info = export_training_matrix(features_df, 'total_unidades_entregadas', ['month_sin', 'ipc_mensual'], tmp_path, metadata={'feature_version': 'abc'})
+    X, y, metadata = load_training_matrix(tmp_path)
+
+    assert isinstance(X, np.memmap) and not X.flags.writeable
+    assert X.dtype == np.float32 and X.flags.c_contiguous and X.shape == (24, 2)
+    np.testing.assert_allclose(X[:, 0], features_df['month_sin'].to_numpy(dtype=np.float32))
+    assert np.isnan(X[-1, 1])
+    np.testing.assert_array_equal(y, np.arange(24, dtype=np.float32) * 10)
+
+    assert metadata == info
+    assert metadata['columns'] == ['month_sin', 'ipc_mensual']
+    assert metadata['feature_version'] == 'abc'
+    assert pd.DatetimeIndex(metadata['index']).equals(features_df.index)
+
+def test_export_errors(features_df, tmp_path):
+    with pytest.raises(ValueError, match="must be numeric"):
+        export_training_matrix(features_df, 'total_unidades_entregadas', ['ciclo'], tmp_path)
+    with pytest.raises(ValueError, match="not found"):
+        export_training_matrix(features_df, 'total_unidades_entregadas', ['missing'], tmp_path)
+    with pytest.raises(FileNotFoundError):
+        load_training_matrix(tmp_path)
+
+def test_feature_engineer_exports_matrix(features_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = {
+        'project': {'target_column': 'total_unidades_entregadas'},
+        'feature_engineering': {
+            'cyclical_columns': ['month'],
+            'exogenous_to_keep': ['ipc_mensual'],
+            'training_matrix': {'enabled': True}
+        }
+    }
+    master = tmp_path / 'data' / '02_cleansed' / 'master_monthly.parquet'
+    master.parent.mkdir(parents=True)
+    features_df.drop(columns='month_sin').to_parquet(master)
+
+    engineer = FeatureEngineer(config)
+    df = engineer.run()
+    X, y, metadata = load_training_matrix(tmp_path / 'data' / '04_processed' / 'training_matrix')
+
+    # Engineered features plus exogenous_to_keep; identifiers and the target are excluded
+    assert metadata['columns'] == ['ipc_mensual', 'month_sin', 'month_cos', 'is_novenas', 'is_primas', 'is_pandemic']
+    np.testing.assert_allclose(X, df[metadata['columns']].to_numpy(dtype=np.float32, na_value=np.nan))
@@ -0,0 +1,95 @@
+import json
+import logging
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from src import utils
+from src.profiling import StageProfiler
+from src.utils import setup_logging, log_context
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Configures logging to a JSON-lines file and restores the root logger afterwards."""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    path = tmp_path / "logs" / "pipeline.jsonl"
+    yield path
+    utils._stop_log_listener()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in saved_handlers:
+        root.addHandler(handler)
+    root.setLevel(saved_level)
+
+def read_records(path):
+    utils._stop_log_listener()  # Flushes the queue
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+def test_setup_logging_writes_structured_records(log_file):
+    listener = setup_logging({"logging": {"level": "INFO", "console": False, "file": str(log_file)}})
+    assert listener is not None
+
+    profiler = StageProfiler(phase="phase_02_preprocessing", trace_memory=False)
+    with profiler.stage("clean_rows", rows_in=10) as record:
+        logging.getLogger("src.preprocessor").info("Cleaning %s rows", 10)
+        record["rows_out"] = 8
+    logging.getLogger("src.preprocessor").debug("Below the configured level")
+
+    records = read_records(log_file)
+    assert [r["message"] for r in records] == ["Cleaning 10 rows", f"Stage clean_rows finished in {profiler.records[0]['wall_time_s']:.3f}s"]
+    for r in records:
+        assert r["run_id"] == profiler.run_id
+        assert r["phase"] == "phase_02_preprocessing"
+        assert r["stage"] == "clean_rows"
+    assert records[1]["duration_s"] == profiler.records[0]["wall_time_s"]
+    assert records[1]["rows_out"] == 8
+
+def test_log_context_is_per_thread(log_file):
+    setup_logging({"logging": {"console": False, "file": str(log_file)}})
+    logger = logging.getLogger("src.test")
+
+    def worker():
+        with log_context(stage="worker"):
+            logger.info("from worker")
+
+    with log_context(stage="main"):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        logger.info("from main")
+    logger.info("outside")
+
+    stages = {r["message"]: r.get("stage") for r in read_records(log_file)}
+    assert stages == {"from worker": "worker", "from main": "main", "outside": None}
+
+def test_setup_logging_without_queue(log_file):
+    assert setup_logging({"logging": {"console": False, "file": str(log_file), "queue": False}}) is None
+    logging.getLogger("src.test").warning("Direct write %d", 1)
+
+    record = read_records(log_file)[0]
+    assert record["level"] == "WARNING"
+    assert record["message"] == "Direct write 1"
+
+def test_save_json_same_output_with_and_without_orjson(tmp_path, monkeypatch):
+    payload = {
+        np.int64(7): np.float64("nan"), "inf": float("inf"), True: pd.NA, None: pd.NaT,
+        "ts": pd.Timestamp("2024-01-01"), "values": np.array([1.5, np.nan]),
+        "nested": {np.int32(2): [np.float32(0.5), np.bool_(False)]}, "text": "Buñuelos"
+    }
+    monkeypatch.setattr(utils, "orjson", None)
+    utils.save_json(payload, tmp_path / "stdlib.json")
+    text = (tmp_path / "stdlib.json").read_text(encoding="utf-8")
+
+    # Valid JSON: non-finite values are null, keys are strings, 2-space indent
+    assert "NaN" not in text and "Infinity" not in text
+    assert text.startswith('{\n  "7": null,')
+    assert json.loads(text) == {
+        "7": None, "inf": None, "true": None, "null": None, "ts": "2024-01-01T00:00:00",
+        "values": [1.5, None], "nested": {"2": [0.5, False]}, "text": "Buñuelos"
+    }
+
+    monkeypatch.setattr(utils, "orjson", pytest.importorskip("orjson"))
+    utils.save_json(payload, tmp_path / "orjson.json")
+    assert (tmp_path / "orjson.json").read_text(encoding="utf-8") == text
@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.window_features import window_feature_names, window_features
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({'a': rng.normal(size=40), 'b': rng.normal(size=40) * 10})
+    df.loc[7, 'b'] = np.nan
+    return df
+
+def expected_features(df, shift):
+    expected = {}
+    for lag in [1, 3]:
+        for col in df.columns:
+            expected[f"{col}_lag_{lag}"] = df[col].shift(lag)
+    for window in [2, 5]:
+        for stat in ['mean', 'std']:
+            for col in df.columns:
+                expected[f"{col}_roll_{stat}_{window}"] = df[col].rolling(window).agg(stat).shift(shift)
+    for stat in ['mean', 'sum']:
+        for col in df.columns:
+            expected[f"{col}_exp_{stat}"] = df[col].expanding().agg(stat).shift(shift)
+    return pd.DataFrame(expected)
+
+@pytest.mark.parametrize("shift", [0, 1])
+def test_matches_pandas(frame, shift):
+    result = window_features(frame, ['a', 'b'], lags=[1, 3], windows=[2, 5], stats=['mean', 'std'],
+                             expanding=['mean', 'sum'], shift=shift)
+
+    assert result.columns.tolist() == window_feature_names(['a', 'b'], [1, 3], [2, 5], ['mean', 'std'], ['mean', 'sum'])
+    pd.testing.assert_frame_equal(result, expected_features(frame, shift), check_exact=False, rtol=1e-9)
+
+def test_groups_do_not_bleed(frame):
+    groups = np.repeat([0, 1], 20)
+    result = window_features(frame, ['a', 'b'], lags=[1, 3], windows=[2, 5], stats=['mean', 'std'],
+                             expanding=['mean', 'sum'], shift=1, groups=groups)
+
+    expected = pd.concat([expected_features(part, 1) for _, part in frame.groupby(groups)])
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+
+def test_fill_value_and_errors(frame):
+    result = window_features(frame, ['a'], lags=[2], windows=[3], shift=1, fill_value=0)
+    assert result['a_lag_2'].iloc[:2].tolist() == [0, 0]
+    assert result['a_roll_mean_3'].iloc[:3].tolist() == [0, 0, 0]
+    assert result['a_roll_mean_3'].iloc[3] == pytest.approx(frame['a'].iloc[:3].mean())
+
+    with pytest.raises(ValueError, match="Unknown window statistics"):
+        window_features(frame, ['a'], windows=[3], stats=['median'])
+    with pytest.raises(ValueError, match="must be >= 1"):
+        window_features(frame, ['a'], lags=[0])